@@ -1,20 +1,30 @@
 import os
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
 from .core.db import init_db
-from .services.exercise_store import load_exercise_data
+from .core.async_db import PoolTimeout, pool_stats, open_async_pool, close_async_pool
+from .services.exercise_store import load_exercise_data, watcher
+from .services import password_hasher
 from fastapi.staticfiles import StaticFiles
 
 UPLOAD_DIR = os.getenv("UPLOAD_DIR", "uploads")
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
-from .routes.exercises import router as exercises_router
+from .routes.exercises import router as exercises_router, catalog_health
 from .routes.auth import router as auth_router
 from .modules.login import router as login_router
 #from app.modules.signup import router as signup_router
 from appDir.routes.profile import router as profile_router
 from appDir.routes.password_reset import router as password_reset_router
+from appDir.routes.programs import router as programs_router
+from appDir.routes.workouts import router as workouts_router
+from appDir.routes.progress import router as progress_router
+from appDir.routes.session import router as session_router
+from appDir.services.plan_service import plan_cache
+from appDir.services import profile_cache
+from appDir.services.split_policy import current_policy, load_split_policy
 
 
 
@@ -35,7 +45,49 @@ app.add_middleware(
 @app.on_event("startup")
 def startup():
     init_db()
+    password_hasher.start()
     load_exercise_data()
+    load_split_policy()
+    watcher.start()
+
+@app.on_event("startup")
+async def async_startup():
+    await open_async_pool()
+    profile_cache.start_listener()
+
+@app.on_event("shutdown")
+def shutdown():
+    watcher.stop()
+    password_hasher.shutdown()
+
+@app.on_event("shutdown")
+async def async_shutdown():
+    await profile_cache.stop_listener()
+    await close_async_pool()
+
+@app.exception_handler(PoolTimeout)
+def pool_timeout_handler(request: Request, exc: PoolTimeout):
+    # every connection is busy; tell the client to back off instead of queueing forever
+    return JSONResponse(status_code=503, content={"detail": "Server busy, please retry."},
+                        headers={"Retry-After": "1"})
+
+@app.exception_handler(password_hasher.PasswordHasherBusy)
+def hasher_busy_handler(request: Request, exc: password_hasher.PasswordHasherBusy):
+    return JSONResponse(status_code=503, content={"detail": "Server busy, please retry."},
+                        headers={"Retry-After": str(exc.retry_after)})
+
+# before the routers: auth's GET /api/{user_id} would otherwise take /api/health
+@app.get("/api/health")
+def health():
+    return {
+        "status": "ok",
+        **catalog_health(),
+        "async_db_pool": pool_stats(),
+        "password_hasher": password_hasher.stats(),
+        "plan_cache": plan_cache.stats(),
+        "profile_cache": profile_cache.profile_cache.stats(),
+        "split_policy": {"version": current_policy().version, "entries": len(current_policy())},
+    }
 
 app.include_router(exercises_router, prefix="/api")
 app.include_router(auth_router, prefix="/api")
@@ -43,7 +95,7 @@ app.include_router(login_router, prefix="/api")
 #app.include_router(signup_router, prefix="/api")
 app.include_router(profile_router)
 app.include_router(password_reset_router)
-
-@app.get("/api/health")
-def health():
-    return {"status": "ok"}
\ No newline at end of file
+app.include_router(programs_router)
+app.include_router(workouts_router)
+app.include_router(progress_router)
+app.include_router(session_router)
@@ -0,0 +1,110 @@
+import weakref
+from contextlib import asynccontextmanager
+from typing import Any, Sequence
+
+from psycopg.rows import dict_row
+from psycopg_pool import AsyncConnectionPool
+import psycopg_pool
+
+from .config import (
+    DATABASE_URL, DB_ASYNC_POOL_MAX, DB_ASYNC_POOL_MIN, DB_POOL_MAX_LIFETIME, DB_POOL_MAX_USES, DB_POOL_TIMEOUT,
+)
+
+
+class PoolTimeout(Exception):
+    """No connection became free within the acquire timeout (raised by adb_conn())."""
+
+# psycopg 3 keeps the %s placeholders the sync code uses, and dict_row gives the
+# same plain-dict rows as RealDictCursor, so SQL moves over unchanged.
+apool = AsyncConnectionPool(
+    DATABASE_URL,
+    min_size=DB_ASYNC_POOL_MIN,
+    max_size=DB_ASYNC_POOL_MAX,
+    timeout=DB_POOL_TIMEOUT,
+    kwargs={"row_factory": dict_row},
+    check=AsyncConnectionPool.check_connection,
+    max_lifetime=DB_POOL_MAX_LIFETIME,
+    open=False,
+)
+# checkouts per connection, for DB_POOL_MAX_USES
+_uses: "weakref.WeakKeyDictionary[Any, int]" = weakref.WeakKeyDictionary()
+
+
+async def open_async_pool():
+    await apool.open(wait=True)
+
+
+async def close_async_pool():
+    await apool.close()
+
+
+@asynccontextmanager
+async def adb_conn():
+    """
+    Borrow a pooled connection:
+
+        async with adb_conn() as conn:
+            row = await fetch_one(conn, "SELECT ...", (...,))
+            await conn.commit()
+
+    The transaction is committed if the block exits normally and rolled back if
+    it raises.
+    """
+    try:
+        conn = await apool.getconn()
+    except psycopg_pool.PoolTimeout as e:
+        # our own type, so the app's handler doesn't depend on psycopg_pool
+        raise PoolTimeout(str(e)) from e
+
+    try:
+        yield conn
+    except BaseException:
+        if not conn.closed:
+            await conn.rollback()
+        raise
+    else:
+        await conn.commit()
+    finally:
+        uses = _uses.get(conn, 0) + 1
+        if DB_POOL_MAX_USES and uses >= DB_POOL_MAX_USES:
+            # a closed connection is discarded by the pool and replaced
+            await conn.close()
+        else:
+            _uses[conn] = uses
+        await apool.putconn(conn)
+
+
+def pool_stats() -> dict[str, Any]:
+    """The pool's counters plus how saturated it is and how long checkouts waited."""
+    stats = apool.get_stats()
+    size = stats.get("pool_size", 0)
+    in_use = size - stats.get("pool_available", 0)
+    requests = stats.get("requests_num", 0)
+    return {
+        **stats,
+        "in_use": in_use,
+        "saturation": round(in_use / DB_ASYNC_POOL_MAX, 4),
+        "requests_waiting": stats.get("requests_waiting", 0),
+        "wait_ms_avg": round(stats.get("requests_wait_ms", 0) / requests, 3) if requests else 0.0,
+        "max_lifetime_s": DB_POOL_MAX_LIFETIME,
+        "max_uses": DB_POOL_MAX_USES,
+    }
+
+
+async def fetch_one(conn, sql: str, params: Sequence[Any] = ()) -> dict[str, Any] | None:
+    async with conn.cursor() as cur:
+        await cur.execute(sql, params)
+        return await cur.fetchone()
+
+
+async def fetch_all(conn, sql: str, params: Sequence[Any] = ()) -> list[dict[str, Any]]:
+    async with conn.cursor() as cur:
+        await cur.execute(sql, params)
+        return await cur.fetchall()
+
+
+async def execute(conn, sql: str, params: Sequence[Any] = ()) -> int:
+    """Runs a statement without a result set and returns the affected row count."""
+    async with conn.cursor() as cur:
+        await cur.execute(sql, params)
+        return cur.rowcount
@@ -4,7 +4,59 @@ from dotenv import load_dotenv
 load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL")
-JWT_SECRET = os.getenv("JWT_SECRET", "dev-secret")
+JWT_SECRET = os.getenv("JWT_SECRET")
+# retired secrets still accepted for verification while their tokens expire (comma separated)
+JWT_PREVIOUS_SECRETS = [s for s in os.getenv("JWT_PREVIOUS_SECRETS", "").split(",") if s]
+# local development only: sign tokens with a fixed, publicly known secret when JWT_SECRET is unset
+DEV_INSECURE_JWT_SECRET = os.getenv("DEV_INSECURE_JWT_SECRET", "0") == "1"
 
 if not DATABASE_URL:
     raise RuntimeError("DATABASE_URL is not set. Put it in backend/.env or your environment.")
+
+if not JWT_SECRET:
+    if not DEV_INSECURE_JWT_SECRET:
+        raise RuntimeError(
+            "JWT_SECRET is not set. Put it in backend/.env or your environment "
+            "(DEV_INSECURE_JWT_SECRET=1 signs with a fixed secret, for local development only)."
+        )
+    print("WARNING: JWT_SECRET is not set; signing tokens with the development secret, anyone can forge them")
+    JWT_SECRET = "dev-secret"
+
+# Postgres connection pool (core/async_db.py) used by the route handlers; the
+# offline scripts open their own unpooled connections (core/db.get_conn)
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "5"))          # seconds to wait for a free connection
+DB_ASYNC_POOL_MIN = int(os.getenv("DB_ASYNC_POOL_MIN", "2"))
+DB_ASYNC_POOL_MAX = int(os.getenv("DB_ASYNC_POOL_MAX", "20"))
+# connections are replaced after this many seconds, or after this many checkouts (0: no limit)
+DB_POOL_MAX_LIFETIME = float(os.getenv("DB_POOL_MAX_LIFETIME", "3600"))
+DB_POOL_MAX_USES = int(os.getenv("DB_POOL_MAX_USES", "10000"))
+
+# password hashing (services/password_hasher.py)
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(os.cpu_count() or 1)))
+# hashes allowed in flight (running + queued) before we answer 503
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", str(PASSWORD_HASH_WORKERS * 8)))
+
+# shared secret for /api/admin/* (X-Admin-Token header); admin routes are off when unset
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+
+# generated weekly plans memoized per distinct profile input (services/plan_service.py)
+PLAN_CACHE_SIZE = int(os.getenv("PLAN_CACHE_SIZE", "256"))
+# share of users given a random split for their days instead of the policy's pick,
+# so feedback keeps covering the other splits (services/split_policy.explore)
+SPLIT_EXPLORE = float(os.getenv("SPLIT_EXPLORE", "0.05"))
+
+# session tokens (services/session_tokens.py)
+ACCESS_TOKEN_TTL = int(os.getenv("ACCESS_TOKEN_TTL", "900"))                    # seconds
+REFRESH_TOKEN_TTL = int(os.getenv("REFRESH_TOKEN_TTL", str(30 * 24 * 3600)))    # seconds
+# AUTH_REQUIRED=0 lets user routes accept requests without a token (a token that is sent
+# must still be valid); only for clients that don't send one yet
+AUTH_REQUIRED = os.getenv("AUTH_REQUIRED", "1") != "0"
+if not AUTH_REQUIRED:
+    print("WARNING: AUTH_REQUIRED=0, requests without a token can act on any user_id")
+
+# per-user profile rows served by GET /api/{user_id} (services/profile_cache.py)
+PROFILE_CACHE_SIZE = int(os.getenv("PROFILE_CACHE_SIZE", "10000"))
+PROFILE_CACHE_TTL = float(os.getenv("PROFILE_CACHE_TTL", "300"))    # seconds; bounds staleness if a notification is missed
+# second tier behind the per-process LRU: "" (none) or "local" (in-process stand-in for a shared cache)
+PROFILE_CACHE_SHARED = os.getenv("PROFILE_CACHE_SHARED", "")
@@ -1,10 +1,14 @@
 import psycopg2
 from psycopg2.extras import RealDictCursor
 from .config import DATABASE_URL
+from .exercise_schema import EXERCISE_SCHEMA
 
 def get_conn():
+    # a fresh, unpooled connection for init_db() and the offline scripts;
+    # request handlers use adb_conn() (core/async_db.py)
     return psycopg2.connect(DATABASE_URL, cursor_factory=RealDictCursor)
 
+
 def init_db():
     # Simple schema init (no Alembic yet). You can upgrade later.
     conn = get_conn()
@@ -53,5 +57,137 @@ def init_db():
     ADD COLUMN IF NOT EXISTS profile_image_url TEXT;
     """)
 
+    # bumped on every profile write; the profile cache keys its entries on it
+    cur.execute("""
+    ALTER TABLE users
+    ADD COLUMN IF NOT EXISTS profile_version INT NOT NULL DEFAULT 1;
+    """)
+
+    # refresh tokens are stored as sha256 hashes (services/session_tokens.py)
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS refresh_tokens (
+      id BIGSERIAL PRIMARY KEY,
+      user_id INT NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+      token_hash TEXT UNIQUE NOT NULL,
+      expires_at TIMESTAMPTZ NOT NULL,
+      revoked_at TIMESTAMPTZ,
+      created_at TIMESTAMPTZ DEFAULT NOW()
+    );
+    """)
+
+    cur.execute("""
+    CREATE INDEX IF NOT EXISTS idx_refresh_tokens_user
+    ON refresh_tokens (user_id);
+    """)
+
+    # plan_key = profile inputs the plan was generated from (services/plan_service.py)
+    cur.execute("""
+    ALTER TABLE workouts
+    ADD COLUMN IF NOT EXISTS plan_key TEXT;
+    """)
+
+    # probability the plan's split had under the policy that assigned it; the
+    # split policy trainer weights feedback by its inverse (services/split_policy.py)
+    cur.execute("""
+    ALTER TABLE workouts
+    ADD COLUMN IF NOT EXISTS split_propensity REAL;
+    """)
+
+    cur.execute("""
+    CREATE INDEX IF NOT EXISTS workouts_user_latest_idx
+    ON workouts (user_id, created_at DESC, id DESC);
+    """)
+
+    # performed sets (services/set_logging.py). client_key is the client's id for
+    # the set, so a retried upload can't store it twice
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS workout_sets (
+      id BIGSERIAL PRIMARY KEY,
+      user_id INT NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+      workout_id INT REFERENCES workouts(id) ON DELETE SET NULL,
+      exercise_id TEXT NOT NULL,
+      reps INT NOT NULL,
+      weight REAL NOT NULL,
+      rpe REAL,
+      performed_at TIMESTAMPTZ NOT NULL,
+      client_key TEXT NOT NULL,
+      created_at TIMESTAMPTZ DEFAULT NOW(),
+      UNIQUE (user_id, client_key)
+    );
+    """)
+
+    cur.execute("""
+    CREATE INDEX IF NOT EXISTS workout_sets_user_time_idx
+    ON workout_sets (user_id, performed_at);
+    """)
+
+    # running totals kept up to date by every insert into workout_sets, so
+    # summaries never aggregate raw sets
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS user_training_days (
+      user_id INT NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+      day DATE NOT NULL,
+      sets INT NOT NULL,
+      reps INT NOT NULL,
+      volume DOUBLE PRECISION NOT NULL,
+      PRIMARY KEY (user_id, day)
+    );
+    """)
+
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS user_training_totals (
+      user_id INT PRIMARY KEY REFERENCES users(id) ON DELETE CASCADE,
+      sets BIGINT NOT NULL,
+      reps BIGINT NOT NULL,
+      volume DOUBLE PRECISION NOT NULL,
+      first_set_at TIMESTAMPTZ NOT NULL,
+      last_set_at TIMESTAMPTZ NOT NULL
+    );
+    """)
+
+    # progress analytics (services/training_analytics.py); week = Monday, UTC
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS user_exercise_weeks (
+      user_id INT NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+      exercise_id TEXT NOT NULL,
+      week DATE NOT NULL,
+      sets INT NOT NULL,
+      reps INT NOT NULL,
+      volume DOUBLE PRECISION NOT NULL,
+      best_e1rm REAL,
+      PRIMARY KEY (user_id, exercise_id, week)
+    );
+    """)
+
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS user_muscle_weeks (
+      user_id INT NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+      muscle TEXT NOT NULL,
+      week DATE NOT NULL,
+      sets REAL NOT NULL,
+      volume DOUBLE PRECISION NOT NULL,
+      PRIMARY KEY (user_id, muscle, week)
+    );
+    """)
+
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS user_exercise_records (
+      user_id INT NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+      exercise_id TEXT NOT NULL,
+      best_e1rm REAL,
+      best_e1rm_at TIMESTAMPTZ,
+      max_weight REAL NOT NULL,
+      max_weight_reps INT NOT NULL,
+      max_weight_at TIMESTAMPTZ NOT NULL,
+      best_volume DOUBLE PRECISION NOT NULL,
+      best_volume_at TIMESTAMPTZ NOT NULL,
+      PRIMARY KEY (user_id, exercise_id)
+    );
+    """)
+
+    # exercises / catalog_versions; the importer runs the same statements
+    for statement in EXERCISE_SCHEMA:
+        cur.execute(statement)
+
     conn.commit()
     conn.close()
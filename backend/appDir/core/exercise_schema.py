@@ -0,0 +1,47 @@
+"""
+Tables behind the exercise catalog import, shared by init_db() and
+scripts/import_exercises.py (which may run against a database the API has never
+started on). Only plain SQL here, so the importer can use it without loading the
+app config.
+
+Every import that changes anything gets the next catalog_versions.version, and
+each exercises row records the versions it was added / last changed / removed
+in, for /api/exercises/changes. content_hash is over the whole source record.
+"""
+
+EXERCISE_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS exercises (
+      id TEXT PRIMARY KEY,
+      name TEXT NOT NULL,
+      level TEXT,
+      category TEXT,
+      equipment TEXT,
+      force TEXT,
+      mechanic TEXT,
+      primary_muscles TEXT[] NOT NULL DEFAULT '{}',
+      secondary_muscles TEXT[] NOT NULL DEFAULT '{}'
+    );
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS catalog_versions (
+      version BIGSERIAL PRIMARY KEY,
+      source_hash TEXT NOT NULL,
+      added INT NOT NULL DEFAULT 0,
+      updated INT NOT NULL DEFAULT 0,
+      removed INT NOT NULL DEFAULT 0,
+      created_at TIMESTAMPTZ DEFAULT NOW()
+    );
+    """,
+    """
+    ALTER TABLE exercises
+    ADD COLUMN IF NOT EXISTS content_hash TEXT,
+    ADD COLUMN IF NOT EXISTS added_version BIGINT,
+    ADD COLUMN IF NOT EXISTS changed_version BIGINT,
+    ADD COLUMN IF NOT EXISTS removed_version BIGINT;
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS exercises_changed_version_idx
+    ON exercises (changed_version);
+    """,
+)
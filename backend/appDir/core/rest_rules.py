@@ -7,7 +7,7 @@ REST_RULES = {
     "cbum": "as_needed",
     "bro": "as_needed",
     "phul": "third_sixth_seventh",
-    "arnold6": "after_every_other_legs",
-    "ppl6": "after_every_other_legs",
+    "arnold_6": "after_every_other_legs",
+    "ppl_6": "after_every_other_legs",
     "ulf": "every_other_day"
 }
@@ -0,0 +1,34 @@
+from datetime import datetime, timezone
+from typing import Literal
+
+from pydantic import BaseModel, Field, field_validator
+
+# sets accepted in one POST; a long session logged offline is well under this
+MAX_SETS_PER_BATCH = 500
+
+
+class LoggedSet(BaseModel):
+    exercise_id: str = Field(min_length=1, max_length=200)
+    reps: int = Field(ge=0, le=1000)
+    weight: float = Field(ge=0, le=2000)          # kg; 0 for bodyweight
+    rpe: float | None = Field(default=None, ge=1, le=10)
+    performed_at: datetime
+    # generated by the client per set; a retried upload sends the same keys
+    client_key: str = Field(min_length=1, max_length=64)
+
+    @field_validator("performed_at")
+    @classmethod
+    def assume_utc(cls, v: datetime) -> datetime:
+        return v if v.tzinfo else v.replace(tzinfo=timezone.utc)
+
+
+class SetBatch(BaseModel):
+    workout_id: int | None = None
+    sets: list[LoggedSet] = Field(min_length=1, max_length=MAX_SETS_PER_BATCH)
+
+
+class WorkoutFeedback(BaseModel):
+    workout_id: int
+    rating: int = Field(ge=1, le=5)
+    difficulty: Literal["too_easy", "just_right", "too_hard"] | None = None
+    notes: str | None = Field(default=None, max_length=2000)
@@ -1,8 +1,14 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, BackgroundTasks, HTTPException
 from pydantic import BaseModel, EmailStr
-import bcrypt
 
-from appDir.core.db import get_conn
+from appDir.core.async_db import adb_conn, fetch_one, execute
+from appDir.services.password_hasher import (
+    PasswordHasherBusy,
+    hash_password,
+    verify_password,
+    needs_rehash,
+)
+from appDir.services.session_tokens import issue_tokens
 
 router = APIRouter()
 
@@ -15,17 +21,20 @@ class LoginResponse(BaseModel):
     email: EmailStr
     name: str
     profile_image_url: str | None = None
+    # session tokens (routes/session.py); send access_token as "Authorization: Bearer ..."
+    access_token: str
+    refresh_token: str
+    token_type: str
+    expires_in: int
 
 @router.post("/login", response_model=LoginResponse)
-def login(payload: LoginRequest):
-    conn = get_conn()
-    cur = conn.cursor()
-    cur.execute(
-        "SELECT id, email, name, password_hash, profile_image_url FROM users WHERE email = %s",
-        (payload.email.lower().strip(),)
-    )
-    row = cur.fetchone()
-    conn.close()
+async def login(payload: LoginRequest, background_tasks: BackgroundTasks):
+    async with adb_conn() as conn:
+        row = await fetch_one(
+            conn,
+            "SELECT id, email, name, password_hash, profile_image_url FROM users WHERE email = %s",
+            (payload.email.lower().strip(),)
+        )
 
     if not row:
         raise HTTPException(status_code=401, detail="Invalid email or password")
@@ -36,25 +45,36 @@ def login(payload: LoginRequest):
     password_hash = row["password_hash"]
     profile_image_url = row.get("profile_image_url")  # may be None
 
-    stored = password_hash
-
-    # normalize to bytes safely
-    if isinstance(stored, str):
-        stored_bytes = stored.encode("utf-8")
-    else:
-        stored_bytes = stored  # bytes/bytearray
-
     try:
-        ok = bcrypt.checkpw(payload.password.encode("utf-8"), stored_bytes)
+        ok = await verify_password(payload.password, password_hash)
     except ValueError as e:
         print("BCRYPT ERROR:", e)
         raise HTTPException(status_code=401, detail="Invalid email or password")
     if not ok:
         raise HTTPException(status_code=401, detail="Invalid email or password")
 
+    # stored hash is weaker than BCRYPT_ROUNDS; upgrade it after the response goes out
+    if needs_rehash(password_hash):
+        background_tasks.add_task(rehash_password, user_id, payload.password, password_hash)
+
     return {
         "id": user_id,
         "email": email,
         "name": name,
         "profile_image_url": profile_image_url,
-    }
\ No newline at end of file
+        **await issue_tokens(user_id),
+    }
+
+async def rehash_password(user_id: int, password: str, old_hash):
+    try:
+        new_hash = await hash_password(password)
+    except PasswordHasherBusy:
+        return  # not urgent, the next login will try again
+
+    async with adb_conn() as conn:
+        # only replace the hash we verified against, in case the password changed meanwhile
+        await execute(
+            conn,
+            "UPDATE users SET password_hash = %s WHERE id = %s AND password_hash = %s",
+            (new_hash, user_id, old_hash),
+        )
@@ -1,12 +1,14 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel, EmailStr, Field
-import bcrypt
 import json
-from psycopg2 import errors
+from psycopg import errors
 import secrets
 import string
 
-from appDir.core.db import get_conn
+from appDir.core.async_db import adb_conn, fetch_one
+from appDir.services.password_hasher import hash_password
+from appDir.services.profile_cache import load_profile
+from appDir.routes.session import authorize_user
 
 router = APIRouter()
 
@@ -29,75 +31,45 @@ FRIEND_CODE_ALPHABET = string.ascii_uppercase + string.digits  # no lowercase, e
 def generate_friend_code(length: int = FRIEND_CODE_LEN) -> str:
     return "".join(secrets.choice(FRIEND_CODE_ALPHABET) for _ in range(length))
 
-@router.get("/{user_id}")
-def get_profile(user_id: int):
-    conn = get_conn()
-    cur = conn.cursor()
-    try:
-        cur.execute(
-            """
-            SELECT
-                id,
-                email,
-                name,
-                profile_image_url,
-                age,
-                height,
-                weight,
-                experience_level,
-                workout_volume,
-                goals,
-                equipment,
-                created_at,
-                friend_code,
-                session_length_minutes
-            FROM users
-            WHERE id = %s
-            """,
-            (user_id,),
-        )
-        row = cur.fetchone()
-        if not row:
-            raise HTTPException(status_code=404, detail="User not found")
-
-        # row is dict (RealDictCursor)
-        return {
-            "id": row["id"],
-            "email": row["email"],
-            "name": row["name"],
-            "profile_image_url": row.get("profile_image_url"),
-
-            "age": row["age"],
-            "height": row["height"],
-            "weight": row["weight"],
-
-            "experienceLevel": row["experience_level"],
-            "workoutVolume": row["workout_volume"],
-            "goals": row["goals"],
-            "equipment": row["equipment"],
-
-            "created_at": row["created_at"].isoformat() if row.get("created_at") else None,
-            "friend_code": row.get("friend_code"),
-            "session_length_minutes": row["session_length_minutes"],
-        }
-    finally:
-        cur.close()
-        conn.close()
+@router.get("/{user_id}", dependencies=[Depends(authorize_user)])
+async def get_profile(user_id: int):
+    row = await load_profile(user_id)
+    if not row:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    # row is dict (dict_row)
+    return {
+        "id": row["id"],
+        "email": row["email"],
+        "name": row["name"],
+        "profile_image_url": row.get("profile_image_url"),
+
+        "age": row["age"],
+        "height": row["height"],
+        "weight": row["weight"],
+
+        "experienceLevel": row["experience_level"],
+        "workoutVolume": row["workout_volume"],
+        "goals": row["goals"],
+        "equipment": row["equipment"],
+
+        "created_at": row["created_at"].isoformat() if row.get("created_at") else None,
+        "friend_code": row.get("friend_code"),
+        "session_length_minutes": row["session_length_minutes"],
+    }
 
 @router.post("/auth/signup")
-def signup(payload: SignupRequest):
-    pw_hash = bcrypt.hashpw(payload.password.encode("utf-8"), bcrypt.gensalt()).decode("utf-8")
+async def signup(payload: SignupRequest):
+    # hash before taking a connection, so the pool isn't held for the ~250 ms
+    pw_hash = await hash_password(payload.password)
 
-    conn = get_conn()
-    cur = conn.cursor()
-
-    try:
+    async with adb_conn() as conn:
         # try a few times in the extremely rare case of a collision
         for _ in range(10):
             friend_code = generate_friend_code()
 
             try:
-                cur.execute("""
+                row = await fetch_one(conn, """
                     INSERT INTO users (
                         email, name, password_hash, age, height, weight,
                         experience_level, workout_volume, goals, equipment,
@@ -120,17 +92,15 @@ def signup(payload: SignupRequest):
                     payload.session_length_minutes
                 ))
 
-                row = cur.fetchone()
-                conn.commit()
+                await conn.commit()
                 return row
 
             except errors.UniqueViolation:
                 # could be email or friend_code collision
-                conn.rollback()
+                await conn.rollback()
 
                 # check if email already exists -> return 409 (your existing behavior)
-                cur.execute("SELECT 1 FROM users WHERE email = %s", (payload.email.lower().strip(),))
-                if cur.fetchone():
+                if await fetch_one(conn, "SELECT 1 FROM users WHERE email = %s", (payload.email.lower().strip(),)):
                     raise HTTPException(status_code=409, detail="Email already registered")
 
                 # otherwise it was probably friend_code collision; loop and try again
@@ -138,17 +108,8 @@ def signup(payload: SignupRequest):
 
         raise HTTPException(status_code=500, detail="Could not generate friend code, please try again.")
 
-    finally:
-        cur.close()
-        conn.close()
-
 @router.get("/auth/email-exists")
-def email_exists(email: EmailStr):
-    conn = get_conn()
-    cur = conn.cursor()
-    try:
-        cur.execute("SELECT 1 FROM users WHERE email = %s", (email.lower().strip(),))
-        return {"exists": cur.fetchone() is not None}
-    finally:
-        cur.close()
-        conn.close()
+async def email_exists(email: EmailStr):
+    async with adb_conn() as conn:
+        row = await fetch_one(conn, "SELECT 1 FROM users WHERE email = %s", (email.lower().strip(),))
+    return {"exists": row is not None}
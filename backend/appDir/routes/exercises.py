@@ -1,34 +1,94 @@
-from fastapi import APIRouter, HTTPException, Query
-from appDir.services.exercise_store import exercises_data, muscle_groups_data
+from fastapi import APIRouter, Header, HTTPException, Query, Request, Response
+from fastapi.responses import FileResponse, StreamingResponse
+from appDir.core.config import ADMIN_TOKEN
+from appDir.services import exercise_store
+from appDir.services.catalog_export import FORMATS, cached_export, negotiate_encoding, stream_export
+from appDir.services.catalog_sync import VersionAhead, changes_since
+from appDir.services.exercise_listing import ListingIndex, parse_fields
+from appDir.services.exercise_similarity import SimilarityIndex
+from appDir.services.exercise_suggest import normalize
+from appDir.services.response_cache import catalog_cache, etag_matches
 import random
+import secrets
 
 router = APIRouter()
 
-@router.get("/health")
-def health():
-    return {
-        "status": "healthy",
-        "exercises_loaded": len(exercises_data) > 0,
-        "total_exercises": len(exercises_data),
-        "total_muscle_groups": len(muscle_groups_data),
-    }
+# clients (and any CDN in front) may keep the body but must revalidate with the ETag
+CATALOG_CACHE_CONTROL = "public, no-cache"
+MAX_PER_PAGE = 200
 
-@router.get("/exercises")
-def get_all_exercises(page: int = 1, per_page: int = 50):
-    if not exercises_data:
+
+def loaded_snapshot() -> exercise_store.Catalog:
+    # one snapshot per request, so a reload mid-request can't mix two versions
+    catalog = exercise_store.snapshot()
+    if not catalog.exercises:
         raise HTTPException(status_code=500, detail="Exercise data not loaded")
+    return catalog
+
 
-    start = (page - 1) * per_page
-    end = start + per_page
+def cached_json(request: Request, catalog: exercise_store.Catalog, key, build,
+                static: bool = False) -> Response:
+    body, etag = catalog_cache.get(key, build, catalog.version, static=static)
+    headers = {"ETag": etag, "Cache-Control": CATALOG_CACHE_CONTROL}
 
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def catalog_health() -> dict:
+    catalog = exercise_store.snapshot()
     return {
-        "exercises": exercises_data[start:end],
-        "total": len(exercises_data),
-        "page": page,
-        "per_page": per_page,
-        "has_more": end < len(exercises_data),
+        "exercises_loaded": len(catalog.exercises) > 0,
+        "total_exercises": len(catalog.exercises),
+        "total_muscle_groups": len(catalog.muscle_groups),
+        "dataset_version": catalog.version,
+        "dataset_source": catalog.source,
+        "response_cache": catalog_cache.stats(),
     }
 
+@router.get("/exercises")
+def get_all_exercises(
+        request: Request,
+        page: int = Query(1, ge=1),
+        per_page: int = Query(50, ge=1, le=MAX_PER_PAGE),
+        after: str | None = None,
+        fields: str | None = None,
+):
+    """
+    Exercises in id order. Page by offset (page/per_page) or by keyset: pass the
+    previous response's next_cursor as after= (after= empty for the first page);
+    page is ignored then. fields=id,name,... trims each row to those keys.
+    """
+    catalog = loaded_snapshot()
+    try:
+        projection = parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    def build():
+        listing = catalog.derived(ListingIndex)
+        start = listing.start_after(after) if after is not None else (page - 1) * per_page
+        end = start + per_page
+        rows = listing.rows(start, end, projection)
+        has_more = end < len(listing)
+
+        out = {"exercises": rows, "total": len(listing)}
+        if after is None:
+            out["page"] = page
+        else:
+            out["after"] = after
+        out.update({
+            "per_page": per_page,
+            "has_more": has_more,
+            "next_cursor": listing.ids[end - 1] if has_more else None,
+            "fields": list(projection) if projection else None,
+        })
+        return out
+
+    key = ("exercises", page if after is None else None, per_page, after, projection)
+    return cached_json(request, catalog, key, build)
+
 @router.get("/exercises/search")
 def search_exercises(
         q: str = "",
@@ -36,103 +96,170 @@ def search_exercises(
         equipment: str = "",
         category: str = "",
         limit: int = Query(20, ge=1, le=200),
+        sort: str = Query("file", pattern="^(file|relevance)$"),
 ):
-    if not exercises_data:
-        raise HTTPException(status_code=500, detail="Exercise data not loaded")
+    """
+    sort=file: substring matches in file order (the original behaviour).
+    sort=relevance: ranked, typo-tolerant matching on q; same filters.
+    """
+    catalog = loaded_snapshot()
 
     q = q.lower().strip()
     muscle = muscle.lower().strip()
     equipment = equipment.lower().strip()
     category = category.lower().strip()
 
-    results = []
+    if sort == "relevance" and q:
+        allowed = catalog.search_index.filter_bits(muscle=muscle, equipment=equipment, category=category)
+        positions = [i for i, _ in catalog.ranked_index.search(q, allowed_bits=allowed, limit=limit)]
+    else:
+        positions = catalog.search_index.search(
+            q=q, muscle=muscle, equipment=equipment, category=category, limit=limit
+        )
+    results = [catalog.exercises[i] for i in positions]
 
-    for ex in exercises_data:
-        match = True
+    return {
+        "exercises": results,
+        "total_found": len(results),
+        "filters": {"q": q, "muscle": muscle, "equipment": equipment, "category": category},
+        "sort": sort,
+    }
 
-        if q:
-            name_match = q in ex.get("name", "").lower()
-            inst_match = any(q in inst.lower() for inst in ex.get("instructions", []))
-            if not (name_match or inst_match):
-                match = False
+@router.get("/exercises/export")
+def export_exercises(
+        request: Request,
+        fmt: str = Query("ndjson", alias="format", pattern="^(ndjson|json)$"),
+):
+    """
+    The whole catalog in one download: NDJSON (one exercise per line) or a JSON
+    array, compressed per Accept-Encoding. X-Dataset-Version / the ETag tell a
+    client whether its offline copy is still current.
+    """
+    catalog = loaded_snapshot()
+    encoding = negotiate_encoding(request.headers.get("accept-encoding"))
+    headers = {
+        "ETag": f'"{catalog.version}-{fmt}-{encoding}"',
+        "Cache-Control": CATALOG_CACHE_CONTROL,
+        "Vary": "Accept-Encoding",
+        "X-Dataset-Version": catalog.version,
+    }
+    if etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+        return Response(status_code=304, headers=headers)
 
-        if muscle and match:
-            primary = [m.lower() for m in ex.get("primaryMuscles", [])]
-            secondary = [m.lower() for m in ex.get("secondaryMuscles", [])]
-            if muscle not in primary and muscle not in secondary:
-                match = False
+    if encoding != "identity":
+        headers["Content-Encoding"] = encoding
+    path = cached_export(catalog.version, fmt, encoding)
+    if path:
+        return FileResponse(path, media_type=FORMATS[fmt], headers=headers)
+    return StreamingResponse(stream_export(catalog, fmt, encoding), media_type=FORMATS[fmt], headers=headers)
 
-        if equipment and match:
-            ex_eq = (ex.get("equipment") or "").lower()
-            if equipment not in ex_eq:
-                match = False
+@router.get("/exercises/changes")
+async def get_exercise_changes(since: int = Query(0, ge=0)):
+    """
+    What changed in the catalog after version `since`: full rows for added and
+    updated exercises, ids for removed ones. Store the returned version and send
+    it as since= next time; since=0 returns the whole catalog as added.
+    """
+    catalog = loaded_snapshot()
+    try:
+        return await changes_since(since, catalog)
+    except VersionAhead:
+        raise HTTPException(status_code=410, detail="Unknown catalog version; download the full catalog")
 
-        if category and match:
-            ex_cat = (ex.get("category") or "").lower()
-            if category not in ex_cat:
-                match = False
+@router.get("/exercises/suggest")
+def suggest_exercises(
+        request: Request,
+        q: str = "",
+        limit: int = Query(8, ge=1, le=20),
+):
+    """Autocomplete for the search box: exercise and muscle names completing q."""
+    catalog = loaded_snapshot()
+    prefix = normalize(q)
 
-        if match:
-            results.append(ex)
-            if len(results) >= limit:
-                break
+    def build():
+        return {"q": prefix, "suggestions": catalog.suggest_index.suggest(prefix, limit)}
 
-    return {
-        "exercises": results,
-        "total_found": len(results),
-        "filters": {"q": q, "muscle": muscle, "equipment": equipment, "category": category},
-    }
+    return cached_json(request, catalog, ("suggest", prefix, limit), build)
 
 @router.get("/muscle-groups")
-def get_muscle_groups():
-    return {"muscle_groups": muscle_groups_data, "total": len(muscle_groups_data)}
+def get_muscle_groups(request: Request):
+    catalog = exercise_store.snapshot()
+
+    def build():
+        return {"muscle_groups": catalog.muscle_groups, "total": len(catalog.muscle_groups)}
+
+    return cached_json(request, catalog, "muscle-groups", build, static=True)
 
 @router.get("/exercises/by-muscle/{muscle_name}")
-def get_exercises_by_muscle(muscle_name: str):
-    if not exercises_data:
-        raise HTTPException(status_code=500, detail="Exercise data not loaded")
+def get_exercises_by_muscle(request: Request, muscle_name: str):
+    catalog = loaded_snapshot()
 
     m = muscle_name.lower()
-    matches = []
 
-    for ex in exercises_data:
-        primary = [x.lower() for x in ex.get("primaryMuscles", [])]
-        secondary = [x.lower() for x in ex.get("secondaryMuscles", [])]
-        if m in primary or m in secondary:
-            matches.append(ex)
+    def build():
+        matches = [catalog.exercises[i] for i in catalog.facets.by_muscle(m)]
+        return {"exercises": matches, "muscle": m, "total": len(matches)}
+
+    return cached_json(request, catalog, ("by-muscle", m), build)
+
+@router.get("/exercises/{exercise_id}/similar")
+def get_similar_exercises(
+        request: Request,
+        exercise_id: str,
+        k: int = Query(10, ge=1, le=50),
+        equipment: list[str] | None = Query(None),
+):
+    """Substitutes for an exercise, optionally limited to the equipment on hand."""
+    catalog = loaded_snapshot()
+    index = catalog.derived(SimilarityIndex)
+    allowed = sorted({e.strip().lower() for e in equipment or [] if e.strip()})
+
+    if exercise_id not in index.position:
+        raise HTTPException(status_code=404, detail="Exercise not found")
 
-    return {"exercises": matches, "muscle": m, "total": len(matches)}
+    def build():
+        neighbours = index.similar(exercise_id, k=k, equipment=allowed)
+        return {
+            "exercise_id": exercise_id,
+            "equipment": allowed,
+            "similar": [
+                {"score": round(score, 4), "exercise": catalog.exercises[i]}
+                for i, score in neighbours
+            ],
+        }
+
+    return cached_json(request, catalog, ("similar", exercise_id, k, tuple(allowed)), build)
 
 @router.get("/exercises/random")
 def get_random_exercises(count: int = Query(5, ge=1, le=50)):
-    if not exercises_data:
-        raise HTTPException(status_code=500, detail="Exercise data not loaded")
+    catalog = loaded_snapshot()
 
-    count = min(count, len(exercises_data))
-    return {"exercises": random.sample(exercises_data, count), "count": count}
+    count = min(count, len(catalog.exercises))
+    return {"exercises": random.sample(catalog.exercises, count), "count": count}
 
 @router.get("/exercises/stats")
-def get_exercise_stats():
-    if not exercises_data:
-        raise HTTPException(status_code=500, detail="Exercise data not loaded")
-
-    categories = {}
-    equipment_types = {}
-    muscle_groups = {}
-
-    for ex in exercises_data:
-        cat = ex.get("category", "Unknown")
-        categories[cat] = categories.get(cat, 0) + 1
+def get_exercise_stats(request: Request):
+    catalog = loaded_snapshot()
 
-        eq = ex.get("equipment", "Unknown")
-        equipment_types[eq] = equipment_types.get(eq, 0) + 1
+    return cached_json(request, catalog, "stats", lambda: catalog.facets.stats, static=True)
 
-        for m in ex.get("primaryMuscles", []):
-            muscle_groups[m] = muscle_groups.get(m, 0) + 1
+@router.post("/admin/reload-exercises")
+def reload_exercises(x_admin_token: str | None = Header(default=None)):
+    """
+    Rebuilds the catalog from disk and swaps it in. Only reloads the worker that
+    handles this request; the file watcher (EXERCISE_WATCH_INTERVAL) covers the rest.
+    """
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not x_admin_token or not secrets.compare_digest(x_admin_token, ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
 
+    previous = exercise_store.snapshot().version
+    catalog = exercise_store.load_exercise_data()
     return {
-        "total_exercises": len(exercises_data),
-        "categories": categories,
-        "equipment_types": equipment_types,
-        "primary_muscle_distribution": muscle_groups,
+        "dataset_version": catalog.version,
+        "previous_version": previous,
+        "changed": catalog.version != previous,
+        "source": catalog.source,
+        "total_exercises": len(catalog.exercises),
     }
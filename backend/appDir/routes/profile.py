@@ -1,15 +1,19 @@
 import os
 import uuid
-from fastapi import APIRouter, UploadFile, File, HTTPException
-from appDir.core.db import get_conn
+from fastapi import APIRouter, Depends, UploadFile, File, HTTPException
+from appDir.core.async_db import adb_conn, fetch_one
+from appDir.services.password_hasher import hash_password, verify_password
+from appDir.routes.session import authorize_user
+from appDir.services.profile_cache import changed_profile, deleted_profile, profile_cache
+from appDir.services.session_tokens import revocations, revoke_sessions
 from pydantic import BaseModel, EmailStr, Field
-from psycopg2 import errors
-import bcrypt
+from psycopg import errors
 import json
 from typing import Optional
 from pathlib import Path
 
-router = APIRouter(prefix="/api/profile", tags=["profile"])
+# every route here is for one user_id (path, or query for /photo)
+router = APIRouter(prefix="/api/profile", tags=["profile"], dependencies=[Depends(authorize_user)])
 
 ALLOWED_TYPES = {
     "image/jpeg": ".jpg",
@@ -66,113 +70,117 @@ async def upload_profile_photo(user_id: int, file: UploadFile = File(...)):
 
     public_url = f"/uploads/{filename}"
 
-    conn = get_conn()
-    cur = conn.cursor()
+    async with adb_conn() as conn:
+        cur = conn.cursor()
 
-    try:
-        # 1) fetch previous url
-        cur.execute("SELECT profile_image_url FROM users WHERE id = %s", (user_id,))
-        old = cur.fetchone()
-
-        # ✅ tuple vs dict safe
-        old_url = None
-        if old:
-            old_url = old["profile_image_url"] if isinstance(old, dict) else old[0]
-
-        # 2) update db to new url
-        cur.execute(
-            "UPDATE users SET profile_image_url = %s WHERE id = %s",
-            (public_url, user_id),
-        )
-        conn.commit()
+        try:
+            # 1) fetch previous url
+            await cur.execute("SELECT profile_image_url FROM users WHERE id = %s", (user_id,))
+            old = await cur.fetchone()
+
+            # ✅ tuple vs dict safe
+            old_url = None
+            if old:
+                old_url = old["profile_image_url"] if isinstance(old, dict) else old[0]
+
+            # 2) update db to new url
+            await cur.execute(
+                "UPDATE users SET profile_image_url = %s, profile_version = profile_version + 1 WHERE id = %s",
+                (public_url, user_id),
+            )
+            row = await changed_profile(conn, user_id)
+            await conn.commit()
 
-    finally:
-        cur.close()
-        conn.close()
+        finally:
+            await cur.close()
 
+    if row is not None:
+        profile_cache.put(row)
     safe_delete_upload(old_url)
 
     return {"profile_image_url": public_url}
 
 @router.patch("/{user_id}")
-def update_profile(user_id: int, payload: ProfileUpdate):
-    conn = get_conn()
-    cur = conn.cursor()
+async def update_profile(user_id: int, payload: ProfileUpdate):
+    # email changes need the current password; check it before taking the
+    # connection for the update so none is held while bcrypt runs
+    if payload.email is not None:
+        if not payload.currentPassword:
+            raise HTTPException(status_code=400, detail="Current password required to change email.")
+
+        async with adb_conn() as conn:
+            row = await fetch_one(conn, "SELECT password_hash FROM users WHERE id = %s", (user_id,))
+        if not row:
+            raise HTTPException(status_code=404, detail="User not found.")
 
-    try:
-        updates = []
-        params = []
+        if not await verify_password(payload.currentPassword, row["password_hash"]):
+            raise HTTPException(status_code=401, detail="Invalid password.")
 
-        # normalize + validate
-        if payload.email is not None:
-            if not payload.currentPassword:
-                raise HTTPException(status_code=400, detail="Current password required to change email.")
+    async with adb_conn() as conn:
+        cur = conn.cursor()
 
-            cur.execute("SELECT password_hash FROM users WHERE id = %s", (user_id,))
-            row = cur.fetchone()
-            if not row:
+        try:
+            updates = []
+            params = []
+
+            # normalize + validate
+            if payload.email is not None:
+                new_email = payload.email.strip().lower()
+                await cur.execute(
+                    "SELECT 1 FROM users WHERE lower(email) = %s AND id <> %s",
+                    (new_email, user_id),
+                )
+                if await cur.fetchone():
+                    raise HTTPException(status_code=400, detail="Email already in use.")
+
+                updates.append("email = %s")
+                params.append(new_email)
+
+            if payload.name is not None:
+                new_name = payload.name.strip()
+                if not new_name:
+                    raise HTTPException(status_code=400, detail="Name cannot be empty.")
+                updates.append("name = %s")
+                params.append(new_name)
+
+            if not updates:
+                raise HTTPException(status_code=400, detail="No fields provided.")
+
+            updates.append("profile_version = profile_version + 1")
+            params.append(user_id)
+            await cur.execute(f"UPDATE users SET {', '.join(updates)} WHERE id = %s", tuple(params))
+
+            if cur.rowcount == 0:
                 raise HTTPException(status_code=404, detail="User not found.")
 
-            password_hash = row[0] if not isinstance(row, dict) else row["password_hash"]
-
-            if not bcrypt.checkpw(payload.currentPassword.encode("utf-8"), password_hash.encode("utf-8")):
-                raise HTTPException(status_code=401, detail="Invalid password.")
+            row = await changed_profile(conn, user_id)
+            await conn.commit()
+            profile_cache.put(row)
 
-            new_email = payload.email.strip().lower()
-            cur.execute(
-                "SELECT 1 FROM users WHERE lower(email) = %s AND id <> %s",
-                (new_email, user_id),
+            # fetch updated row
+            await cur.execute(
+                "SELECT id, email, name, profile_image_url FROM users WHERE id = %s",
+                (user_id,),
             )
-            if cur.fetchone():
-                raise HTTPException(status_code=400, detail="Email already in use.")
+            row = await cur.fetchone()
 
-            updates.append("email = %s")
-            params.append(new_email)
+            # normalize tuple vs dict cursor
+            if isinstance(row, dict):
+                return row
+            return {
+                "id": row[0],
+                "email": row[1],
+                "name": row[2],
+                "profile_image_url": row[3],
+            }
 
-        if payload.name is not None:
-            new_name = payload.name.strip()
-            if not new_name:
-                raise HTTPException(status_code=400, detail="Name cannot be empty.")
-            updates.append("name = %s")
-            params.append(new_name)
-
-        if not updates:
-            raise HTTPException(status_code=400, detail="No fields provided.")
-
-        params.append(user_id)
-        cur.execute(f"UPDATE users SET {', '.join(updates)} WHERE id = %s", tuple(params))
-
-        if cur.rowcount == 0:
-            raise HTTPException(status_code=404, detail="User not found.")
-
-        conn.commit()
-
-        # fetch updated row
-        cur.execute(
-            "SELECT id, email, name, profile_image_url FROM users WHERE id = %s",
-            (user_id,),
-        )
-        row = cur.fetchone()
-
-        # normalize tuple vs dict cursor
-        if isinstance(row, dict):
-            return row
-        return {
-            "id": row[0],
-            "email": row[1],
-            "name": row[2],
-            "profile_image_url": row[3],
-        }
-
-    except errors.UniqueViolation:
-        conn.rollback()
-        raise HTTPException(status_code=400, detail="Email already in use.")
-    finally:
-        conn.close()
+        except errors.UniqueViolation:
+            await conn.rollback()
+            raise HTTPException(status_code=400, detail="Email already in use.")
 
 
 @router.patch("/{user_id}/password")
-def update_password(user_id: int, payload: PasswordUpdate):
+async def update_password(user_id: int, payload: PasswordUpdate):
     # basic validation
     old_pw = (payload.old_password or "").strip()
     new_pw = (payload.new_password or "").strip()
@@ -187,136 +195,140 @@ def update_password(user_id: int, payload: PasswordUpdate):
     if new_pw == old_pw:
         raise HTTPException(status_code=400, detail="New password must be different from old password.")
 
-    conn = get_conn()
-    try:
-        cur = conn.cursor()
-
+    async with adb_conn() as conn:
         # Fetch current hash
-        cur.execute("SELECT password_hash FROM users WHERE id = %s", (user_id,))
-        row = cur.fetchone()
-
-        if not row:
-            raise HTTPException(status_code=404, detail="User not found.")
+        row = await fetch_one(conn, "SELECT password_hash FROM users WHERE id = %s", (user_id,))
 
-        # row can be dict (RealDictCursor) OR tuple (default cursor)
-        stored_hash = row["password_hash"] if isinstance(row, dict) else row[0]
-        if not stored_hash:
-            raise HTTPException(status_code=400, detail="Account has no password set.")
+    if not row:
+        raise HTTPException(status_code=404, detail="User not found.")
 
-        # Verify old password
-        try:
-            ok = bcrypt.checkpw(old_pw.encode("utf-8"), stored_hash.encode("utf-8"))
-        except ValueError:
-            # this happens when DB contains a non-bcrypt string
-            raise HTTPException(status_code=500, detail="Server password data is invalid.")
+    stored_hash = row["password_hash"]
+    if not stored_hash:
+        raise HTTPException(status_code=400, detail="Account has no password set.")
 
-        if not ok:
-            raise HTTPException(status_code=401, detail="Old password is incorrect.")
+    # Verify old password (connection already released)
+    try:
+        ok = await verify_password(old_pw, stored_hash)
+    except ValueError:
+        # this happens when DB contains a non-bcrypt string
+        raise HTTPException(status_code=500, detail="Server password data is invalid.")
 
-        # Hash new password + update
-        new_hash = bcrypt.hashpw(new_pw.encode("utf-8"), bcrypt.gensalt()).decode("utf-8")
-        cur.execute("UPDATE users SET password_hash = %s WHERE id = %s", (new_hash, user_id))
-        conn.commit()
+    if not ok:
+        raise HTTPException(status_code=401, detail="Old password is incorrect.")
 
-        return {"ok": True}
+    # Hash new password + update
+    new_hash = await hash_password(new_pw)
+    async with adb_conn() as conn:
+        cur = conn.cursor()
+        await cur.execute(
+            "UPDATE users SET password_hash = %s, profile_version = profile_version + 1 WHERE id = %s",
+            (new_hash, user_id),
+        )
+        row = await changed_profile(conn, user_id)
+        await conn.commit()
+    if row is not None:
+        profile_cache.put(row)
 
-    finally:
-        conn.close()
+    # sessions started with the old password end here; the client logs in again
+    await revoke_sessions(user_id)
+    return {"ok": True}
 
 @router.patch("/user_stats/{user_id}")
-def update_user_stats(user_id: int, payload: UserStatsUpdate):
-    conn = get_conn()
-    cur = conn.cursor()
+async def update_user_stats(user_id: int, payload: UserStatsUpdate):
+    async with adb_conn() as conn:
+        cur = conn.cursor()
 
-    try:
-        updates = []
-        params = []
-
-        if payload.age is not None:
-            updates.append("age = %s")
-            params.append(payload.age)
-
-        if payload.height is not None:
-            h = payload.height.strip()
-            if not h:
-                raise HTTPException(status_code=400, detail="Height cannot be empty.")
-            updates.append("height = %s")
-            params.append(h)
-
-        if payload.weight is not None:
-            updates.append("weight = %s")
-            params.append(payload.weight)
-
-        if payload.experienceLevel is not None:
-            updates.append("experience_level = %s")
-            params.append(payload.experienceLevel.strip())
-
-        if payload.workoutVolume is not None:
-            updates.append("workout_volume = %s")
-            params.append(payload.workoutVolume.strip())
-
-        if payload.goals is not None:
-            if len(payload.goals) == 0:
-                raise HTTPException(status_code=400, detail="Goals cannot be empty.")
-            updates.append("goals = %s::jsonb")
-            params.append(json.dumps(payload.goals))
-
-        if payload.equipment is not None:
-            updates.append("equipment = %s")
-            params.append(payload.equipment.strip())
-
-        if payload.session_length_minutes is not None:
-            v = payload.session_length_minutes
-            if v < 10 or v > 240:
-                raise HTTPException(status_code=400, detail="Session length must be between 10 and 240 minutes.")
-            updates.append("session_length_minutes = %s")
-            params.append(v)
-
-        if not updates:
-            raise HTTPException(status_code=400, detail="No fields provided.")
-
-        params.append(user_id)
-        cur.execute(
-            f"UPDATE users SET {', '.join(updates)} WHERE id = %s",
-            tuple(params),
-        )
+        try:
+            updates = []
+            params = []
+
+            if payload.age is not None:
+                updates.append("age = %s")
+                params.append(payload.age)
+
+            if payload.height is not None:
+                h = payload.height.strip()
+                if not h:
+                    raise HTTPException(status_code=400, detail="Height cannot be empty.")
+                updates.append("height = %s")
+                params.append(h)
+
+            if payload.weight is not None:
+                updates.append("weight = %s")
+                params.append(payload.weight)
+
+            if payload.experienceLevel is not None:
+                updates.append("experience_level = %s")
+                params.append(payload.experienceLevel.strip())
+
+            if payload.workoutVolume is not None:
+                updates.append("workout_volume = %s")
+                params.append(payload.workoutVolume.strip())
+
+            if payload.goals is not None:
+                if len(payload.goals) == 0:
+                    raise HTTPException(status_code=400, detail="Goals cannot be empty.")
+                updates.append("goals = %s::jsonb")
+                params.append(json.dumps(payload.goals))
+
+            if payload.equipment is not None:
+                updates.append("equipment = %s")
+                params.append(payload.equipment.strip())
+
+            if payload.session_length_minutes is not None:
+                v = payload.session_length_minutes
+                if v < 10 or v > 240:
+                    raise HTTPException(status_code=400, detail="Session length must be between 10 and 240 minutes.")
+                updates.append("session_length_minutes = %s")
+                params.append(v)
+
+            if not updates:
+                raise HTTPException(status_code=400, detail="No fields provided.")
+
+            updates.append("profile_version = profile_version + 1")
+            params.append(user_id)
+            await cur.execute(
+                f"UPDATE users SET {', '.join(updates)} WHERE id = %s",
+                tuple(params),
+            )
 
-        if cur.rowcount == 0:
-            raise HTTPException(status_code=404, detail="User not found")
-
-        conn.commit()
-
-        # Return updated stats
-        cur.execute(
-            """
-            SELECT
-                id,
-                age, height, weight,
-                experience_level, workout_volume, goals, equipment,
-                created_at, session_length_minutes
-            FROM users
-            WHERE id = %s
-            """,
-            (user_id,),
-        )
-        row = cur.fetchone()
-
-        return {
-            "id": row["id"],
-            "age": row["age"],
-            "height": row["height"],
-            "weight": row["weight"],
-            "experienceLevel": row["experience_level"],
-            "workoutVolume": row["workout_volume"],
-            "goals": row["goals"],
-            "equipment": row["equipment"],
-            "created_at": row["created_at"].isoformat() if row.get("created_at") else None,
-            "session_length_minutes": row["session_length_minutes"],
-        }
-
-    finally:
-        cur.close()
-        conn.close()
+            if cur.rowcount == 0:
+                raise HTTPException(status_code=404, detail="User not found")
+
+            row = await changed_profile(conn, user_id)
+            await conn.commit()
+            profile_cache.put(row)
+
+            # Return updated stats
+            await cur.execute(
+                """
+                SELECT
+                    id,
+                    age, height, weight,
+                    experience_level, workout_volume, goals, equipment,
+                    created_at, session_length_minutes
+                FROM users
+                WHERE id = %s
+                """,
+                (user_id,),
+            )
+            row = await cur.fetchone()
+
+            return {
+                "id": row["id"],
+                "age": row["age"],
+                "height": row["height"],
+                "weight": row["weight"],
+                "experienceLevel": row["experience_level"],
+                "workoutVolume": row["workout_volume"],
+                "goals": row["goals"],
+                "equipment": row["equipment"],
+                "created_at": row["created_at"].isoformat() if row.get("created_at") else None,
+                "session_length_minutes": row["session_length_minutes"],
+            }
+
+        finally:
+            await cur.close()
 
 def safe_delete_upload(profile_image_url: str | None) -> None:
     """
@@ -352,28 +364,31 @@ def safe_delete_upload(profile_image_url: str | None) -> None:
 
 
 @router.delete("/delete/{user_id}")
-def delete_user(user_id: int):
-    conn = get_conn()
-    cur = conn.cursor()
+async def delete_user(user_id: int):
+    async with adb_conn() as conn:
+        cur = conn.cursor()
 
-    try:
-        # 1) fetch image url first
-        cur.execute("SELECT profile_image_url FROM users WHERE id = %s", (user_id,))
-        row = cur.fetchone()
-        if not row:
-            raise HTTPException(status_code=404, detail="User not found.")
+        try:
+            # 1) fetch image url first
+            await cur.execute("SELECT profile_image_url FROM users WHERE id = %s", (user_id,))
+            row = await cur.fetchone()
+            if not row:
+                raise HTTPException(status_code=404, detail="User not found.")
 
-        profile_image_url = row[0] if not isinstance(row, dict) else row.get("profile_image_url")
+            profile_image_url = row[0] if not isinstance(row, dict) else row.get("profile_image_url")
 
-        # 2) delete db row (may need CASCADE or child deletes first)
-        cur.execute("DELETE FROM users WHERE id = %s", (user_id,))
-        conn.commit()
+            # 2) delete db row (may need CASCADE or child deletes first)
+            await cur.execute("DELETE FROM users WHERE id = %s", (user_id,))
+            await deleted_profile(conn, user_id)
+            await conn.commit()
+            profile_cache.invalidate(user_id)
+            # refresh tokens went with the row; this drops the access tokens still out there
+            revocations.revoke_user(user_id)
 
-        # 3) delete file after commit (or before—either is fine; I prefer after DB success)
-        safe_delete_upload(profile_image_url)
+            # 3) delete file after commit (or before—either is fine; I prefer after DB success)
+            safe_delete_upload(profile_image_url)
 
-        return {"ok": True}
+            return {"ok": True}
 
-    finally:
-        cur.close()
-        conn.close()
\ No newline at end of file
+        finally:
+            await cur.close()
\ No newline at end of file
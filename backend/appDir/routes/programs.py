@@ -0,0 +1,18 @@
+from fastapi import APIRouter, Depends, HTTPException
+
+from appDir.routes.session import authorize_user
+from appDir.services.plan_service import UserNotFound, current_plan
+
+router = APIRouter(prefix="/api/programs", tags=["programs"], dependencies=[Depends(authorize_user)])
+
+
+@router.get("/current/{user_id}")
+async def get_current_plan(user_id: int):
+    """
+    The user's weekly plan. Served from the workouts table; a new plan is only
+    generated (and saved) when their training profile changed since the last one.
+    """
+    try:
+        return await current_plan(user_id)
+    except UserNotFound:
+        raise HTTPException(status_code=404, detail="User not found")
@@ -0,0 +1,34 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+from appDir.routes.session import authorize_user
+from appDir.services import exercise_store
+from appDir.services.plan_service import UserNotFound
+from appDir.services.training_analytics import e1rm_trend, muscle_volume, personal_records
+
+router = APIRouter(prefix="/api/progress", tags=["progress"], dependencies=[Depends(authorize_user)])
+
+
+@router.get("/{user_id}/e1rm/{exercise_id}")
+async def get_e1rm_trend(user_id: int, exercise_id: str, weeks: int = Query(12, ge=1, le=104)):
+    """Best estimated 1RM per week for one exercise, plus the all-time best."""
+    try:
+        return await e1rm_trend(user_id, exercise_id, weeks)
+    except UserNotFound:
+        raise HTTPException(status_code=404, detail="User not found")
+
+
+@router.get("/{user_id}/muscle-volume")
+async def get_muscle_volume(user_id: int, weeks: int = Query(4, ge=1, le=104)):
+    """Sets and volume per muscle per week; secondary muscles count half."""
+    try:
+        return await muscle_volume(user_id, weeks)
+    except UserNotFound:
+        raise HTTPException(status_code=404, detail="User not found")
+
+
+@router.get("/{user_id}/records")
+async def get_records(user_id: int):
+    try:
+        return await personal_records(user_id, exercise_store.snapshot())
+    except UserNotFound:
+        raise HTTPException(status_code=404, detail="User not found")
@@ -0,0 +1,67 @@
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from pydantic import BaseModel
+
+from appDir.core.config import AUTH_REQUIRED
+from appDir.services import session_tokens
+from appDir.services.session_tokens import Session, TokenError, TokenExpired
+
+router = APIRouter(prefix="/api/auth", tags=["auth"])
+
+bearer = HTTPBearer(auto_error=False)
+
+
+class RefreshRequest(BaseModel):
+    refresh_token: str
+
+
+def _unauthorized(detail: str) -> HTTPException:
+    return HTTPException(status_code=401, detail=detail, headers={"WWW-Authenticate": "Bearer"})
+
+
+# async so FastAPI runs them inline instead of on the threadpool; they never block
+async def current_session(credentials: HTTPAuthorizationCredentials | None = Depends(bearer)) -> Session | None:
+    """
+    The verified access token, or None when none was sent and AUTH_REQUIRED is
+    off. Checked in memory only (services/session_tokens.py).
+    """
+    if credentials is None:
+        if AUTH_REQUIRED:
+            raise _unauthorized("Not authenticated")
+        return None
+    try:
+        return session_tokens.verify_access_token(credentials.credentials)
+    except TokenExpired:
+        raise _unauthorized("Token expired")
+    except TokenError:
+        raise _unauthorized("Invalid token")
+
+
+async def authorize_user(user_id: int, session: Session | None = Depends(current_session)) -> Session | None:
+    """For routes with a user_id: a token, when present, has to belong to that user."""
+    if session is not None and session.user_id != user_id:
+        raise HTTPException(status_code=403, detail="Not allowed for this user")
+    return session
+
+
+@router.post("/refresh")
+async def refresh(payload: RefreshRequest):
+    """Trades a refresh token for a new access / refresh pair; each refresh token works once."""
+    try:
+        return await session_tokens.refresh_tokens(payload.refresh_token)
+    except TokenError:
+        raise _unauthorized("Invalid refresh token")
+
+
+@router.post("/logout")
+async def logout(payload: RefreshRequest, credentials: HTTPAuthorizationCredentials | None = Depends(bearer)):
+    """Ends the session: the refresh token, and the access token if one is sent along."""
+    await session_tokens.revoke_refresh_token(payload.refresh_token)
+    if credentials is not None:
+        try:
+            session = session_tokens.verify_access_token(credentials.credentials)
+        except TokenError:
+            session = None
+        if session is not None:
+            session_tokens.revocations.revoke_token(session.jti, session.expires_at)
+    return {"ok": True}
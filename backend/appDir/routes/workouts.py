@@ -0,0 +1,48 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+from appDir.models.workout import SetBatch, WorkoutFeedback
+from appDir.routes.session import authorize_user
+from appDir.services.plan_service import UserNotFound
+from appDir.services.set_logging import UnknownExercises, WorkoutNotFound, log_sets, submit_feedback, training_summary
+
+router = APIRouter(prefix="/api/workouts", tags=["workouts"], dependencies=[Depends(authorize_user)])
+
+
+@router.post("/{user_id}/sets")
+async def post_sets(user_id: int, batch: SetBatch):
+    """
+    Stores a batch of performed sets. Safe to retry: sets whose client_key was
+    already stored are skipped and counted as duplicates. A batch naming an
+    exercise id that isn't in the catalog is rejected whole.
+    """
+    try:
+        return await log_sets(user_id, batch.workout_id, batch.sets)
+    except UnknownExercises as e:
+        raise HTTPException(
+            status_code=422,
+            detail={"message": "Unknown exercise ids", "exercise_ids": e.exercise_ids},
+        )
+    except UserNotFound:
+        raise HTTPException(status_code=404, detail="User not found")
+    except WorkoutNotFound:
+        raise HTTPException(status_code=404, detail="Workout not found")
+
+
+@router.post("/{user_id}/feedback", status_code=201)
+async def post_feedback(user_id: int, feedback: WorkoutFeedback):
+    """Rates one of the user's plans (workout_id from /api/programs/current)."""
+    try:
+        return await submit_feedback(user_id, feedback.workout_id, feedback.rating, feedback.difficulty,
+                                     feedback.notes)
+    except UserNotFound:
+        raise HTTPException(status_code=404, detail="User not found")
+    except WorkoutNotFound:
+        raise HTTPException(status_code=404, detail="Workout not found")
+
+
+@router.get("/{user_id}/summary")
+async def get_training_summary(user_id: int, days: int = Query(7, ge=1, le=365)):
+    try:
+        return await training_summary(user_id, days)
+    except UserNotFound:
+        raise HTTPException(status_code=404, detail="User not found")
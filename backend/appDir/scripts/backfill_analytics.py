@@ -0,0 +1,27 @@
+"""
+Rebuild the progress analytics (weekly exercise / muscle buckets and personal
+records) from the raw sets in workout_sets.
+
+Run from backend/:
+
+    python -m appDir.scripts.backfill_analytics              # rebuild every user
+    python -m appDir.scripts.backfill_analytics --dry-run    # aggregate, don't write
+"""
+import argparse
+import json
+
+from appDir.services.analytics_backfill import backfill_analytics
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=500, help="users locked and rebuilt per transaction")
+    parser.add_argument("--dry-run", action="store_true", help="compute the aggregates but don't replace them")
+    args = parser.parse_args()
+
+    result = backfill_analytics(batch_size=args.batch_size, dry_run=args.dry_run)
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
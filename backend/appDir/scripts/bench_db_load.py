@@ -0,0 +1,122 @@
+"""
+Load test for the DB-backed routes: N concurrent keep-alive clients hammering one
+URL for a fixed duration, reporting throughput and latency percentiles.
+
+Start Postgres + the API (docker compose up), then from backend/:
+
+    python -m appDir.scripts.bench_db_load --clients 500 --duration 15
+    python -m appDir.scripts.bench_db_load --url "http://localhost:8000/api/1"
+
+Plain asyncio sockets so 500+ clients don't need an HTTP client dependency.
+"""
+import argparse
+import asyncio
+import time
+from collections import Counter
+from urllib.parse import urlsplit
+
+DEFAULT_URL = "http://localhost:8000/api/auth/email-exists?email=bench%40example.com"
+
+
+async def read_response(reader: asyncio.StreamReader) -> int:
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError("server closed the connection")
+    status = int(status_line.split()[1])
+
+    length = 0
+    chunked = False
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        name = name.strip().lower()
+        if name == "content-length":
+            length = int(value.strip())
+        elif name == "transfer-encoding" and "chunked" in value.lower():
+            chunked = True
+
+    if chunked:
+        while True:
+            size = int((await reader.readline()).split(b";")[0], 16)
+            await reader.readexactly(size + 2)
+            if size == 0:
+                break
+    elif length:
+        await reader.readexactly(length)
+    return status
+
+
+async def client(host: str, port: int, request: bytes, deadline: float,
+                 latencies: list[float], statuses: Counter):
+    reader = writer = None
+    while time.perf_counter() < deadline:
+        try:
+            if writer is None:
+                reader, writer = await asyncio.open_connection(host, port)
+            start = time.perf_counter()
+            writer.write(request)
+            await writer.drain()
+            status = await read_response(reader)
+            latencies.append(time.perf_counter() - start)
+            statuses[status] += 1
+        except (OSError, ConnectionError, ValueError, asyncio.IncompleteReadError):
+            statuses["conn_error"] += 1
+            if writer is not None:
+                writer.close()
+            reader = writer = None
+            await asyncio.sleep(0.05)
+    if writer is not None:
+        writer.close()
+
+
+def percentile(sorted_values: list[float], p: float) -> float:
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, int(round(p / 100 * (len(sorted_values) - 1))))
+    return sorted_values[idx]
+
+
+async def run(url: str, clients: int, duration: float):
+    parts = urlsplit(url)
+    host = parts.hostname or "localhost"
+    port = parts.port or 80
+    path = parts.path or "/"
+    if parts.query:
+        path += "?" + parts.query
+    request = (
+        f"GET {path} HTTP/1.1\r\nHost: {host}:{port}\r\nConnection: keep-alive\r\n\r\n"
+    ).encode("latin-1")
+
+    latencies: list[float] = []
+    statuses: Counter = Counter()
+    deadline = time.perf_counter() + duration
+
+    started = time.perf_counter()
+    await asyncio.gather(*(
+        client(host, port, request, deadline, latencies, statuses) for _ in range(clients)
+    ))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    print(f"url:        {url}")
+    print(f"clients:    {clients}")
+    print(f"requests:   {len(latencies)} in {elapsed:.1f}s")
+    print(f"throughput: {len(latencies) / elapsed:9.1f} req/s")
+    for p in (50, 95, 99):
+        print(f"p{p}:        {percentile(latencies, p) * 1000:9.1f} ms")
+    print(f"statuses:   {dict(statuses)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default=DEFAULT_URL)
+    parser.add_argument("--clients", type=int, default=500)
+    parser.add_argument("--duration", type=float, default=10.0)
+    args = parser.parse_args()
+    asyncio.run(run(args.url, args.clients, args.duration))
+
+
+if __name__ == "__main__":
+    main()
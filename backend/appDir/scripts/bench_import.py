@@ -0,0 +1,167 @@
+"""
+Exercise importer on a synthetic catalog: the previous importer (json.load +
+execute_batch upsert of every row) vs import_exercises.import_catalog (streamed
+parse, COPY into staging, merge of changed rows only), for
+
+  initial   empty table
+  same      re-import of an unchanged file
+  1% edit   re-import after editing 1% of the rows
+
+Runs in a scratch schema (dropped at the end) of $DATABASE_URL, so the real
+exercises table is never touched.
+
+Run from backend/:  python -m appDir.scripts.bench_import --rows 500000
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import psycopg2
+from psycopg2.extras import execute_batch
+
+from appDir.core.exercise_schema import EXERCISE_SCHEMA
+from appDir.scripts.import_exercises import (
+    content_hash, get_db_url, import_catalog, iter_exercises_json, normalize_exercise,
+)
+
+SCHEMA = "bench_import"
+LEVELS = ["beginner", "intermediate", "expert"]
+CATEGORIES = ["strength", "stretching", "plyometrics", "powerlifting", "cardio"]
+EQUIPMENT = ["barbell", "dumbbell", "cable", "machine", "body only", None]
+MUSCLES = ["chest", "lats", "quadriceps", "hamstrings", "glutes", "shoulders", "biceps", "triceps"]
+
+# the importer before COPY / change detection, kept here for comparison
+LEGACY_SQL = """
+INSERT INTO exercises (
+  id, name, level, category, equipment, force, mechanic, primary_muscles, secondary_muscles,
+  content_hash, added_version, changed_version
+)
+VALUES (
+  %(id)s, %(name)s, %(level)s, %(category)s, %(equipment)s, %(force)s, %(mechanic)s,
+  %(primary_muscles)s, %(secondary_muscles)s, %(content_hash)s, 1, 1
+)
+ON CONFLICT (id) DO UPDATE SET
+  name = EXCLUDED.name,
+  level = EXCLUDED.level,
+  category = EXCLUDED.category,
+  equipment = EXCLUDED.equipment,
+  force = EXCLUDED.force,
+  mechanic = EXCLUDED.mechanic,
+  primary_muscles = EXCLUDED.primary_muscles,
+  secondary_muscles = EXCLUDED.secondary_muscles,
+  content_hash = EXCLUDED.content_hash;
+"""
+
+
+def make_catalog(n: int, seed: int = 11) -> list[dict]:
+    rng = random.Random(seed)
+    return [
+        {
+            "name": f"Synthetic Exercise {i}",
+            "force": rng.choice(["push", "pull", "static", None]),
+            "level": rng.choice(LEVELS),
+            "mechanic": rng.choice(["compound", "isolation", None]),
+            "equipment": rng.choice(EQUIPMENT),
+            "primaryMuscles": rng.sample(MUSCLES, 1),
+            "secondaryMuscles": rng.sample(MUSCLES, rng.randint(0, 3)),
+            "instructions": [f"Step {k} of exercise {i}, keep your core tight." for k in range(rng.randint(2, 6))],
+            "category": rng.choice(CATEGORIES),
+            "images": [f"Synthetic_{i}/0.jpg", f"Synthetic_{i}/1.jpg"],
+            "id": f"Synthetic_{i:07d}",
+        }
+        for i in range(n)
+    ]
+
+
+def write(path: Path, exercises: list[dict]) -> None:
+    with path.open("w", encoding="utf-8") as f:
+        json.dump(exercises, f, indent=2)
+
+
+def legacy_import(conn, path: Path) -> None:
+    with path.open("r", encoding="utf-8") as f:
+        raw = json.load(f)
+    rows = []
+    for r in raw:
+        ex = normalize_exercise(r)
+        ex["content_hash"] = content_hash(r)
+        rows.append(ex)
+    with conn.cursor() as cur:
+        execute_batch(cur, LEGACY_SQL, rows, page_size=500)
+    conn.commit()
+
+
+def reset_schema(conn) -> None:
+    with conn.cursor() as cur:
+        cur.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        cur.execute(f"CREATE SCHEMA {SCHEMA}")
+        # unqualified, so the tables land in the scratch schema (first on the search path)
+        for statement in EXERCISE_SCHEMA:
+            cur.execute(statement)
+    conn.commit()
+
+
+def timed(fn, *args) -> float:
+    start = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - start
+
+
+def parse_peak_mb(path: Path, streamed: bool) -> float:
+    tracemalloc.start()
+    if streamed:
+        for _ in iter_exercises_json(path):
+            pass
+    else:
+        with path.open("r", encoding="utf-8") as f:
+            json.load(f)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak / 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=500000)
+    parser.add_argument("--changed", type=float, default=0.01, help="fraction of rows edited for the last round")
+    args = parser.parse_args()
+
+    exercises = make_catalog(args.rows)
+    conn = psycopg2.connect(get_db_url(), options=f"-c search_path={SCHEMA}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        base, edited = Path(tmp) / "base.json", Path(tmp) / "edited.json"
+        write(base, exercises)
+        rng = random.Random(3)
+        for i in rng.sample(range(args.rows), int(args.rows * args.changed)):
+            exercises[i]["level"] = "expert" if exercises[i]["level"] != "expert" else "beginner"
+        write(edited, exercises)
+        print(f"{args.rows} rows, {os.path.getsize(base) / 1e6:.1f} MB of json")
+
+        results = {}
+        for name, fn in (("legacy", legacy_import), ("copy+merge", import_catalog)):
+            reset_schema(conn)
+            results[name] = [timed(fn, conn, base), timed(fn, conn, base), timed(fn, conn, edited)]
+
+        print(f"{'':12} {'initial':>9} {'same':>9} {'1% edit':>9}")
+        for name, times in results.items():
+            print(f"{name:12} " + " ".join(f"{t:8.2f}s" for t in times))
+        legacy, new = results["legacy"], results["copy+merge"]
+        print(f"{'speedup':12} " + " ".join(f"{a / b:8.1f}x" for a, b in zip(legacy, new)))
+
+        print(f"parse peak memory: json.load {parse_peak_mb(base, False):.0f} MB, "
+              f"streamed {parse_peak_mb(base, True):.1f} MB")
+
+    with conn.cursor() as cur:
+        cur.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+    conn.commit()
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Memory held by the exercise catalog: the old list-of-dicts vs ExerciseStore vs
+the mmapped compiled catalog (built first if it's missing).
+
+Each variant loads in a fresh interpreter and reports the Python heap it keeps
+(tracemalloc) and the process RSS growth after loading.
+
+Run from backend/:  python -m appDir.scripts.bench_memory
+"""
+import gc
+import json
+import os
+import subprocess
+import sys
+import tracemalloc
+
+DATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data", "exercises.json")
+
+
+def rss_kb() -> int:
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+    return 0
+
+
+def load(variant: str):
+    from appDir.services.exercise_catalog import CatalogExercises, CatalogFile
+    from appDir.services.exercise_store import CATALOG_PATH, ExerciseStore
+
+    if variant == "dicts":
+        with open(DATA_PATH, "r", encoding="utf-8") as f:
+            return json.load(f)
+    if variant == "catalog":
+        # mapped pages live in the page cache and are shared by all workers
+        return CatalogExercises(CatalogFile(CATALOG_PATH))
+    store, parsed, raw = ExerciseStore.from_file(DATA_PATH)
+    del parsed, raw  # load_exercise_data drops these once the indexes are built
+    return store
+
+
+def trim():
+    # hand freed arenas back to the OS so RSS shows what's retained, not the load peak
+    try:
+        import ctypes
+        ctypes.CDLL("libc.so.6").malloc_trim(0)
+    except (OSError, AttributeError):
+        pass
+
+
+def measure(variant: str) -> dict:
+    import appDir.services.exercise_store  # noqa: F401  (imports out of the measurement)
+
+    # rss first, in a fresh process; tracemalloc's own bookkeeping would skew it
+    gc.collect()
+    trim()
+    rss_before = rss_kb()
+    data = load(variant)
+    gc.collect()
+    trim()
+    rss_after = rss_kb()
+    del data
+    gc.collect()
+
+    # heap: what the loaded catalog keeps alive
+    tracemalloc.start()
+    data = load(variant)
+    gc.collect()
+    heap, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    assert len(data) > 0
+    return {"heap_kb": heap // 1024, "rss_kb": rss_after - rss_before}
+
+
+def main():
+    if len(sys.argv) == 3 and sys.argv[1] == "--child":
+        print(json.dumps(measure(sys.argv[2])))
+        return
+
+    from appDir.services.exercise_store import CATALOG_PATH, compile_exercise_catalog
+
+    if not os.path.exists(CATALOG_PATH):
+        compile_exercise_catalog()
+
+    results = {}
+    for variant in ("dicts", "store", "catalog"):
+        out = subprocess.run(
+            [sys.executable, "-m", "appDir.scripts.bench_memory", "--child", variant],
+            check=True, capture_output=True, text=True,
+        )
+        results[variant] = json.loads(out.stdout.strip().splitlines()[-1])
+
+    for variant, r in results.items():
+        print(f"{variant:7s} heap: {r['heap_kb']:7d} KiB   rss growth: {r['rss_kb']:7d} KiB")
+    for variant in ("store", "catalog"):
+        saved = 1 - results[variant]["heap_kb"] / results["dicts"]["heap_kb"]
+        print(f"{variant} heap saved vs dicts: {saved:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Plan generation throughput (plans/second) for a synthetic cohort: one
+generate_plan + json.dumps per user, the way a per-user loop would do it,
+vs plan_rollout.plan_rows, which generates each distinct profile once.
+
+Run from backend/:  python -m appDir.scripts.bench_plans --users 50000
+"""
+import argparse
+import json
+import random
+import time
+
+from appDir.services import exercise_store, workout_generator
+from appDir.services.plan_rollout import plan_rows
+from appDir.services.plan_service import plan_inputs
+
+# the option values the signup/profile forms send
+LEVELS = ["beginner", "intermediate", "advanced"]
+VOLUMES = ["1-2", "3-4", "5-6", "7"]
+GOALS = ["strength", "weight_loss", "flexibility", "stamina", "health", "muscle"]
+EQUIPMENT = ["gym", "home_full", "home_basic", "bodyweight", "minimal"]
+SESSION_MINUTES = [20, 30, 45, 60, 75, 90, 120, 150]
+
+
+def make_cohort(n: int, seed: int = 7) -> list[dict]:
+    rng = random.Random(seed)
+    return [
+        {
+            "id": i,
+            "experience_level": rng.choice(LEVELS),
+            "workout_volume": rng.choice(VOLUMES),
+            "goals": rng.sample(GOALS, rng.randint(1, 3)),
+            "equipment": rng.choice(EQUIPMENT),
+            "session_length_minutes": rng.choice(SESSION_MINUTES),
+            "plan_key": None,
+        }
+        for i in range(n)
+    ]
+
+
+def per_user(cohort: list[dict]) -> list[tuple[int, str]]:
+    out = []
+    for p in cohort:
+        split, _ = workout_generator.assign_split(
+            p["experience_level"], p["workout_volume"], p["goals"], p["equipment"], user_id=p["id"])
+        plan = workout_generator.generate_plan(*plan_inputs(
+            p["experience_level"], p["workout_volume"], p["goals"], p["equipment"],
+            p["session_length_minutes"]), split=split)
+        out.append((p["id"], json.dumps(plan, separators=(",", ":"))))
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=50000)
+    args = parser.parse_args()
+
+    exercise_store.load_exercise_data()
+    cohort = make_cohort(args.users)
+
+    start = time.perf_counter()
+    expected = per_user(cohort)
+    naive = time.perf_counter() - start
+
+    start = time.perf_counter()
+    seen: dict[tuple, tuple[str, str]] = {}
+    rows = plan_rows(cohort, seen)
+    batched = time.perf_counter() - start
+
+    if [(uid, plan) for uid, plan, _, _ in rows] != expected:
+        raise AssertionError("batched plans differ from per-user plans")
+
+    print(f"users:            {args.users} ({len(seen)} distinct profiles)")
+    print(f"per-user:         {args.users / naive:12.0f} plans/s")
+    print(f"batched:          {args.users / batched:12.0f} plans/s")
+    print(f"speedup:          {naive / batched:12.1f}x")
+
+
+if __name__ == "__main__":
+    main()
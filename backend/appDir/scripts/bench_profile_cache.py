@@ -0,0 +1,115 @@
+"""
+Profile reads through services/profile_cache.py: load_profile latency with the
+cache listening vs every read going to the database, and the hit ratio for a
+skewed access pattern (a few users load their profile far more often than the
+rest). Then the multi-worker path: a second ProfileCache with its own listener
+stands in for another uvicorn worker, a profile write goes through
+changed_profile() the way routes/profile.py does it, and the script checks that
+the other cache drops its copy, how long the notification took, and that a
+stale row read before the write is refused afterwards.
+
+Needs a database with init_db() applied. Creates bench users (email
+bench-sets-*@example.com) and deletes them afterwards.
+
+Run from backend/:  python -m appDir.scripts.bench_profile_cache --users 2000 --reads 20000
+"""
+import argparse
+import asyncio
+import random
+import sys
+import time
+
+from appDir.core.async_db import adb_conn, close_async_pool, execute, fetch_one, open_async_pool
+from appDir.scripts.bench_db_load import percentile
+from appDir.scripts.bench_sets import create_users, drop_users
+from appDir.services import profile_cache as pc
+from appDir.services.profile_cache import PROFILE_SQL, ProfileCache, changed_profile, listen, load_profile
+
+
+async def timed_reads(user_ids: list[int]) -> tuple[float, float]:
+    latencies = []
+    for uid in user_ids:
+        start = time.perf_counter()
+        assert await load_profile(uid) is not None
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    return sum(latencies) / len(latencies), percentile(latencies, 99)
+
+
+async def wait_listening(*caches: ProfileCache) -> None:
+    while not all(c.listening for c in caches):
+        await asyncio.sleep(0.01)
+
+
+def us(pair) -> str:
+    return f"{pair[0] * 1e6:8.1f} us  (p99 {pair[1] * 1e6:8.1f} us)"
+
+
+async def main_async(args) -> bool:
+    await open_async_pool()
+    other = ProfileCache(args.users, pc.profile_cache.ttl)
+    tasks = []
+    try:
+        await drop_users()
+        users = await create_users(args.users)
+        rng = random.Random(7)
+        weights = [1 / (rank + 1) ** args.skew for rank in range(len(users))]
+        reads = rng.choices(users, weights=weights, k=args.reads)
+
+        print(f"{args.users} users, {args.reads} reads, skew {args.skew}")
+        print(f"database every read:  {us(await timed_reads(reads))}")
+
+        tasks = [asyncio.create_task(listen(pc.profile_cache)), asyncio.create_task(listen(other))]
+        await wait_listening(pc.profile_cache, other)
+        before = pc.profile_cache.stats()
+        cached = await timed_reads(reads)
+        stats = pc.profile_cache.stats()
+        hits = stats["hits"] + stats["shared_hits"] - before["hits"] - before["shared_hits"]
+        print(f"cached:               {us(cached)}  hit rate {hits / len(reads):.1%}, {stats['entries']} entries")
+
+        # another worker holds the row; this one changes it
+        uid = reads[0]
+        async with adb_conn() as conn:
+            stale = await fetch_one(conn, PROFILE_SQL, (uid,))
+        other.put(stale)
+        assert other.get(uid) is not None
+        async with adb_conn() as conn:
+            await execute(conn, "UPDATE users SET name = 'renamed', profile_version = profile_version + 1 WHERE id = %s",
+                          (uid,))
+            row = await changed_profile(conn, uid)
+        committed = time.perf_counter()
+        pc.profile_cache.put(row)
+
+        while other.get(uid) is not None and time.perf_counter() - committed < 5:
+            await asyncio.sleep(0.0005)
+        dropped = other.get(uid) is None
+        print(f"other worker dropped the old row: {dropped}, {(time.perf_counter() - committed) * 1e3:.1f} ms after commit")
+
+        other.put(stale)
+        refused = other.get(uid) is None
+        print(f"stale row put after the write refused: {refused}")
+        fresh = await load_profile(uid)
+        own = fresh is row and fresh["name"] == "renamed"
+        print(f"writer serves its written-through row: {own}")
+        return dropped and refused and own
+    finally:
+        for t in tasks:
+            t.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await drop_users()
+        await close_async_pool()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--reads", type=int, default=20000)
+    parser.add_argument("--skew", type=float, default=1.1, help="zipf exponent of the access pattern")
+    args = parser.parse_args()
+    if not asyncio.run(main_async(args)):
+        sys.exit("FAIL: the cache served or kept a stale profile")
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+"""
+Times schedule_builder.SCHEDULES lookups against building the week. The weeks
+themselves are checked against their rest rules in tests/test_schedules.py.
+
+Run from backend/:  python -m appDir.scripts.bench_schedules
+"""
+import time
+
+from appDir.core.splits import SPLITS
+from appDir.services.schedule_builder import SCHEDULES, build_week, week_for
+
+
+def main(rounds: int = 20000):
+    combos = list(SCHEDULES)
+    start = time.perf_counter()
+    for i in range(rounds):
+        split_name, days, rule = combos[i % len(combos)]
+        build_week(SPLITS[split_name]["sessions"], days, rule)
+    built = (time.perf_counter() - start) / rounds
+
+    start = time.perf_counter()
+    for i in range(rounds):
+        split_name, days, rule = combos[i % len(combos)]
+        week_for(split_name, days, rule)
+    looked_up = (time.perf_counter() - start) / rounds
+
+    print(f"build_week:          {built * 1e6:7.2f} us/week")
+    print(f"table lookup + copy: {looked_up * 1e6:7.2f} us/week")
+    print(f"speedup:             {built / looked_up:7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Per-query latency of /api/exercises/search: old linear scan vs the inverted index.
+
+Run from backend/:  python -m appDir.scripts.bench_search
+"""
+import time
+
+from appDir.services import exercise_store
+
+QUERIES = [
+    {"q": "press"},
+    {"q": "curl", "equipment": "dumbbell"},
+    {"q": "b"},
+    {"q": "be"},
+    {"q": "squat", "muscle": "quadriceps"},
+    {"q": "starting position"},
+    {"muscle": "biceps"},
+    {"muscle": "chest", "equipment": "barbell", "category": "strength"},
+    {"category": "stretch"},
+    {"q": "zzzz"},
+    {"q": "pull", "muscle": "lats", "equipment": "cable"},
+]
+
+
+def linear_scan(exercises, q="", muscle="", equipment="", category="", limit=20):
+    # the pre-index implementation, kept here as the reference for correctness
+    results = []
+    for i, ex in enumerate(exercises):
+        match = True
+
+        if q:
+            name_match = q in ex.get("name", "").lower()
+            inst_match = any(q in inst.lower() for inst in ex.get("instructions", []))
+            if not (name_match or inst_match):
+                match = False
+
+        if muscle and match:
+            primary = [m.lower() for m in ex.get("primaryMuscles", [])]
+            secondary = [m.lower() for m in ex.get("secondaryMuscles", [])]
+            if muscle not in primary and muscle not in secondary:
+                match = False
+
+        if equipment and match:
+            if equipment not in (ex.get("equipment") or "").lower():
+                match = False
+
+        if category and match:
+            if category not in (ex.get("category") or "").lower():
+                match = False
+
+        if match:
+            results.append(i)
+            if len(results) >= limit:
+                break
+    return results
+
+
+def time_per_query(fn, rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for params in QUERIES:
+            fn(**params)
+    return (time.perf_counter() - start) / (rounds * len(QUERIES))
+
+
+def main(rounds: int = 200):
+    catalog = exercise_store.load_exercise_data()
+    # plain dicts for the reference scan, like the old list-of-dicts store
+    exercises = list(catalog.exercises)
+    index = catalog.search_index
+
+    for params in QUERIES:
+        for limit in (20, 200):
+            expected = linear_scan(exercises, limit=limit, **params)
+            got = index.search(limit=limit, **params)
+            if expected != got:
+                raise AssertionError(f"index mismatch for {params} limit={limit}")
+
+    before = time_per_query(lambda **p: linear_scan(exercises, **p), rounds)
+    after = time_per_query(lambda **p: index.search(**p), rounds)
+
+    print(f"linear scan: {before * 1e6:9.1f} us/query")
+    print(f"index:       {after * 1e6:9.1f} us/query")
+    print(f"speedup:     {before / after:9.1f}x")
+
+    bench_relevance(catalog, rounds)
+
+
+# sort=relevance; misspelled / run-together queries the substring search can't match
+RANKED_QUERIES = [
+    "bench press", "benchpress", "dumbel curl", "barbel squat", "tricep pushdwn",
+    "lat pull", "romanian deadlift", "hamer curl", "pu", "squ", "starting position",
+    "kettlebell swing", "zzzz",
+]
+
+
+def bench_relevance(catalog, rounds: int):
+    ranked = catalog.ranked_index
+    bits = catalog.search_index.filter_bits(equipment="dumbbell")
+
+    for q in ("benchpress", "dumbel curl", "tricep pushdwn"):
+        top = [catalog.exercises[i]["name"] for i, _ in ranked.search(q, limit=3)]
+        print(f"  {q!r:18} -> {top}")
+
+    timings = []
+    for _ in range(max(1, rounds // 10)):
+        for q in RANKED_QUERIES:
+            for allowed in (None, bits):
+                start = time.perf_counter()
+                ranked.search(q, allowed_bits=allowed, limit=20)
+                timings.append(time.perf_counter() - start)
+    timings.sort()
+
+    def pct(p):
+        return timings[min(len(timings) - 1, int(p / 100 * len(timings)))] * 1e6
+
+    print(f"relevance:   {pct(50):9.1f} us p50 {pct(99):9.1f} us p99")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Exercise selection throughput: 10k full plans (schedule + exercises for every
+session) for random profiles and seeds, with a determinism and coverage check.
+
+Run from backend/:  python -m appDir.scripts.bench_selection --plans 10000
+"""
+import argparse
+import random
+import time
+
+from appDir.services import exercise_selector, exercise_store
+from appDir.services.workout_generator import generate_plan
+from appDir.scripts.bench_plans import EQUIPMENT, GOALS, LEVELS, SESSION_MINUTES, VOLUMES
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--plans", type=int, default=10000)
+    args = parser.parse_args()
+
+    catalog = exercise_store.load_exercise_data()
+
+    start = time.perf_counter()
+    exercise_selector.SelectionPools(catalog)
+    pools_ms = (time.perf_counter() - start) * 1000
+
+    rng = random.Random(11)
+    profiles = [
+        (rng.choice(LEVELS), rng.choice(VOLUMES), rng.sample(GOALS, 2), rng.choice(EQUIPMENT),
+         rng.choice(SESSION_MINUTES), rng.getrandbits(32))
+        for _ in range(args.plans)
+    ]
+
+    start = time.perf_counter()
+    plans = [generate_plan(*p) for p in profiles]
+    elapsed = time.perf_counter() - start
+
+    for p, plan in zip(profiles[:200], plans):
+        if generate_plan(*p) != plan:
+            raise AssertionError(f"selection is not deterministic for {p}")
+
+    sessions = [d for plan in plans for d in plan["week"] if d["type"] == "train"]
+    short = 0
+    for plan, p in zip(plans, profiles):
+        want = exercise_selector.exercises_per_session(p[4])
+        short += sum(len(d["exercises"]) < want for d in plan["week"] if d["type"] == "train")
+    picked = sum(len(d["exercises"]) for d in sessions)
+
+    print(f"pool build:     {pools_ms:8.1f} ms (once per catalog version)")
+    print(f"plans:          {args.plans} in {elapsed:.2f}s")
+    print(f"throughput:     {args.plans / elapsed:8.0f} plans/s")
+    print(f"per plan:       {elapsed / args.plans * 1e6:8.1f} us")
+    print(f"sessions:       {len(sessions)}, {picked / len(sessions):.1f} exercises each, {short} under target")
+
+
+if __name__ == "__main__":
+    main()
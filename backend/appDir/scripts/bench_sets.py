@@ -0,0 +1,190 @@
+"""
+Set ingestion throughput: concurrent callers of set_logging.log_sets sending
+pre-built batches for synthetic users (one INSERT ... unnest statement per
+batch), then the same batches again to measure replay handling. Checks at the end
+that the rolled-up totals match the raw rows, and that the incrementally kept
+progress analytics match analytics_backfill's recompute from those rows.
+
+Needs a database with init_db() applied. Creates bench users (email
+bench-sets-*@example.com) and deletes them, with their sets, afterwards.
+
+Run from backend/:  python -m appDir.scripts.bench_sets --sets 100000 --batch 30 --workers 8 [--exercises 6]
+"""
+import argparse
+import asyncio
+import random
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from appDir.core.async_db import adb_conn, close_async_pool, fetch_all, fetch_one, open_async_pool, pool_stats
+from appDir.models.workout import LoggedSet
+from appDir.scripts.bench_db_load import percentile
+from appDir.services import exercise_store
+from appDir.services.analytics_backfill import SETS_COLUMNS, aggregate, shares_frame
+from appDir.services.set_logging import log_sets
+
+USER_EMAIL = "bench-sets-{}@example.com"
+
+
+async def create_users(n: int) -> list[int]:
+    async with adb_conn() as conn:
+        rows = await fetch_all(
+            conn,
+            """
+            INSERT INTO users (email, name, password_hash, age, height, weight,
+                               experience_level, workout_volume, goals, equipment)
+            SELECT format(%s, g), 'bench', 'x', 30, '180', 80, 'intermediate', '3-4', '["strength"]', 'gym'
+            FROM generate_series(1, %s) AS g
+            RETURNING id
+            """,
+            (USER_EMAIL.format("%s"), n),
+        )
+    return [r["id"] for r in rows]
+
+
+async def drop_users() -> None:
+    async with adb_conn() as conn:
+        await fetch_one(conn, "DELETE FROM users WHERE email LIKE %s RETURNING 1", (USER_EMAIL.format("%"),))
+
+
+def make_batch(rng: random.Random, exercise_ids: list[str], size: int, per_batch: int = 0) -> list[LoggedSet]:
+    """A session of `size` sets; spread over `per_batch` exercises, or a random exercise per set if 0."""
+    start = datetime.now(timezone.utc) - timedelta(days=rng.randint(0, 60))
+    session = rng.sample(exercise_ids, per_batch) if per_batch else None
+    return [
+        LoggedSet(
+            exercise_id=session[k * per_batch // size] if session else rng.choice(exercise_ids),
+            reps=rng.randint(3, 15),
+            weight=round(rng.uniform(10, 150), 1),
+            rpe=rng.choice([None, 7, 8, 9]),
+            performed_at=start + timedelta(minutes=3 * k),
+            client_key=uuid.uuid4().hex,
+        )
+        for k in range(size)
+    ]
+
+
+async def ingest(batches: list, workers: int) -> tuple[float, int, int, list[float]]:
+    """Sends every (user_id, batch) with `workers` concurrent callers."""
+    queue = list(reversed(batches))
+    latencies: list[float] = []
+    inserted = duplicates = 0
+
+    async def one():
+        nonlocal inserted, duplicates
+        while queue:
+            user_id, batch = queue.pop()
+            t = time.perf_counter()
+            result = await log_sets(user_id, None, batch)
+            latencies.append(time.perf_counter() - t)
+            inserted += result["inserted"]
+            duplicates += result["duplicates"]
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(workers)))
+    latencies.sort()
+    return time.perf_counter() - start, inserted, duplicates, latencies
+
+
+async def check_analytics(users: list[int]) -> bool:
+    """The incremental analytics tables vs a pandas recompute from workout_sets."""
+    import numpy as np
+    import pandas as pd
+
+    async with adb_conn() as conn:
+        raw = await fetch_all(
+            conn, f"SELECT {', '.join(SETS_COLUMNS)} FROM workout_sets WHERE user_id = ANY(%s)", (users,)
+        )
+        expected = aggregate(pd.DataFrame(raw, columns=SETS_COLUMNS), shares_frame(exercise_store.snapshot()))
+        ok = True
+        for table, frame in expected.items():
+            keys = [c for c in frame.columns if c in ("user_id", "exercise_id", "muscle", "week")]
+            stored = pd.DataFrame(
+                await fetch_all(conn, f"SELECT {', '.join(frame.columns)} FROM {table} WHERE user_id = ANY(%s)",
+                                (users,)),
+                columns=frame.columns,
+            )
+            a = frame.sort_values(keys).reset_index(drop=True)
+            b = stored.sort_values(keys).reset_index(drop=True)
+            same = len(a) == len(b)
+            for col in frame.columns if same else ():
+                x, y = a[col], b[col]
+                if col.endswith("_at"):
+                    x, y = pd.to_datetime(x, utc=True), pd.to_datetime(y, utc=True)
+                    equal = ((x == y) | (x.isna() & y.isna())).all()
+                elif x.dtype.kind == "f" or y.dtype.kind == "f":
+                    equal = np.allclose(x.astype(float), y.astype(float), rtol=1e-5, equal_nan=True)
+                else:
+                    equal = (x.astype(object) == y.astype(object)).all()
+                if not equal:
+                    print(f"  {table}.{col} differs")
+                    same = False
+            print(f"  {table}: {len(b)} rows, match recompute: {same}")
+            ok = ok and same
+    return ok
+
+
+async def main_async(args):
+    exercise_store.load_exercise_data()
+    exercise_ids = [ex["id"] for ex in exercise_store.snapshot().exercises]
+    await open_async_pool()
+    try:
+        await drop_users()
+        users = await create_users(args.users)
+
+        # built up front so the timing is the database path, not pydantic / uuid
+        rng = random.Random(7)
+        batches = [
+            (rng.choice(users), make_batch(rng, exercise_ids, args.batch, args.exercises))
+            for _ in range(args.sets // args.batch)
+        ]
+
+        elapsed, inserted, _, latencies = await ingest(batches, args.workers)
+        print(f"ingest: {inserted} sets in {len(batches)} batches of {args.batch}, {elapsed:.1f}s "
+              f"-> {inserted / elapsed:,.0f} sets/s ({len(batches) / elapsed:,.0f} batches/s)")
+        print(f"  batch latency p50 {percentile(latencies, 50) * 1000:.1f} ms, "
+              f"p99 {percentile(latencies, 99) * 1000:.1f} ms")
+
+        elapsed, _, duplicates, _ = await ingest(batches, args.workers)
+        print(f"replay: {duplicates} duplicate sets skipped in {elapsed:.1f}s "
+              f"-> {duplicates / elapsed:,.0f} sets/s")
+
+        async with adb_conn() as conn:
+            raw = await fetch_one(
+                conn,
+                "SELECT COUNT(*) AS sets, SUM(reps) AS reps FROM workout_sets WHERE user_id = ANY(%s)",
+                (users,),
+            )
+            rolled = await fetch_one(
+                conn,
+                "SELECT SUM(sets) AS sets, SUM(reps) AS reps FROM user_training_totals WHERE user_id = ANY(%s)",
+                (users,),
+            )
+            days = await fetch_one(
+                conn,
+                "SELECT SUM(sets) AS sets FROM user_training_days WHERE user_id = ANY(%s)",
+                (users,),
+            )
+        ok = raw["sets"] == rolled["sets"] == days["sets"] == inserted and raw["reps"] == rolled["reps"]
+        print(f"rollups match raw rows: {ok} (raw {raw['sets']}, totals {rolled['sets']}, days {days['sets']})")
+        print(f"analytics match backfill recompute: {await check_analytics(users)}")
+        print(f"pool: {pool_stats()}")
+    finally:
+        await drop_users()
+        await close_async_pool()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--batch", type=int, default=30)
+    parser.add_argument("--sets", type=int, default=100000)
+    parser.add_argument("--exercises", type=int, default=0,
+                        help="exercises per batch, like a real session; 0 picks one at random per set")
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Latency of "similar exercises": a pure-Python cosine scan over the feature rows
+vs the numpy index, one query at a time and batched.
+
+Run from backend/:  python -m appDir.scripts.bench_similarity
+"""
+import math
+import random
+import time
+
+from appDir.services import exercise_store
+from appDir.services.exercise_similarity import SimilarityIndex
+
+
+def python_scan(rows: list[list[float]], i: int, k: int) -> list[int]:
+    # reference: score every row with plain floats, drop the query, take the best k
+    q = rows[i]
+    scores = []
+    for j, row in enumerate(rows):
+        if j != i:
+            scores.append((sum(a * b for a, b in zip(q, row)), j))
+    scores.sort(key=lambda s: (-s[0], s[1]))
+    return [j for _, j in scores[:k]]
+
+
+def percentile(values: list[float], p: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))]
+
+
+def main(queries: int = 500, k: int = 10):
+    catalog = exercise_store.load_exercise_data()
+
+    start = time.perf_counter()
+    index = SimilarityIndex(catalog)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    rows = index.matrix.tolist()
+    rng = random.Random(3)
+    picks = [rng.randrange(len(index)) for _ in range(queries)]
+
+    # same top-k scores as the reference (ids can differ only between float32 ties)
+    for i in picks[:50]:
+        got = [s for _, s in index.similar_batch([i], k)[0]]
+        want = [sum(a * b for a, b in zip(rows[i], rows[j])) for j in python_scan(rows, i, k)]
+        assert all(math.isclose(g, w, abs_tol=1e-5) for g, w in zip(got, want)), i
+
+    def timed(fn) -> list[float]:
+        out = []
+        for i in picks:
+            t = time.perf_counter()
+            fn(i)
+            out.append(time.perf_counter() - t)
+        return out
+
+    scan = timed(lambda i: python_scan(rows, i, k))
+    single = timed(lambda i: index.similar_batch([i], k))
+    filtered = timed(lambda i: index.similar_batch([i], k, equipment=["dumbbell", "body only"]))
+
+    start = time.perf_counter()
+    for b in range(0, queries, 64):
+        index.similar_batch(picks[b:b + 64], k)
+    batched = (time.perf_counter() - start) / queries
+
+    print(f"index build:        {build_ms:8.1f} ms ({index.matrix.shape[0]} x {index.matrix.shape[1]})")
+    for name, values in (("python scan", scan), ("numpy", single), ("numpy + equipment", filtered)):
+        print(f"{name:18s}  p50 {percentile(values, 50) * 1e6:8.1f} us   p99 {percentile(values, 99) * 1e6:8.1f} us")
+    print(f"numpy batch of 64:  {batched * 1e6:8.1f} us/query")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Autocomplete benchmark. Replays typing every exercise name one keystroke at a
+time against the suggest index in-process, and with --url drives a running API
+at a fixed request rate (open loop, default 1000 req/s) to check latency holds.
+
+Run from backend/:
+
+    python -m appDir.scripts.bench_suggest
+    python -m appDir.scripts.bench_suggest --url http://localhost:8000 --rate 1000 --duration 10
+"""
+import argparse
+import asyncio
+import time
+from collections import Counter
+from urllib.parse import quote, urlsplit
+
+from appDir.scripts.bench_db_load import percentile, read_response
+from appDir.services import exercise_store
+
+
+def keystrokes(names: list[str], limit: int = 4000) -> list[str]:
+    out = []
+    for name in names:
+        for n in range(1, min(len(name), 14) + 1):
+            out.append(name[:n])
+            if len(out) >= limit:
+                return out
+    return out
+
+
+def bench_in_process(catalog, prefixes: list[str]):
+    index = catalog.suggest_index
+
+    timings = []
+    for q in prefixes:
+        start = time.perf_counter()
+        index.suggest(q, 8)
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+
+    print(f"index:      {len(index)} keys, {len(index.top)} precomputed prefixes")
+    print(f"in-process: {len(prefixes)} keystrokes, p50 {percentile(timings, 50) * 1e6:.1f} us, "
+          f"p99 {percentile(timings, 99) * 1e6:.1f} us")
+
+
+async def worker(host, port, queue: asyncio.Queue, latencies: list[float], statuses: Counter):
+    reader = writer = None
+    while True:
+        item = await queue.get()
+        if item is None:
+            break
+        path, scheduled = item
+        try:
+            if writer is None:
+                reader, writer = await asyncio.open_connection(host, port)
+            writer.write(f"GET {path} HTTP/1.1\r\nHost: {host}\r\nConnection: keep-alive\r\n\r\n".encode("latin-1"))
+            await writer.drain()
+            statuses[await read_response(reader)] += 1
+            # from when the request was due, so queueing delay counts too
+            latencies.append(time.perf_counter() - scheduled)
+        except (OSError, ConnectionError, ValueError, asyncio.IncompleteReadError):
+            statuses["conn_error"] += 1
+            if writer is not None:
+                writer.close()
+            reader = writer = None
+    if writer is not None:
+        writer.close()
+
+
+async def bench_http(url: str, prefixes: list[str], rate: float, duration: float, connections: int):
+    parts = urlsplit(url)
+    host, port = parts.hostname or "localhost", parts.port or 80
+    queue: asyncio.Queue = asyncio.Queue()
+    latencies: list[float] = []
+    statuses: Counter = Counter()
+    workers = [asyncio.create_task(worker(host, port, queue, latencies, statuses)) for _ in range(connections)]
+
+    start = time.perf_counter()
+    sent = 0
+    while (now := time.perf_counter()) - start < duration:
+        due = int((now - start) * rate)
+        while sent < due:
+            q = prefixes[sent % len(prefixes)]
+            queue.put_nowait((f"/api/exercises/suggest?q={quote(q)}", time.perf_counter()))
+            sent += 1
+        await asyncio.sleep(0.001)
+    for _ in workers:
+        queue.put_nowait(None)
+    await asyncio.gather(*workers)
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    print(f"http:       {sent} requests at {rate:.0f}/s target, {len(latencies) / elapsed:.0f}/s completed")
+    for p in (50, 95, 99):
+        print(f"  p{p}:      {percentile(latencies, p) * 1000:8.2f} ms")
+    print(f"  statuses: {dict(statuses)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="base URL of a running API, e.g. http://localhost:8000")
+    parser.add_argument("--rate", type=float, default=1000.0)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--connections", type=int, default=64)
+    args = parser.parse_args()
+
+    catalog = exercise_store.load_exercise_data()
+    prefixes = keystrokes([ex["name"] for ex in catalog.exercises])
+    bench_in_process(catalog, prefixes)
+    if args.url:
+        asyncio.run(bench_http(args.url, prefixes, args.rate, args.duration, args.connections))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Cost of authenticating a request with session tokens: access token verification
+(signature, claims, revocation list) and the authorize_user dependency, vs
+looking the user up in the database, which is what a stateful session would
+cost on every request. Also: the signature check with a fresh hmac per call instead of
+the cached key objects, and the revocation list when it is full.
+
+The database line needs $DATABASE_URL and at least one user; the rest is
+in-memory.
+
+Run from backend/:  python -m appDir.scripts.bench_tokens --n 100000
+"""
+import argparse
+import asyncio
+import hashlib
+import hmac
+import secrets
+import time
+
+from fastapi.security import HTTPAuthorizationCredentials
+
+from appDir.core.config import JWT_SECRET
+from appDir.routes.session import authorize_user, current_session
+from appDir.scripts.bench_db_load import percentile
+from appDir.services import session_tokens
+from appDir.services.session_tokens import RevocationList, _b64encode, issue_access_token, verify_access_token
+
+
+def per_call(fn, args: list, rounds: int = 5) -> tuple[float, float]:
+    """(mean, p99) seconds per call over chunks of len(args) calls."""
+    chunks = []
+    for _ in range(rounds):
+        for i in range(0, len(args), 1000):
+            part = args[i:i + 1000]
+            start = time.perf_counter()
+            for a in part:
+                fn(a)
+            chunks.append((time.perf_counter() - start) / len(part))
+    chunks.sort()
+    return sum(chunks) / len(chunks), percentile(chunks, 99)
+
+
+def signature_cached(token: str) -> None:
+    header, payload, signature = token.split(".")
+    mac = session_tokens.signer.verifiers[header].copy()
+    mac.update(f"{header}.{payload}".encode())
+    assert hmac.compare_digest(_b64encode(mac.digest()), signature)
+
+
+def signature_uncached(token: str) -> None:
+    # the same check with the key set up again on every call
+    header, payload, signature = token.split(".")
+    mac = hmac.new(JWT_SECRET.encode(), f"{header}.{payload}".encode(), hashlib.sha256)
+    assert hmac.compare_digest(_b64encode(mac.digest()), signature)
+
+
+async def dependency_cost(tokens: list[str], user_ids: list[int]) -> tuple[float, float]:
+    creds = [HTTPAuthorizationCredentials(scheme="Bearer", credentials=t) for t in tokens]
+    samples = []
+    for i in range(0, len(creds), 1000):
+        start = time.perf_counter()
+        for c, uid in zip(creds[i:i + 1000], user_ids[i:i + 1000]):
+            await authorize_user(uid, await current_session(c))
+        samples.append((time.perf_counter() - start) / len(creds[i:i + 1000]))
+    samples.sort()
+    return sum(samples) / len(samples), percentile(samples, 99)
+
+
+async def db_lookup_cost(n: int) -> tuple[float, float] | None:
+    from appDir.core.async_db import adb_conn, close_async_pool, fetch_one, open_async_pool
+    await open_async_pool()
+    try:
+        async with adb_conn() as conn:
+            row = await fetch_one(conn, "SELECT MIN(id) AS id FROM users")
+        if not row or row["id"] is None:
+            return None
+        latencies = []
+        for _ in range(n):
+            start = time.perf_counter()
+            async with adb_conn() as conn:
+                await fetch_one(conn, "SELECT id, profile_version FROM users WHERE id = %s", (row["id"],))
+            latencies.append(time.perf_counter() - start)
+        latencies.sort()
+        return sum(latencies) / n, percentile(latencies, 99)
+    finally:
+        await close_async_pool()
+
+
+def us(pair) -> str:
+    return f"{pair[0] * 1e6:8.1f} us  (p99 {pair[1] * 1e6:7.1f} us)"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--n", type=int, default=100000, help="tokens verified per measurement")
+    parser.add_argument("--db", type=int, default=2000, help="user lookups timed; 0 to skip")
+    parser.add_argument("--revoked", type=int, default=100000, help="revocation list size for the full-list case")
+    args = parser.parse_args()
+
+    user_ids = [i % 5000 + 1 for i in range(args.n)]
+    start = time.perf_counter()
+    tokens = [issue_access_token(uid) for uid in user_ids]
+    print(f"sign:                        {(time.perf_counter() - start) / args.n * 1e6:8.1f} us")
+
+    print(f"signature, cached key:       {us(per_call(signature_cached, tokens))}")
+    print(f"signature, key per call:     {us(per_call(signature_uncached, tokens))}")
+    print(f"verify (signature + claims): {us(per_call(verify_access_token, tokens))}")
+
+    full = RevocationList(max_entries=args.revoked)
+    expires = time.time() + 3600
+    for _ in range(args.revoked):
+        full.revoke_token(secrets.token_urlsafe(12), expires)
+    for uid in range(10000, 10000 + args.revoked // 10):
+        full.users[uid] = (0.0, expires)
+    session_tokens.revocations, empty = full, session_tokens.revocations
+    print(f"verify, {len(full):,} revoked:     {us(per_call(verify_access_token, tokens))}")
+    session_tokens.revocations = empty
+
+    print(f"authorize_user dependency:   {us(asyncio.run(dependency_cost(tokens, user_ids)))}")
+
+    if args.db:
+        db = asyncio.run(db_lookup_cost(args.db))
+        print(f"db user lookup (pooled):     {us(db)}" if db else "db user lookup: no users, skipped")
+
+
+if __name__ == "__main__":
+    main()
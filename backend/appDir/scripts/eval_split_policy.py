@@ -0,0 +1,162 @@
+"""
+Offline evaluation of the split policy, plus the cost it adds to pick_split.
+
+Events are split by time: the policy is trained on the older part and scored on
+the newest --test share, against pi0 and against what was logged:
+
+  replay   mean reward over test events where the policy's pick is the split the
+           user actually got (unbiased when logging explored uniformly, and the
+           only estimate available for pi0-logged data)
+  ips      inverse propensity score, from the logged probabilities
+           (workouts.split_propensity; plans from before exploration count as 1)
+  true     expected reward under the simulator, --synthetic only
+
+--synthetic N simulates N rated plans for the bench_plans cohort, logged by pi0
+with --explore uniform exploration and rewards where some profiles do better on
+another split; without it the events are the feedback table ($DATABASE_URL).
+
+The latency check times pick_split with the trained table loaded against pi0
+alone and fails when the difference is 1 ms or more per call.
+
+Run from backend/:  python -m appDir.scripts.eval_split_policy --synthetic 50000
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+from appDir.scripts.bench_plans import make_cohort
+from appDir.scripts.bench_db_load import percentile
+from appDir.services import split_policy
+from appDir.services.split_policy import (
+    SPLITS_FOR_DAYS, SplitPolicy, SplitStats, fit, iter_feedback, load_split_policy, reward, save_split_policy,
+)
+from appDir.services.workout_generator import VOLUME_TO_DAYS, baseline_split, pick_split
+
+DAYS_TO_VOLUME = {days: volume for volume, days in VOLUME_TO_DAYS.items()}
+MAX_ADDED_SECONDS = 0.001
+
+
+def true_mean(experience: str, days: int, goals: list[str], split: str) -> float:
+    """The simulator's expected reward; the effects are made up, only their shape matters."""
+    mean = 0.6
+    if experience == "beginner":
+        mean += {"full_body": 0.15, "phul": -0.1, "ppl_6": -0.15, "arnold_6": -0.15}.get(split, 0.0)
+    if experience == "advanced" and "muscle" in goals:
+        mean += {"phul": 0.15, "ppl_6": 0.1, "full_body": -0.1}.get(split, 0.0)
+    if "weight_loss" in goals or "stamina" in goals:
+        mean += {"ulf": 0.1}.get(split, 0.0)
+    return min(max(mean, 0.0), 1.0)
+
+
+def simulate(n: int, explore: float, seed: int = 5) -> list[dict]:
+    rng = random.Random(seed)
+    events = []
+    for p in make_cohort(n, seed):
+        days = VOLUME_TO_DAYS[p["workout_volume"]]
+        base = baseline_split(days)
+        candidates = SPLITS_FOR_DAYS[days]
+        split = rng.choice(candidates) if rng.random() < explore else base
+        propensity = explore / len(candidates) + (1 - explore) * (split == base)
+        mean = true_mean(p["experience_level"], days, p["goals"], split)
+        rating = min(5, max(1, round(1 + 4 * (mean + rng.gauss(0, 0.2)))))
+        events.append({
+            "experience_level": p["experience_level"], "days": days, "goals": sorted(p["goals"]),
+            "equipment": p["equipment"], "split": split, "rating": rating, "difficulty": None,
+            "propensity": propensity,
+        })
+    return events
+
+
+def estimates(events: list[dict], choose, synthetic: bool) -> dict[str, float | None]:
+    matched = [e for e in events if choose(e) == e["split"]]
+    out = {
+        "agree": len(matched) / len(events),
+        "replay": sum(reward(e["rating"], e["difficulty"]) for e in matched) / len(matched) if matched else None,
+        "ips": sum(reward(e["rating"], e["difficulty"]) / e["propensity"] for e in matched) / len(events),
+        "true": None,
+    }
+    if synthetic:
+        out["true"] = sum(true_mean(e["experience_level"], e["days"], e["goals"], choose(e)) for e in events) / len(events)
+    return out
+
+
+def time_pick_split(events: list[dict], rounds: int) -> tuple[float, float]:
+    """Mean and p99 seconds per pick_split call, timed in chunks of 1000 calls."""
+    args = [(e["experience_level"], DAYS_TO_VOLUME.get(e["days"], "3-4"), e["goals"], e["equipment"])
+            for e in events[:1000]]
+    chunks = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for a in args:
+            pick_split(*a)
+        chunks.append((time.perf_counter() - start) / len(args))
+    chunks.sort()
+    return sum(chunks) / len(chunks), percentile(chunks, 99)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--synthetic", type=int, default=0, help="simulate this many rated plans instead of the db")
+    parser.add_argument("--explore", type=float, default=0.3, help="simulated logging: share of random splits")
+    parser.add_argument("--test", type=float, default=0.2, help="newest share of events held out")
+    parser.add_argument("--rounds", type=int, default=200, help="latency: chunks of 1000 pick_split calls")
+    args = parser.parse_args()
+
+    synthetic = args.synthetic > 0
+    if synthetic:
+        events = simulate(args.synthetic, args.explore)
+    else:
+        from appDir.core.db import get_conn
+        conn = get_conn()
+        try:
+            events = [dict(r) for r in iter_feedback(conn)]
+        finally:
+            conn.close()
+        events = [e for e in events if e["split"] and e["days"]]
+        for e in events:
+            e["goals"] = sorted(e["goals"] or [])
+            e["propensity"] = e["propensity"] or 1.0
+    if len(events) < 10:
+        sys.exit(f"only {len(events)} rated plans, nothing to evaluate")
+
+    cut = int(len(events) * (1 - args.test))
+    train, test = events[:cut], events[cut:]
+    table = fit(SplitStats().add_feedback(train), baseline_split)
+    policy = SplitPolicy(table)
+    print(f"{len(train)} train / {len(test)} test events, {len(policy)} table entries "
+          f"(profile {len(policy.profile)}, level {len(policy.level)}, days {len(policy.days)})")
+
+    logged = sum(reward(e["rating"], e["difficulty"]) for e in test) / len(test)
+    pi0 = lambda e: baseline_split(e["days"])
+    learned = lambda e: policy.lookup(e["experience_level"], e["days"], e["goals"], e["equipment"]) or pi0(e)
+    print(f"logged mean reward {logged:.4f}; policy differs from pi0 on "
+          f"{sum(learned(e) != pi0(e) for e in test) / len(test):.1%} of test contexts")
+    print(f"{'':8} {'agree':>7} {'replay':>8} {'ips':>8} {'true':>8}")
+    for name, choose in (("pi0", pi0), ("learned", learned)):
+        est = estimates(test, choose, synthetic)
+        cells = [f"{est['agree']:7.1%}"] + [f"{est[k]:8.4f}" if est[k] is not None else f"{'-':>8}"
+                                            for k in ("replay", "ips", "true")]
+        print(f"{name:8} " + " ".join(cells))
+
+    # online path: the same table through save / load_split_policy / pick_split
+    load_split_policy(os.path.join(tempfile.gettempdir(), "nonexistent-split-policy.json"))
+    base_mean, base_p99 = time_pick_split(test, args.rounds)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "split_policy.json")
+        save_split_policy(table, path)
+        load_split_policy(path)
+    assert split_policy.current_policy().version == table["version"]
+    mean, p99 = time_pick_split(test, args.rounds)
+    added = mean - base_mean
+    print(f"pick_split: pi0 {base_mean * 1e6:.2f} us (p99 {base_p99 * 1e6:.2f}), "
+          f"with table {mean * 1e6:.2f} us (p99 {p99 * 1e6:.2f}), added {added * 1e6:.2f} us per call")
+    if p99 - base_mean >= MAX_ADDED_SECONDS:
+        sys.exit("FAIL: the policy lookup adds 1 ms or more per pick")
+    print("OK: online overhead under 1 ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,24 @@
+import argparse
+import codecs
+import hashlib
 import json
 import os
+import re
+import time
 from pathlib import Path
+from typing import Any, Iterable, Iterator
 
 import psycopg2
-from psycopg2.extras import execute_batch
+
+from appDir.core.exercise_schema import EXERCISE_SCHEMA
+
+# characters of exercises.json decoded at a time; memory stays flat however big the file is
+READ_CHUNK = 1 << 20
+COPY_BUFFER = 1 << 16
+COPY_COLUMNS = (
+    "seq", "id", "name", "level", "category", "equipment", "force", "mechanic",
+    "primary_muscles", "secondary_muscles", "content_hash",
+)
 
 
 def get_db_url() -> str:
@@ -17,16 +32,66 @@ def get_db_url() -> str:
     return db_url
 
 
-def load_exercises_json(json_path: Path) -> list[dict]:
+def iter_exercises_json(json_path: Path, hasher=None, chunk_size: int = READ_CHUNK) -> Iterator[dict]:
+    """
+    Yields the objects of a top-level JSON array one by one without loading the
+    whole file. `hasher` (hashlib object) sees every byte of the file.
+    """
     if not json_path.exists():
         raise FileNotFoundError(f"Could not find exercises json at: {json_path}")
 
-    with json_path.open("r", encoding="utf-8") as f:
-        data = json.load(f)
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder("utf-8")()
+    buf, pos, eof = "", 0, False
+
+    with json_path.open("rb") as f:
+        def fill():
+            nonlocal buf, pos, eof
+            raw = f.read(chunk_size)
+            if hasher is not None:
+                hasher.update(raw)
+            eof = not raw
+            buf = buf[pos:] + utf8.decode(raw, final=eof)
+            pos = 0
+
+        def skip(chars: str) -> str:
+            # next significant character, "" at end of file
+            nonlocal pos
+            while True:
+                while pos < len(buf) and buf[pos] in chars:
+                    pos += 1
+                if pos < len(buf):
+                    return buf[pos]
+                if eof:
+                    return ""
+                fill()
 
-    if not isinstance(data, list):
-        raise ValueError("exercises.json must be a JSON array of objects.")
-    return data
+        if skip(" \t\r\n") != "[":
+            raise ValueError("exercises.json must be a JSON array of objects.")
+        pos += 1
+
+        while True:
+            c = skip(" \t\r\n,")
+            if c == "]":
+                break
+            if not c:
+                raise ValueError("exercises.json: unterminated array")
+            try:
+                obj, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                # element runs past what's been read so far
+                fill()
+                continue
+            if not isinstance(obj, dict):
+                raise ValueError("exercises.json must be a JSON array of objects.")
+            pos = end
+            yield obj
+
+        # the rest of the file still counts towards the source hash
+        while hasher is not None and not eof:
+            fill()
 
 
 def normalize_exercise(row: dict) -> dict:
@@ -57,56 +122,268 @@ def normalize_exercise(row: dict) -> dict:
     }
 
 
-def main():
-    # Adjust this if your file is in a different location
-    # This path assumes: backend/app/data/exercises.json
-    base_dir = Path(__file__).resolve().parents[1]  # .../backend/app
-    json_path = base_dir / "data" / "exercises.json"
+def content_hash(row: dict) -> str:
+    # over the whole source record, so any change a client can see bumps the version
+    canonical = json.dumps(row, sort_keys=True, separators=(",", ":"), ensure_ascii=False, check_circular=False)
+    return hashlib.blake2b(canonical.encode("utf-8"), digest_size=16).hexdigest()
 
-    db_url = get_db_url()
-    exercises_raw = load_exercises_json(json_path)
 
-    exercises = []
-    for r in exercises_raw:
+_COPY_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+_NEEDS_COPY_ESCAPE = re.compile(r"[\\\t\n\r]")
+_NEEDS_ARRAY_QUOTE = re.compile(r'[\\"]')
+
+
+def _copy_text(value: str | None) -> str:
+    """One column in COPY text format; almost every value goes through unchanged."""
+    if value is None:
+        return "\\N"
+    if not isinstance(value, str):
+        value = str(value)
+    if _NEEDS_COPY_ESCAPE.search(value):
+        return value.translate(_COPY_ESCAPES)
+    return value
+
+
+def _copy_array(values: list[str]) -> str:
+    if not values:
+        return "{}"
+    joined = '","'.join(values)
+    if _NEEDS_ARRAY_QUOTE.search(joined):
+        joined = '","'.join(v.replace("\\", "\\\\").replace('"', '\\"') for v in values)
+    return _copy_text('{"' + joined + '"}')
+
+
+class CopyStream:
+    """File-like object for cursor.copy_expert() over an iterator of COPY text lines."""
+
+    def __init__(self, lines: Iterable[str]):
+        self._lines = iter(lines)
+        self._pending = ""
+
+    def read(self, size: int = -1) -> str:
+        parts = [self._pending]
+        n = len(self._pending)
+        for line in self._lines:
+            parts.append(line)
+            n += len(line)
+            if 0 < size <= n:
+                break
+        data = "".join(parts)
+        if size > 0:
+            data, self._pending = data[:size], data[size:]
+        else:
+            self._pending = ""
+        return data
+
+
+def staged_rows(json_path: Path, stats: dict, hasher) -> Iterator[str]:
+    for seq, r in enumerate(iter_exercises_json(json_path, hasher)):
         try:
-            exercises.append(normalize_exercise(r))
+            ex = normalize_exercise(r)
         except Exception as e:
+            stats["skipped"] += 1
             print(f"Skipping bad row: {e}")
+            continue
+        stats["rows"] += 1
+        # same order as COPY_COLUMNS
+        yield "\t".join((
+            str(seq), _copy_text(ex["id"]), _copy_text(ex["name"]), _copy_text(ex["level"]),
+            _copy_text(ex["category"]), _copy_text(ex["equipment"]), _copy_text(ex["force"]),
+            _copy_text(ex["mechanic"]), _copy_array(ex["primary_muscles"]),
+            _copy_array(ex["secondary_muscles"]), content_hash(r),
+        )) + "\n"
+
 
-    print(f"Loaded {len(exercises)} valid exercises from {json_path}")
-
-    insert_sql = """
-    INSERT INTO exercises (
-      id, name, level, category, equipment, force, mechanic, primary_muscles, secondary_muscles
-    )
-    VALUES (
-      %(id)s, %(name)s, %(level)s, %(category)s, %(equipment)s, %(force)s, %(mechanic)s,
-      %(primary_muscles)s, %(secondary_muscles)s
-    )
-    ON CONFLICT (id) DO UPDATE SET
-      name = EXCLUDED.name,
-      level = EXCLUDED.level,
-      category = EXCLUDED.category,
-      equipment = EXCLUDED.equipment,
-      force = EXCLUDED.force,
-      mechanic = EXCLUDED.mechanic,
-      primary_muscles = EXCLUDED.primary_muscles,
-      secondary_muscles = EXCLUDED.secondary_muscles;
+MERGE_SQL = """
+INSERT INTO exercises (
+  id, name, level, category, equipment, force, mechanic, primary_muscles, secondary_muscles,
+  content_hash, added_version, changed_version, removed_version
+)
+SELECT s.id, s.name, s.level, s.category, s.equipment, s.force, s.mechanic,
+       s.primary_muscles, s.secondary_muscles, s.content_hash, %(version)s, %(version)s, NULL
+FROM exercises_staging s
+LEFT JOIN exercises e ON e.id = s.id
+WHERE e.id IS NULL
+   OR e.removed_version IS NOT NULL
+   OR e.content_hash IS DISTINCT FROM s.content_hash
+ON CONFLICT (id) DO UPDATE SET
+  name = EXCLUDED.name,
+  level = EXCLUDED.level,
+  category = EXCLUDED.category,
+  equipment = EXCLUDED.equipment,
+  force = EXCLUDED.force,
+  mechanic = EXCLUDED.mechanic,
+  primary_muscles = EXCLUDED.primary_muscles,
+  secondary_muscles = EXCLUDED.secondary_muscles,
+  content_hash = EXCLUDED.content_hash,
+  -- a tombstoned id coming back, or a row from before versioning, counts as added
+  added_version = CASE
+    WHEN exercises.removed_version IS NOT NULL OR exercises.added_version IS NULL
+    THEN EXCLUDED.added_version ELSE exercises.added_version END,
+  changed_version = EXCLUDED.changed_version,
+  removed_version = NULL;
+"""
+
+
+def import_catalog(conn, json_path: Path) -> dict[str, Any]:
+    """
+    Streams json_path into a staging table with COPY and merges only the rows
+    whose content hash differs from the exercises table, in one transaction.
+    Unchanged rows are never rewritten and no new catalog version is taken.
     """
+    stats = {"rows": 0, "skipped": 0, "added": 0, "updated": 0, "unchanged": 0, "removed": 0,
+             "version": None, "timings": {}}
+    started = time.perf_counter()
+    # recorded as catalog_versions.source_hash; must match the dataset version the
+    # API computes for the same file (exercise_store._source_hash) so catalog sync
+    # can tell whether a worker serves this import
+    source = hashlib.sha256()
+
+    with conn.cursor() as cur:
+        # one importer at a time, so versions are handed out in commit order
+        cur.execute("SELECT pg_advisory_xact_lock(hashtext('import_exercises'))")
+        for statement in EXERCISE_SCHEMA:
+            cur.execute(statement)
+
+        cur.execute("""
+        CREATE TEMP TABLE exercises_staging (
+          seq BIGINT NOT NULL,
+          id TEXT NOT NULL,
+          name TEXT NOT NULL,
+          level TEXT,
+          category TEXT,
+          equipment TEXT,
+          force TEXT,
+          mechanic TEXT,
+          primary_muscles TEXT[] NOT NULL,
+          secondary_muscles TEXT[] NOT NULL,
+          content_hash TEXT NOT NULL
+        ) ON COMMIT DROP;
+        """)
+        cur.copy_expert(
+            f"COPY exercises_staging ({', '.join(COPY_COLUMNS)}) FROM STDIN",
+            CopyStream(staged_rows(json_path, stats, source)),
+            size=COPY_BUFFER,
+        )
+        # a repeated id keeps its last occurrence, as the row-by-row upsert did
+        cur.execute("""
+        DELETE FROM exercises_staging s
+        USING exercises_staging t
+        WHERE s.id = t.id AND s.seq < t.seq;
+        """)
+        cur.execute("ALTER TABLE exercises_staging ADD PRIMARY KEY (id)")
+        cur.execute("ANALYZE exercises_staging")
+        loaded = time.perf_counter()
+
+        cur.execute("""
+        SELECT
+          COUNT(*) FILTER (WHERE e.id IS NULL OR e.removed_version IS NOT NULL),
+          COUNT(*) FILTER (WHERE e.id IS NOT NULL AND e.removed_version IS NULL
+                           AND e.content_hash IS DISTINCT FROM s.content_hash),
+          COUNT(*)
+        FROM exercises_staging s
+        LEFT JOIN exercises e ON e.id = s.id;
+        """)
+        added, updated, staged = cur.fetchone()
+        cur.execute("""
+        SELECT COUNT(*) FROM exercises e
+        WHERE e.removed_version IS NULL
+          AND NOT EXISTS (SELECT 1 FROM exercises_staging s WHERE s.id = e.id);
+        """)
+        removed = cur.fetchone()[0]
+        stats.update(added=added, updated=updated, unchanged=staged - added - updated, removed=removed)
+
+        if added or updated or removed:
+            cur.execute(
+                """
+                INSERT INTO catalog_versions (source_hash, added, updated, removed)
+                VALUES (%s, %s, %s, %s)
+                RETURNING version
+                """,
+                (source.hexdigest()[:16], added, updated, removed),
+            )
+            version = cur.fetchone()[0]
+            cur.execute(MERGE_SQL, {"version": version})
+            if removed:
+                cur.execute(
+                    """
+                    UPDATE exercises e
+                    SET removed_version = %s, changed_version = %s
+                    WHERE e.removed_version IS NULL
+                      AND NOT EXISTS (SELECT 1 FROM exercises_staging s WHERE s.id = e.id);
+                    """,
+                    (version, version),
+                )
+        else:
+            # same rows from a different file (reformatted, reordered): the head
+            # version now stands for this file, which is what workers will load
+            cur.execute(
+                """
+                UPDATE catalog_versions SET source_hash = %s
+                WHERE version = (SELECT MAX(version) FROM catalog_versions)
+                """,
+                (source.hexdigest()[:16],),
+            )
+            cur.execute("SELECT COALESCE(MAX(version), 0) FROM catalog_versions")
+            version = cur.fetchone()[0]
+        stats["version"] = version
+
+    conn.commit()
+    done = time.perf_counter()
+    stats["timings"] = {
+        "load_s": round(loaded - started, 3),
+        "merge_s": round(done - loaded, 3),
+        "total_s": round(done - started, 3),
+    }
+    return stats
+
 
-    conn = psycopg2.connect(db_url)
+def compile_catalog(json_path: Path) -> None:
+    # imported here so a database-only import doesn't build the catalog modules
+    from appDir.services.exercise_store import compile_exercise_catalog
+
+    out_path = json_path.with_suffix(".catalog")
+    version = compile_exercise_catalog(str(json_path), str(out_path))
+    print(f"✅ Compiled {out_path} (dataset version {version}, {out_path.stat().st_size} bytes)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import exercises.json into Postgres and/or compile the binary catalog.")
+    parser.add_argument("--compile-catalog", action="store_true",
+                        help="also write data/exercises.catalog for the API workers to mmap")
+    parser.add_argument("--no-db", action="store_true", help="skip the Postgres import")
+    parser.add_argument("--json", type=Path, default=None,
+                        help="import this file instead of data/exercises.json")
+    args = parser.parse_args()
+
+    # Adjust this if your file is in a different location
+    # This path assumes: backend/app/data/exercises.json
+    base_dir = Path(__file__).resolve().parents[1]  # .../backend/app
+    json_path = args.json or base_dir / "data" / "exercises.json"
+
+    if args.compile_catalog:
+        compile_catalog(json_path)
+    if args.no_db:
+        return
+
+    conn = psycopg2.connect(get_db_url())
     try:
-        conn.autocommit = False
-        with conn.cursor() as cur:
-            execute_batch(cur, insert_sql, exercises, page_size=500)
-        conn.commit()
-        print(f"✅ Inserted/updated {len(exercises)} exercises into Postgres.")
+        stats = import_catalog(conn, json_path)
     except Exception:
         conn.rollback()
         raise
     finally:
         conn.close()
 
+    t = stats["timings"]
+    print(f"Loaded {stats['rows']} valid exercises from {json_path} ({stats['skipped']} skipped)")
+    if stats["added"] or stats["updated"] or stats["removed"]:
+        print(f"✅ Catalog version {stats['version']}: {stats['added']} inserted, {stats['updated']} updated, "
+              f"{stats['unchanged']} unchanged, {stats['removed']} removed")
+    else:
+        print(f"✅ No changes ({stats['unchanged']} unchanged); catalog version stays {stats['version']}")
+    print(f"   load {t['load_s']}s, merge {t['merge_s']}s, total {t['total_s']}s")
+
 
 if __name__ == "__main__":
     main()
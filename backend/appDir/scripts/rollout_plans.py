@@ -0,0 +1,31 @@
+"""
+Regenerate weekly plans for every user whose stored plan is out of date.
+
+Run from backend/:
+
+    python -m appDir.scripts.rollout_plans              # stale plans only
+    python -m appDir.scripts.rollout_plans --force      # a new plan for everyone
+    python -m appDir.scripts.rollout_plans --dry-run    # count, don't write
+"""
+import argparse
+import json
+
+from appDir.services.plan_rollout import rollout_plans
+from appDir.services.split_policy import SPLIT_POLICY_PATH
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=2000, help="users fetched and written per round trip")
+    parser.add_argument("--force", action="store_true", help="write a plan even if the stored one is current")
+    parser.add_argument("--dry-run", action="store_true", help="generate plans but don't insert them")
+    parser.add_argument("--policy", default=SPLIT_POLICY_PATH, help="split policy table the app runs with")
+    args = parser.parse_args()
+
+    result = rollout_plans(batch_size=args.batch_size, force=args.force, dry_run=args.dry_run,
+                           policy_path=args.policy)
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Train the split policy from workout feedback and write the table pick_split
+loads at startup (services/split_policy.py). Restart the app to pick it up, then
+run rollout_plans to regenerate the plans whose split changed.
+
+Run from backend/:
+
+    python -m appDir.scripts.train_split_policy              # train and write SPLIT_POLICY_PATH
+    python -m appDir.scripts.train_split_policy --dry-run    # train, print the summary only
+"""
+import argparse
+import json
+import time
+
+from appDir.core.db import get_conn
+from appDir.services.split_policy import (
+    LEVELS, MIN_SUPPORT, PRIOR_STRENGTH, SPLIT_POLICY_PATH, SplitStats, fit, iter_feedback, save_split_policy,
+)
+from appDir.services.workout_generator import baseline_split
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--out", default=SPLIT_POLICY_PATH)
+    parser.add_argument("--chunk-size", type=int, default=5000, help="feedback rows fetched per round trip")
+    parser.add_argument("--min-support", type=int, default=MIN_SUPPORT)
+    parser.add_argument("--prior-strength", type=float, default=PRIOR_STRENGTH)
+    parser.add_argument("--dry-run", action="store_true", help="don't write the table")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    conn = get_conn()
+    try:
+        stats = SplitStats().add_feedback(iter_feedback(conn, args.chunk_size))
+    finally:
+        conn.close()
+    table = fit(stats, baseline_split, prior_strength=args.prior_strength, min_support=args.min_support)
+    if not args.dry_run:
+        save_split_policy(table, args.out)
+
+    print(json.dumps({
+        "events": table["events"],
+        "version": table["version"],
+        "entries": {level: len(table[level]) for level in LEVELS},
+        "days": table["days"],
+        "out": None if args.dry_run else args.out,
+        "seconds": round(time.perf_counter() - started, 3),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
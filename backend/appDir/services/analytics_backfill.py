@@ -0,0 +1,155 @@
+"""
+Rebuilds the progress analytics tables (see training_analytics) from workout_sets,
+for the first deploy, after a change to the formulas or muscle shares, or to
+repair drift.
+
+Users are processed in batches of ids. Each batch locks its users' rows
+(FOR UPDATE, which set logging's foreign-key check waits on), reads their sets
+into one DataFrame, aggregates with vectorized pandas / numpy, and replaces the
+users' aggregate rows in the same transaction, so sets logged during the run
+are either part of the rebuild or applied on top of it afterwards.
+
+CLI: python -m appDir.scripts.backfill_analytics
+"""
+import time
+from typing import Any
+
+import numpy as np
+import pandas as pd
+from psycopg2.extras import execute_values
+
+from appDir.core.db import get_conn
+from appDir.services import exercise_store
+from appDir.services.training_analytics import E1RM_MAX_REPS, MuscleShares
+
+SETS_COLUMNS = ["user_id", "exercise_id", "reps", "weight", "performed_at"]
+
+
+def e1rm_array(weight: np.ndarray, reps: np.ndarray) -> np.ndarray:
+    """training_analytics.E1RM_SQL over arrays, as float32; NaN where it is NULL."""
+    weight = weight.astype(np.float64)
+    est = np.where(reps == 1, weight, weight * (1 + reps / 30.0))
+    return np.where((weight > 0) & (reps >= 1) & (reps <= E1RM_MAX_REPS), est, np.nan).astype(np.float32)
+
+
+def shares_frame(catalog: "exercise_store.Catalog") -> pd.DataFrame:
+    shares = catalog.derived(MuscleShares)
+    rows = [(ex_id, muscle, share) for ex_id, pairs in shares.shares.items() for muscle, share in pairs]
+    frame = pd.DataFrame(rows, columns=["exercise_id", "muscle", "share"])
+    # summed as REAL by the incremental path
+    frame["share"] = frame["share"].astype(np.float32)
+    return frame
+
+
+def aggregate(sets: pd.DataFrame, shares: pd.DataFrame) -> dict[str, pd.DataFrame]:
+    """The three analytics tables for the users in `sets`."""
+    sets = sets.copy()
+    sets["weight"] = sets["weight"].astype(np.float32)
+    performed = pd.to_datetime(sets["performed_at"], utc=True)
+    day = performed.dt.tz_localize(None).dt.normalize()
+    sets["week"] = (day - pd.to_timedelta(day.dt.weekday, unit="D")).dt.date
+    sets["volume"] = sets["reps"].to_numpy() * sets["weight"].to_numpy(np.float64)
+    sets["e1rm"] = e1rm_array(sets["weight"].to_numpy(), sets["reps"].to_numpy())
+    sets["performed_at"] = performed
+
+    exercise_weeks = (
+        sets.groupby(["user_id", "exercise_id", "week"], sort=False)
+        .agg(sets=("reps", "size"), reps=("reps", "sum"), volume=("volume", "sum"), best_e1rm=("e1rm", "max"))
+        .reset_index()
+    )
+
+    attributed = sets[["user_id", "exercise_id", "week", "volume"]].merge(shares, on="exercise_id")
+    attributed["weighted"] = attributed["share"].to_numpy(np.float64) * attributed["volume"].to_numpy()
+    muscle_weeks = (
+        attributed.groupby(["user_id", "muscle", "week"], sort=False)
+        .agg(sets=("share", "sum"), volume=("weighted", "sum"))
+        .reset_index()
+    )
+
+    # same tie-breaks as the DISTINCT ON subqueries: best value, then earliest
+    keys = ["user_id", "exercise_id"]
+    by_time = sets.sort_values("performed_at", kind="stable")
+    best = (by_time.sort_values(keys + ["e1rm"], ascending=[True, True, False], na_position="last", kind="stable")
+            .drop_duplicates(keys)[keys + ["e1rm", "performed_at"]]
+            .rename(columns={"e1rm": "best_e1rm", "performed_at": "best_e1rm_at"}))
+    best.loc[best["best_e1rm"].isna(), "best_e1rm_at"] = pd.NaT
+    heaviest = (by_time.sort_values(keys + ["weight", "reps"], ascending=[True, True, False, False], kind="stable")
+                .drop_duplicates(keys)[keys + ["weight", "reps", "performed_at"]]
+                .rename(columns={"weight": "max_weight", "reps": "max_weight_reps",
+                                 "performed_at": "max_weight_at"}))
+    biggest = (by_time.sort_values(keys + ["volume"], ascending=[True, True, False], kind="stable")
+               .drop_duplicates(keys)[keys + ["volume", "performed_at"]]
+               .rename(columns={"volume": "best_volume", "performed_at": "best_volume_at"}))
+    records = best.merge(heaviest, on=keys).merge(biggest, on=keys)
+
+    return {
+        "user_exercise_weeks": exercise_weeks[
+            ["user_id", "exercise_id", "week", "sets", "reps", "volume", "best_e1rm"]],
+        "user_muscle_weeks": muscle_weeks[["user_id", "muscle", "week", "sets", "volume"]],
+        "user_exercise_records": records[
+            ["user_id", "exercise_id", "best_e1rm", "best_e1rm_at", "max_weight", "max_weight_reps",
+             "max_weight_at", "best_volume", "best_volume_at"]],
+    }
+
+
+def _records(frame: pd.DataFrame) -> list[tuple]:
+    # NaN / NaT -> NULL, numpy scalars -> python
+    values = frame.astype(object).where(frame.notna(), None)
+    return [tuple(v.item() if isinstance(v, np.generic) else v for v in row)
+            for row in values.itertuples(index=False, name=None)]
+
+
+def replace_batch(cur, user_ids: list[int], tables: dict[str, pd.DataFrame]) -> None:
+    for table, frame in tables.items():
+        cur.execute(f"DELETE FROM {table} WHERE user_id = ANY(%s)", (user_ids,))
+        if len(frame):
+            columns = ", ".join(frame.columns)
+            execute_values(cur, f"INSERT INTO {table} ({columns}) VALUES %s", _records(frame), page_size=1000)
+
+
+def backfill_analytics(batch_size: int = 500, dry_run: bool = False) -> dict[str, Any]:
+    started = time.perf_counter()
+    if not len(exercise_store.snapshot().exercises):
+        exercise_store.load_exercise_data()
+    shares = shares_frame(exercise_store.snapshot())
+
+    users = sets_read = 0
+    written = {"user_exercise_weeks": 0, "user_muscle_weeks": 0, "user_exercise_records": 0}
+    conn = get_conn()
+    try:
+        last_id = 0
+        while True:
+            with conn.cursor() as cur:
+                cur.execute("SELECT id FROM users WHERE id > %s ORDER BY id LIMIT %s", (last_id, batch_size))
+                user_ids = [r["id"] for r in cur.fetchall()]
+                if not user_ids:
+                    break
+                last_id = user_ids[-1]
+                cur.execute("SELECT id FROM users WHERE id = ANY(%s) FOR UPDATE", (user_ids,))
+                cur.execute(
+                    f"SELECT {', '.join(SETS_COLUMNS)} FROM workout_sets WHERE user_id = ANY(%s)",
+                    (user_ids,),
+                )
+                sets = pd.DataFrame.from_records(cur.fetchall(), columns=SETS_COLUMNS)
+                tables = aggregate(sets, shares) if len(sets) else {
+                    table: pd.DataFrame() for table in written
+                }
+                if not dry_run:
+                    replace_batch(cur, user_ids, tables)
+            conn.commit()
+
+            users += len(user_ids)
+            sets_read += len(sets)
+            for table, frame in tables.items():
+                written[table] += len(frame)
+            print(f"[analytics] {users} users, {sets_read} sets {'aggregated' if dry_run else 'rebuilt'}")
+    finally:
+        conn.close()
+
+    return {
+        "users": users,
+        "sets": sets_read,
+        "rows": written,
+        "seconds": round(time.perf_counter() - started, 3),
+        "dry_run": dry_run,
+    }
@@ -0,0 +1,175 @@
+"""
+Whole-catalog download for GET /api/exercises/export.
+
+The catalog is encoded row by row from the snapshot's exercise store, either as
+NDJSON (one exercise per line) or as one compact JSON array, and compressed with
+whatever the client accepts (br when the brotli package is installed, gzip, or
+none). The first request for a (version, format, encoding) streams the body
+while writing it to EXPORT_DIR; once the file is complete every later request,
+from any worker, is a plain file send.
+"""
+import os
+import re
+import threading
+import uuid
+import zlib
+from typing import Iterator
+
+from appDir.services import exercise_store
+from appDir.services.response_cache import encode_json
+
+try:
+    import brotli
+except ImportError:  # optional; br just isn't offered without it
+    brotli = None
+
+EXPORT_DIR = os.getenv("EXERCISE_EXPORT_DIR", os.path.join(exercise_store.DATA_DIR, "exports"))
+
+FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "json": "application/json",
+}
+# server preference when the client accepts several equally
+ENCODINGS = ("br", "gzip", "identity") if brotli is not None else ("gzip", "identity")
+FILE_SUFFIXES = {"br": ".br", "gzip": ".gz", "identity": ""}
+
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 11
+ROWS_PER_CHUNK = 64
+
+_TOKEN = re.compile(r"^\s*([a-z*-]+)\s*(?:;\s*q\s*=\s*([0-9.]+))?\s*$")
+
+
+def negotiate_encoding(accept_encoding: str | None) -> str:
+    """Best of ENCODINGS for an Accept-Encoding header (RFC 9110 q-values)."""
+    if not accept_encoding:
+        return "identity"
+    q: dict[str, float] = {}
+    for part in accept_encoding.lower().split(","):
+        m = _TOKEN.match(part)
+        if not m:
+            continue
+        try:
+            q[m.group(1)] = float(m.group(2)) if m.group(2) else 1.0
+        except ValueError:
+            continue
+
+    default = q.get("*")
+    best, best_q = "identity", -1.0
+    for enc in ENCODINGS:
+        weight = q.get(enc, default)
+        if weight is None:
+            # identity is acceptable unless excluded explicitly
+            weight = 0.001 if enc == "identity" else 0.0
+        if weight > best_q and weight > 0:
+            best, best_q = enc, weight
+    return best
+
+
+class _Compressor:
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "gzip":
+            self._obj = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+        elif encoding == "br":
+            self._obj = brotli.Compressor(quality=BROTLI_QUALITY)
+
+    def compress(self, data: bytes) -> bytes:
+        if self.encoding == "identity":
+            return data
+        if self.encoding == "br":
+            return self._obj.process(data)
+        return self._obj.compress(data)
+
+    def flush(self) -> bytes:
+        if self.encoding == "identity":
+            return b""
+        if self.encoding == "br":
+            return self._obj.finish()
+        return self._obj.flush()
+
+
+def iter_rows(catalog: "exercise_store.Catalog", fmt: str) -> Iterator[bytes]:
+    """The uncompressed body in chunks of ROWS_PER_CHUNK exercises."""
+    exercises = catalog.exercises
+    n = len(exercises)
+    if fmt == "json":
+        yield b"["
+    for start in range(0, n, ROWS_PER_CHUNK):
+        rows = [encode_json(exercises[i]) for i in range(start, min(start + ROWS_PER_CHUNK, n))]
+        if fmt == "ndjson":
+            yield b"\n".join(rows) + b"\n"
+        else:
+            yield (b"," if start else b"") + b",".join(rows)
+    if fmt == "json":
+        yield b"]"
+
+
+def export_path(version: str, fmt: str, encoding: str) -> str:
+    return os.path.join(EXPORT_DIR, f"exercises-{version}.{fmt}{FILE_SUFFIXES[encoding]}")
+
+
+def cached_export(version: str, fmt: str, encoding: str) -> str | None:
+    path = export_path(version, fmt, encoding)
+    return path if os.path.exists(path) else None
+
+
+def _prune(version: str) -> None:
+    # exports of older dataset versions are never served again; temp files may
+    # belong to another worker still writing
+    keep = f"exercises-{version}."
+    try:
+        names = os.listdir(EXPORT_DIR)
+    except OSError:
+        return
+    for name in names:
+        if name.startswith("exercises-") and not name.startswith(keep) and not name.endswith(".tmp"):
+            try:
+                os.remove(os.path.join(EXPORT_DIR, name))
+            except OSError:
+                pass
+
+
+_prune_lock = threading.Lock()
+
+
+def stream_export(catalog: "exercise_store.Catalog", fmt: str, encoding: str) -> Iterator[bytes]:
+    """
+    Compressed body for the snapshot, streamed as it is encoded and written to
+    a private temp file alongside. The file is renamed into place only once the
+    whole body was produced, so a client that disconnects half way (the
+    generator is closed) leaves nothing behind.
+    """
+    path = export_path(catalog.version, fmt, encoding)
+    tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+    out = None
+    try:
+        os.makedirs(EXPORT_DIR, exist_ok=True)
+        out = open(tmp, "wb")
+    except OSError as e:
+        print(f"Catalog export not cached ({e})")
+
+    compressor = _Compressor(encoding)
+    done = False
+    try:
+        for chunk in iter_rows(catalog, fmt):
+            data = compressor.compress(chunk)
+            if data:
+                if out:
+                    out.write(data)
+                yield data
+        data = compressor.flush()
+        if out:
+            out.write(data)
+        done = True
+        yield data
+    finally:
+        if out:
+            out.close()
+            if done:
+                os.replace(tmp, path)
+                if exercise_store.snapshot().version == catalog.version:
+                    with _prune_lock:
+                        _prune(catalog.version)
+            else:
+                os.remove(tmp)
@@ -0,0 +1,74 @@
+"""
+Catalog delta sync (GET /api/exercises/changes?since=<version>).
+
+scripts/import_exercises.py bumps catalog_versions.version on every import that
+changes something and stamps each affected exercises row with it (added_version,
+changed_version, removed_version; removed rows stay as tombstones). A client
+keeps the version from its last sync and asks only for what changed after it.
+
+The change list comes from Postgres, the row contents from the catalog snapshot
+the API serves everywhere else, so a synced row is byte-identical to the one
+/api/exercises returns. That only holds when the snapshot is the file the latest
+import came from: catalog_versions.source_hash is the same hash as
+Catalog.version, and until they match the response is marked incomplete and
+hands back the client's own `since`, so it retries rather than keeping rows this
+worker hasn't caught up on.
+"""
+from typing import Any
+
+from appDir.core.async_db import adb_conn, fetch_all, fetch_one
+from appDir.services import exercise_store
+from appDir.services.exercise_listing import ListingIndex
+
+
+class VersionAhead(Exception):
+    """since is newer than the database's catalog (e.g. the database was rebuilt)."""
+
+
+async def changes_since(since: int, catalog: "exercise_store.Catalog") -> dict[str, Any]:
+    async with adb_conn() as conn:
+        head = await fetch_one(
+            conn, "SELECT version, source_hash FROM catalog_versions ORDER BY version DESC LIMIT 1"
+        )
+        version = head["version"] if head else 0
+        if since > version:
+            raise VersionAhead()
+        rows = await fetch_all(
+            conn,
+            """
+            SELECT id, added_version, removed_version
+            FROM exercises
+            WHERE changed_version > %s
+            ORDER BY id
+            """,
+            (since,),
+        )
+
+    listing = await catalog.derived_async(ListingIndex)
+    added, updated, removed = [], [], []
+    missing = 0
+    for row in rows:
+        is_new = row["added_version"] is None or row["added_version"] > since
+        if row["removed_version"] is not None:
+            # added and removed again since the client's version: nothing to tell it
+            if not is_new:
+                removed.append(row["id"])
+            continue
+        i = listing.position(row["id"])
+        if i is None:
+            missing += 1
+            continue
+        (added if is_new else updated).append(catalog.exercises[i])
+
+    # this worker hasn't loaded the file the import came from yet; hand back the
+    # same `since` so the client retries instead of skipping those rows for good
+    complete = missing == 0 and (head is None or head["source_hash"] == catalog.version)
+    return {
+        "since": since,
+        "version": version if complete else since,
+        "complete": complete,
+        "dataset_version": catalog.version,
+        "added": added,
+        "updated": updated,
+        "removed": removed,
+    }
@@ -0,0 +1,258 @@
+"""
+Binary exercise catalog: exercises.json compiled into one file that workers mmap
+read-only, so startup doesn't parse JSON and the pages are shared between
+processes through the OS page cache.
+
+Layout (little endian):
+
+    header      magic, format version, source hash, record count, section table
+    str_index   u32 offset + u32 length per string (into str_blob)
+    str_blob    utf-8 bytes of every distinct string
+    lists       u32 string ids, referenced by (start, count) from records
+    records     RECORD struct per exercise, in file order
+    postings    u32 gram string id + bitset bytes per search n-gram
+    meta        json: facet tables, stats payload, muscle groups
+
+Build it with `python -m appDir.scripts.import_exercises --compile-catalog`.
+"""
+import functools
+import json
+import mmap
+import os
+import struct
+from collections.abc import Sequence
+from typing import Any
+
+MAGIC = b"IMCATLG\x00"
+FORMAT_VERSION = 1
+
+SECTIONS = ("str_index", "str_blob", "lists", "records", "postings", "meta")
+# magic, version, reserved, source hash (16 ascii hex), count, then (offset, length) per section
+HEADER = struct.Struct("<8sHH16sI" + "QQ" * len(SECTIONS))
+
+NONE_REF = 0xFFFFFFFF
+STR_ENTRY = struct.Struct("<II")
+LIST_ITEM = struct.Struct("<I")
+# id, name, force, level, mechanic, equipment, category: string ids
+# primaryMuscles, secondaryMuscles, instructions, images: (list start, count)
+RECORD = struct.Struct("<7I8I")
+POSTINGS_HEAD = struct.Struct("<II")  # count, bitset width in bytes
+
+SCALAR_FIELDS = ("id", "name", "force", "level", "mechanic", "equipment", "category")
+LIST_FIELDS = ("primaryMuscles", "secondaryMuscles", "instructions", "images")
+# decoded records kept per CatalogExercises, for the rows requests keep coming back to
+RECORD_CACHE_SIZE = 256
+
+
+class CatalogError(Exception):
+    """The catalog file is missing, stale, or not something we can read."""
+
+
+class _StringTable:
+    def __init__(self):
+        self.ids: dict[str, int] = {}
+        self.entries: list[tuple[int, int]] = []
+        self.blob = bytearray()
+
+    def ref(self, value) -> int:
+        if value is None:
+            return NONE_REF
+        if not isinstance(value, str):
+            raise CatalogError(f"expected a string, got {type(value).__name__}")
+        sid = self.ids.get(value)
+        if sid is None:
+            data = value.encode("utf-8")
+            sid = len(self.entries)
+            self.ids[value] = sid
+            self.entries.append((len(self.blob), len(data)))
+            self.blob += data
+        return sid
+
+
+def write_catalog(path: str, exercises: list[dict[str, Any]], source_hash: str,
+                  text_postings: dict[str, int], meta: dict[str, Any]) -> None:
+    """
+    Serializes already-built tables (see exercise_store.compile_exercise_catalog).
+    Written to a temp file and renamed into place, so a worker that has the old
+    file mapped keeps reading a consistent copy.
+    """
+    known = set(SCALAR_FIELDS) | set(LIST_FIELDS)
+    strings = _StringTable()
+    lists = bytearray()
+    records = bytearray()
+    list_len = 0
+
+    for ex in exercises:
+        extra = set(ex) - known
+        if extra:
+            raise CatalogError(f"exercise {ex.get('id')!r} has fields the catalog can't store: {sorted(extra)}")
+
+        fields = [strings.ref(ex.get(name)) for name in SCALAR_FIELDS]
+        for name in LIST_FIELDS:
+            values = ex.get(name)
+            if values is None:
+                fields += [0, NONE_REF]
+                continue
+            fields += [list_len, len(values)]
+            for v in values:
+                lists += LIST_ITEM.pack(strings.ref(v))
+            list_len += len(values)
+        records += RECORD.pack(*fields)
+
+    width = (len(exercises) + 7) // 8
+    postings = bytearray(POSTINGS_HEAD.pack(len(text_postings), width))
+    for gram, bits in text_postings.items():
+        postings += LIST_ITEM.pack(strings.ref(gram))
+        postings += bits.to_bytes(width, "little")
+
+    str_index = b"".join(STR_ENTRY.pack(off, n) for off, n in strings.entries)
+    meta_bytes = json.dumps(meta, separators=(",", ":")).encode("utf-8")
+    bodies = [str_index, bytes(strings.blob), bytes(lists), bytes(records), bytes(postings), meta_bytes]
+
+    table = []
+    offset = HEADER.size
+    for body in bodies:
+        table += [offset, len(body)]
+        offset += len(body)
+
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, 0, source_hash.encode("ascii"), len(exercises), *table)
+
+    # per-process temp name: several workers may recompile a stale catalog at once
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(header)
+        for body in bodies:
+            f.write(body)
+    os.replace(tmp, path)
+
+
+class CatalogFile:
+    """Read-only view over a mapped catalog; every accessor decodes straight from the map."""
+
+    def __init__(self, path: str):
+        try:
+            with open(path, "rb") as f:
+                self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError) as e:
+            raise CatalogError(f"can't map {path}: {e}") from e
+
+        if len(self.mm) < HEADER.size:
+            raise CatalogError(f"{path} is truncated")
+        magic, version, _, source_hash, count, *table = HEADER.unpack_from(self.mm, 0)
+        if magic != MAGIC:
+            raise CatalogError(f"{path} is not an exercise catalog")
+        if version != FORMAT_VERSION:
+            raise CatalogError(f"{path} has format version {version}, expected {FORMAT_VERSION}")
+
+        self.source_hash = source_hash.decode("ascii")
+        self.count = count
+        self.sections: dict[str, tuple[int, int]] = {}
+        for i, name in enumerate(SECTIONS):
+            off, n = table[2 * i], table[2 * i + 1]
+            if off + n > len(self.mm):
+                raise CatalogError(f"{path} is truncated ({name} section)")
+            self.sections[name] = (off, n)
+
+        self._str_index = self.sections["str_index"][0]
+        self._str_blob = self.sections["str_blob"][0]
+        self._lists = self.sections["lists"][0]
+        self._records = self.sections["records"][0]
+
+    def string(self, sid: int) -> str | None:
+        if sid == NONE_REF:
+            return None
+        off, n = STR_ENTRY.unpack_from(self.mm, self._str_index + sid * STR_ENTRY.size)
+        start = self._str_blob + off
+        return self.mm[start:start + n].decode("utf-8")
+
+    def _list(self, start: int, count: int) -> list[str] | None:
+        if count == NONE_REF:
+            return None
+        base = self._lists + start * LIST_ITEM.size
+        return [self.string(sid) for sid in struct.unpack_from(f"<{count}I", self.mm, base)]
+
+    def record(self, i: int, names: tuple[str, ...] | None = None) -> dict[str, Any]:
+        """Record i; with `names`, only those fields are decoded and returned."""
+        fields = RECORD.unpack_from(self.mm, self._records + i * RECORD.size)
+        rec = {}
+        for j, name in enumerate(SCALAR_FIELDS):
+            if names is None or name in names:
+                rec[name] = self.string(fields[j])
+        for j, name in enumerate(LIST_FIELDS):
+            if names is None or name in names:
+                rec[name] = self._list(fields[7 + 2 * j], fields[8 + 2 * j])
+        return rec
+
+    def name(self, i: int) -> str:
+        return self.string(RECORD.unpack_from(self.mm, self._records + i * RECORD.size)[1]) or ""
+
+    def instructions(self, i: int) -> list[str]:
+        fields = RECORD.unpack_from(self.mm, self._records + i * RECORD.size)
+        return self._list(fields[11], fields[12]) or []
+
+    def text_postings(self) -> dict[str, int]:
+        base = self.sections["postings"][0]
+        count, width = POSTINGS_HEAD.unpack_from(self.mm, base)
+        pos = base + POSTINGS_HEAD.size
+        postings = {}
+        for _ in range(count):
+            (sid,) = LIST_ITEM.unpack_from(self.mm, pos)
+            pos += LIST_ITEM.size
+            postings[self.string(sid)] = int.from_bytes(self.mm[pos:pos + width], "little")
+            pos += width
+        return postings
+
+    def meta(self) -> dict[str, Any]:
+        off, n = self.sections["meta"]
+        return json.loads(self.mm[off:off + n])
+
+
+class CatalogExercises(Sequence):
+    """
+    List-like access to the catalog records, returning the same dicts as
+    exercises.json. Decoded records are kept in a small LRU; every access gets
+    its own copy.
+    """
+
+    def __init__(self, catalog: CatalogFile):
+        self.catalog = catalog
+        self.decoded = functools.lru_cache(maxsize=RECORD_CACHE_SIZE)(catalog.record)
+
+    def __len__(self) -> int:
+        return self.catalog.count
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self.to_dict(j) for j in range(*i.indices(self.catalog.count))]
+        if i < 0:
+            i += self.catalog.count
+        if not 0 <= i < self.catalog.count:
+            raise IndexError(i)
+        return self.to_dict(i)
+
+    def project(self, i: int, fields: tuple[str, ...]) -> dict[str, Any]:
+        """Exercise i with only `fields`, in that order; the others aren't decoded."""
+        rec = self.catalog.record(i, fields)
+        return {f: rec[f] for f in fields}
+
+    def to_dict(self, i: int) -> dict[str, Any]:
+        rec = self.decoded(i)
+        # same key order as the source file; lists are copied so callers can't
+        # mutate the cached record
+        return {
+            "name": rec["name"],
+            "force": rec["force"],
+            "level": rec["level"],
+            "mechanic": rec["mechanic"],
+            "equipment": rec["equipment"],
+            "primaryMuscles": _copy(rec["primaryMuscles"]),
+            "secondaryMuscles": _copy(rec["secondaryMuscles"]),
+            "instructions": _copy(rec["instructions"]),
+            "category": rec["category"],
+            "images": _copy(rec["images"]),
+            "id": rec["id"],
+        }
+
+
+def _copy(values: list[str] | None) -> list[str] | None:
+    return None if values is None else list(values)
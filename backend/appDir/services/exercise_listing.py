@@ -0,0 +1,88 @@
+"""
+Paging and field projection for GET /api/exercises.
+
+Pages are taken over the catalog in exercise id order, either by offset (page /
+per_page) or by keyset (after=<last id of the previous page>), which costs a
+bisect instead of walking past every earlier row.
+
+fields=id,name,... returns rows with only those keys. The projected rows for a
+field set are built once per catalog snapshot from the stored records (project()
+decodes just the requested fields), so a list view that asks for three fields
+never touches the instructions or images of a single row.
+
+ListingIndex is built in the background after each load and kept on the snapshot
+(Catalog.derived).
+"""
+import bisect
+import threading
+from collections import OrderedDict
+from typing import Any
+
+from appDir.services import exercise_store
+
+# distinct field sets whose projected rows are kept per catalog snapshot
+PROJECTION_CACHE_SIZE = 32
+
+
+def parse_fields(raw: str | None) -> tuple[str, ...] | None:
+    """
+    "name,id" -> ("name", "id") in EXERCISE_FIELDS order, so equivalent requests
+    share one projection. None / "" means full rows. Raises ValueError naming
+    any unknown field.
+    """
+    if not raw or not raw.strip():
+        return None
+    wanted = {f.strip() for f in raw.split(",") if f.strip()}
+    unknown = sorted(wanted.difference(exercise_store.EXERCISE_FIELDS))
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    return tuple(f for f in exercise_store.EXERCISE_FIELDS if f in wanted)
+
+
+@exercise_store.prebuild
+class ListingIndex:
+    def __init__(self, catalog: "exercise_store.Catalog"):
+        self.exercises = catalog.exercises
+        ids = [self.exercises.project(i, ("id",))["id"] for i in range(len(self.exercises))]
+        # catalog positions in id order, and the ids in that order for bisect
+        self.order = sorted(range(len(ids)), key=lambda i: ids[i])
+        self.ids = [ids[i] for i in self.order]
+        self._projections: OrderedDict[tuple[str, ...], list[dict[str, Any]]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def start_after(self, cursor: str) -> int:
+        """Offset in id order of the first exercise whose id sorts after cursor."""
+        return bisect.bisect_right(self.ids, cursor)
+
+    def position(self, exercise_id: str) -> int | None:
+        """Catalog position of an exercise id, None if it isn't in this version."""
+        j = bisect.bisect_left(self.ids, exercise_id)
+        if j < len(self.ids) and self.ids[j] == exercise_id:
+            return self.order[j]
+        return None
+
+    def projected(self, fields: tuple[str, ...]) -> list[dict[str, Any]]:
+        """Every exercise in id order with only `fields`; built on first use."""
+        with self._lock:
+            rows = self._projections.get(fields)
+            if rows is not None:
+                self._projections.move_to_end(fields)
+                return rows
+
+        project = self.exercises.project
+        rows = [project(i, fields) for i in self.order]
+
+        with self._lock:
+            self._projections[fields] = rows
+            while len(self._projections) > PROJECTION_CACHE_SIZE:
+                self._projections.popitem(last=False)
+        return rows
+
+    def rows(self, start: int, end: int, fields: tuple[str, ...] | None) -> list[dict[str, Any]]:
+        if fields is None:
+            return [self.exercises[i] for i in self.order[start:end]]
+        return self.projected(fields)[start:end]
+
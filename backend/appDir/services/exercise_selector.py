@@ -0,0 +1,207 @@
+"""
+Fills the sessions of a weekly plan with exercises from the loaded catalog.
+
+Each session focus (core/splits.py) is a list of muscle slots. For every
+(focus, equipment profile, experience level) the matching exercises per slot are
+worked out once per catalog snapshot (SelectionPools, built in the background
+after each load and kept on the Catalog), so picking a session is a few seeded
+random choices out of small tuples.
+
+Selection is deterministic: the same profile values and seed give the same
+exercises for a given catalog.
+"""
+import random
+from typing import Any
+
+from appDir.core.splits import SPLITS
+from appDir.services import exercise_store
+
+# muscle slots per focus, in the order exercises are picked
+FOCUS_SLOTS = {
+    "full": ["quadriceps", "chest", "lats", "hamstrings", "shoulders", "middle back", "abdominals", "triceps", "biceps", "calves"],
+    "upper": ["chest", "lats", "shoulders", "middle back", "triceps", "biceps", "chest", "lats", "traps", "forearms"],
+    "lower": ["quadriceps", "hamstrings", "glutes", "calves", "quadriceps", "hamstrings", "adductors", "abductors", "lower back", "abdominals"],
+    "push": ["chest", "shoulders", "triceps", "chest", "shoulders", "triceps", "chest", "shoulders", "triceps", "abdominals"],
+    "pull": ["lats", "middle back", "biceps", "lats", "traps", "biceps", "middle back", "forearms", "lower back", "abdominals"],
+    "legs": ["quadriceps", "hamstrings", "glutes", "calves", "quadriceps", "hamstrings", "adductors", "abductors", "calves", "abdominals"],
+    "chest_back": ["chest", "lats", "chest", "middle back", "chest", "lats", "traps", "middle back", "lower back", "abdominals"],
+    "shoulders_arms": ["shoulders", "biceps", "triceps", "shoulders", "biceps", "triceps", "shoulders", "forearms", "traps", "abdominals"],
+    "push_chest": ["chest", "chest", "shoulders", "triceps", "chest", "shoulders", "triceps", "chest", "triceps", "abdominals"],
+    "pull_back": ["lats", "middle back", "lats", "biceps", "traps", "middle back", "biceps", "lower back", "forearms", "abdominals"],
+    "legs_quads": ["quadriceps", "quadriceps", "glutes", "calves", "quadriceps", "adductors", "hamstrings", "calves", "abductors", "abdominals"],
+    "upper_shoulders_arms": ["shoulders", "shoulders", "biceps", "triceps", "traps", "shoulders", "biceps", "triceps", "forearms", "neck"],
+    "lower_hams_glutes": ["hamstrings", "glutes", "hamstrings", "lower back", "glutes", "calves", "abductors", "hamstrings", "calves", "abdominals"],
+    "chest": ["chest", "chest", "chest", "triceps", "chest", "shoulders", "chest", "triceps", "chest", "abdominals"],
+    "back": ["lats", "middle back", "lats", "lower back", "traps", "middle back", "lats", "biceps", "forearms", "abdominals"],
+    "shoulders": ["shoulders", "shoulders", "shoulders", "traps", "shoulders", "shoulders", "traps", "neck", "shoulders", "abdominals"],
+    "arms": ["biceps", "triceps", "biceps", "triceps", "forearms", "biceps", "triceps", "forearms", "biceps", "triceps"],
+}
+# phul sessions share the upper/lower slots; "power" leans on heavy compounds
+FOCUS_ALIASES = {
+    "upper_power": "upper",
+    "lower_power": "lower",
+    "upper_hypertrophy": "upper",
+    "lower_hypertrophy": "lower",
+}
+
+# profile equipment values (signup/profile forms) -> catalog equipment allowed;
+# exercises without equipment count as "body only"
+EQUIPMENT_PROFILES = {
+    "gym": None,  # everything
+    "home_full": {"barbell", "dumbbell", "body only", "kettlebells", "bands", "medicine ball",
+                  "exercise ball", "foam roll", "e-z curl bar", "other"},
+    "home_basic": {"dumbbell", "body only", "kettlebells", "bands", "exercise ball", "foam roll"},
+    "minimal": {"body only", "bands", "foam roll"},
+    "bodyweight": {"body only"},
+}
+DEFAULT_EQUIPMENT = "gym"
+
+LEVELS = {
+    "beginner": {"beginner"},
+    "intermediate": {"beginner", "intermediate"},
+    "advanced": {"beginner", "intermediate", "expert"},
+}
+DEFAULT_LEVEL = "intermediate"
+
+CATEGORIES = {"strength", "powerlifting"}
+ADVANCED_CATEGORIES = CATEGORIES | {"olympic weightlifting"}
+# the catalog has few bodyweight strength moves for some muscles (legs especially)
+EQUIPMENT_EXTRA_CATEGORIES = {
+    "bodyweight": {"plyometrics"},
+    "minimal": {"plyometrics"},
+}
+
+# (sets, reps) per level; "power" sessions use POWER_SCHEME for compounds
+SET_SCHEMES = {
+    "beginner": (3, "10-12"),
+    "intermediate": (3, "8-12"),
+    "advanced": (4, "6-10"),
+}
+POWER_SCHEME = (5, "3-5")
+
+MINUTES_PER_EXERCISE = 10
+MIN_EXERCISES = 3
+MAX_EXERCISES = 10
+DEFAULT_SESSION_MINUTES = 60
+
+
+def exercises_per_session(session_length_minutes: int | None) -> int:
+    minutes = session_length_minutes or DEFAULT_SESSION_MINUTES
+    return max(MIN_EXERCISES, min(MAX_EXERCISES, minutes // MINUTES_PER_EXERCISE))
+
+
+def _profile_key(equipment: str, experience_level: str) -> tuple[str, str]:
+    eq = (equipment or "").strip().lower()
+    level = (experience_level or "").strip().lower()
+    return (
+        eq if eq in EQUIPMENT_PROFILES else DEFAULT_EQUIPMENT,
+        level if level in LEVELS else DEFAULT_LEVEL,
+    )
+
+
+@exercise_store.prebuild
+class SelectionPools:
+    """
+    Candidate exercises per (focus, equipment profile, level) for one catalog
+    snapshot: for every muscle slot, (compound, other, secondary) position tuples.
+    """
+
+    def __init__(self, catalog: "exercise_store.Catalog"):
+        # position -> (id, name, mechanic); decoded once, the pools only hold positions
+        self.refs: list[tuple[str, str, str | None]] = []
+        allowed_by_profile: dict[tuple[str, str], list[int]] = {
+            (eq, level): [] for eq in EQUIPMENT_PROFILES for level in LEVELS
+        }
+        primary: list[frozenset[str]] = []
+        secondary: list[frozenset[str]] = []
+
+        for i, ex in enumerate(catalog.exercises):
+            self.refs.append((ex["id"], ex["name"], ex.get("mechanic")))
+            primary.append(frozenset(m.lower() for m in ex.get("primaryMuscles") or []))
+            secondary.append(frozenset(m.lower() for m in ex.get("secondaryMuscles") or []))
+
+            equipment = ex.get("equipment") or "body only"
+            for (eq, level), allowed in allowed_by_profile.items():
+                categories = ADVANCED_CATEGORIES if level == "advanced" else CATEGORIES
+                category_ok = (ex.get("category") in categories
+                               or ex.get("category") in EQUIPMENT_EXTRA_CATEGORIES.get(eq, ()))
+                if not category_ok or ex.get("level") not in LEVELS[level]:
+                    continue
+                eq_ok = EQUIPMENT_PROFILES[eq]
+                if eq_ok is None or equipment in eq_ok:
+                    allowed.append(i)
+
+        muscles = {m for slots in FOCUS_SLOTS.values() for m in slots}
+        self.pools: dict[tuple[str, str, str], tuple[tuple[str, tuple[int, ...], tuple[int, ...], tuple[int, ...]], ...]] = {}
+        for (eq, level), allowed in allowed_by_profile.items():
+            per_muscle = {}
+            for m in muscles:
+                compound = tuple(i for i in allowed if m in primary[i] and self.refs[i][2] == "compound")
+                other = tuple(i for i in allowed if m in primary[i] and self.refs[i][2] != "compound")
+                second = tuple(i for i in allowed if m in secondary[i] and m not in primary[i])
+                per_muscle[m] = (m, compound, other, second)
+            for focus, slots in FOCUS_SLOTS.items():
+                self.pools[(focus, eq, level)] = tuple(per_muscle[m] for m in slots)
+
+    def session(self, focus: str, equipment: str, experience_level: str, count: int,
+                rng: random.Random) -> list[dict[str, Any]]:
+        eq, level = _profile_key(equipment, experience_level)
+        base = FOCUS_ALIASES.get(focus, focus)
+        slots = self.pools.get((base, eq, level)) or self.pools[("full", eq, level)]
+        power = focus.endswith("_power")
+        sets, reps = SET_SCHEMES[level]
+
+        picked: list[dict[str, Any]] = []
+        used: set[int] = set()
+        hit: set[str] = set()
+        # a second pass over the slots tops up sessions where some muscles had
+        # nothing left for this equipment/level
+        for muscle, compound, other, second in slots + slots:
+            if len(picked) >= count:
+                break
+            # first exercise for a muscle is a compound where there is one
+            first = muscle not in hit
+            for group in ((compound, other, second) if first else (compound + other, second)):
+                choices = [i for i in group if i not in used]
+                if choices:
+                    i = rng.choice(choices)
+                    break
+            else:
+                continue
+
+            used.add(i)
+            hit.add(muscle)
+            ex_id, name, mechanic = self.refs[i]
+            s, r = POWER_SCHEME if power and mechanic == "compound" else (sets, reps)
+            picked.append({"id": ex_id, "name": name, "muscle": muscle, "sets": s, "reps": r})
+        return picked
+
+
+def fill_week(week: list[dict], equipment: str, experience_level: str,
+              session_length_minutes: int | None, seed: int) -> list[dict]:
+    """Adds an "exercises" list to every training day of `week` (in place)."""
+    catalog = exercise_store.snapshot()
+    if not len(catalog.exercises):
+        return week
+
+    pools = catalog.derived(SelectionPools)
+    count = exercises_per_session(session_length_minutes)
+    rng = random.Random(seed)
+    for day in week:
+        if day["type"] == "train":
+            day["exercises"] = pools.session(day["focus"], equipment, experience_level, count, rng)
+    return week
+
+
+def _check_focus_coverage():
+    missing = {
+        focus
+        for split in SPLITS.values()
+        for focus in split["sessions"]
+        if FOCUS_ALIASES.get(focus, focus) not in FOCUS_SLOTS
+    }
+    if missing:
+        raise RuntimeError(f"no exercise slots for session focus: {sorted(missing)}")
+
+
+_check_focus_coverage()
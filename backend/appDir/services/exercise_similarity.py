@@ -0,0 +1,114 @@
+"""
+"Swap this exercise" suggestions: every exercise in the catalog is a weighted
+feature vector (muscles, equipment, force, mechanic, level, category), rows are
+L2-normalized, and neighbours are the highest cosine scores from one matrix
+product against the whole catalog.
+
+The index (~900 x ~45 float32) is built in the background after each load and
+kept on the catalog snapshot (Catalog.derived), shared by all requests on it.
+"""
+import numpy as np
+
+from appDir.services import exercise_store
+
+# how much each kind of feature counts towards similarity
+PRIMARY_MUSCLE_WEIGHT = 1.0
+SECONDARY_MUSCLE_WEIGHT = 0.4
+FIELD_WEIGHTS = {
+    "equipment": 0.5,
+    "force": 0.6,
+    "mechanic": 0.5,
+    "level": 0.3,
+    "category": 0.7,
+}
+NO_EQUIPMENT = "body only"
+# what the vectors are built from; only these are decoded
+FEATURE_FIELDS = ("id", "primaryMuscles", "secondaryMuscles", *FIELD_WEIGHTS)
+
+
+@exercise_store.prebuild
+class SimilarityIndex:
+    def __init__(self, catalog: "exercise_store.Catalog"):
+        self.ids: list[str] = []
+        self.position: dict[str, int] = {}
+
+        exercises = catalog.exercises
+        rows = [exercises.project(i, FEATURE_FIELDS) for i in range(len(exercises))]
+        columns: dict[str, int] = {}
+
+        def col(name: str) -> int:
+            return columns.setdefault(name, len(columns))
+
+        entries: list[tuple[int, int, float]] = []
+        equipment: list[str] = []
+        for i, ex in enumerate(rows):
+            self.ids.append(ex["id"])
+            self.position[ex["id"]] = i
+
+            for m in ex.get("primaryMuscles") or []:
+                entries.append((i, col("muscle:" + m.lower()), PRIMARY_MUSCLE_WEIGHT))
+            for m in ex.get("secondaryMuscles") or []:
+                entries.append((i, col("muscle:" + m.lower()), SECONDARY_MUSCLE_WEIGHT))
+            for field, weight in FIELD_WEIGHTS.items():
+                value = ex.get(field)
+                if field == "equipment":
+                    value = value or NO_EQUIPMENT
+                if value:
+                    entries.append((i, col(f"{field}:{value.lower()}"), weight))
+            equipment.append((ex.get("equipment") or NO_EQUIPMENT).lower())
+
+        matrix = np.zeros((len(rows), max(1, len(columns))), dtype=np.float32)
+        for i, j, w in entries:
+            # primary and secondary can name the same muscle; keep the larger weight
+            matrix[i, j] = max(matrix[i, j], w)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        self.matrix = matrix / norms
+
+        self.equipment_names = sorted(set(equipment))
+        codes = {name: k for k, name in enumerate(self.equipment_names)}
+        self.equipment_codes = np.array([codes[e] for e in equipment], dtype=np.int16)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _allowed(self, equipment: list[str] | None) -> np.ndarray | None:
+        if not equipment:
+            return None
+        wanted = {e.strip().lower() for e in equipment if e.strip()}
+        codes = [k for k, name in enumerate(self.equipment_names) if name in wanted]
+        return np.isin(self.equipment_codes, codes)
+
+    def similar_batch(self, positions: list[int], k: int = 10,
+                      equipment: list[str] | None = None) -> list[list[tuple[int, float]]]:
+        """
+        Top-k (position, score) neighbours for each query position, best first,
+        excluding the query itself and, when given, anything whose equipment
+        isn't in `equipment`.
+        """
+        if not positions or not len(self.ids):
+            return [[] for _ in positions]
+
+        idx = np.asarray(positions, dtype=np.intp)
+        scores = self.matrix[idx] @ self.matrix.T           # (queries, catalog)
+        scores[np.arange(len(idx)), idx] = -np.inf
+        allowed = self._allowed(equipment)
+        if allowed is not None:
+            scores[:, ~allowed] = -np.inf
+
+        k = min(k, scores.shape[1])
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        results = []
+        for row, cand in zip(scores, top):
+            cand = cand[np.argsort(-row[cand], kind="stable")]
+            results.append([(int(j), float(row[j])) for j in cand if np.isfinite(row[j])])
+        return results
+
+    def similar(self, exercise_id: str, k: int = 10,
+                equipment: list[str] | None = None) -> list[tuple[int, float]] | None:
+        """None when the id isn't in the catalog."""
+        i = self.position.get(exercise_id)
+        if i is None:
+            return None
+        return self.similar_batch([i], k, equipment)[0]
+
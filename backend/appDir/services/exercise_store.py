@@ -1,9 +1,389 @@
+import asyncio
+import functools
+import hashlib
 import json
+import mmap
 import os
-from typing import Any
+import sys
+import tempfile
+import threading
+import time
+from collections.abc import Callable, Sequence
+from typing import Any, TypeVar
+
+from appDir.services.exercise_catalog import CatalogError, CatalogExercises, CatalogFile, write_catalog
+from appDir.services.response_cache import catalog_cache
+from appDir.services.exercise_suggest import SUGGEST_FIELDS, SuggestIndex
+from appDir.services.search_ranking import RankedIndex
+
+DATA_DIR = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data"))
+DATA_PATH = os.path.join(DATA_DIR, "exercises.json")
+# compiled by scripts/import_exercises.py --compile-catalog; optional
+CATALOG_PATH = os.path.join(DATA_DIR, "exercises.catalog")
+# rebuild a stale/missing catalog on load instead of falling back to the json parser
+CATALOG_AUTOCOMPILE = os.getenv("EXERCISE_CATALOG_AUTOCOMPILE", "1") != "0"
+
+# key order of the records in exercises.json; to_dict() reproduces it exactly
+EXERCISE_FIELDS = (
+    "name", "force", "level", "mechanic", "equipment", "primaryMuscles",
+    "secondaryMuscles", "instructions", "category", "images", "id",
+)
+# fields that stay on disk until someone asks for them
+LAZY_FIELDS = ("instructions", "images")
+# ExerciseRecord attribute per list field of exercises.json
+RECORD_LISTS = {"primaryMuscles": "primary_muscles", "secondaryMuscles": "secondary_muscles"}
+DETAIL_CACHE_SIZE = 256
+
+
+class ExerciseRecord:
+    """
+    Scalar fields of one exercise. Enum-like strings are interned and muscle lists
+    are shared tuples, so 873 records mostly point at the same few dozen objects.
+    instructions/images are not kept; (offset, length) locate them, encoded as
+    JSON, in the store's detail blob so ExerciseStore can parse them on demand.
+    """
+
+    __slots__ = (
+        "id", "name", "force", "level", "mechanic", "equipment", "category",
+        "primary_muscles", "secondary_muscles", "extra", "offset", "length",
+    )
+
+    def __init__(self, ex: dict[str, Any], offset: int, length: int, tuples: dict):
+        intern = _intern
+        self.id = ex.get("id")
+        self.name = ex.get("name")
+        self.force = intern(ex.get("force"))
+        self.level = intern(ex.get("level"))
+        self.mechanic = intern(ex.get("mechanic"))
+        self.equipment = intern(ex.get("equipment"))
+        self.category = intern(ex.get("category"))
+        self.primary_muscles = _shared_tuple(ex.get("primaryMuscles"), tuples)
+        self.secondary_muscles = _shared_tuple(ex.get("secondaryMuscles"), tuples)
+        # anything outside the known schema is kept as-is (normally None)
+        extra = {k: v for k, v in ex.items() if k not in EXERCISE_FIELDS}
+        self.extra = extra or None
+        self.offset = offset
+        self.length = length
+
+
+def _intern(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def _shared_tuple(values, tuples: dict):
+    if values is None:
+        return None
+    t = tuple(_intern(v) for v in values)
+    return tuples.setdefault(t, t)
+
+
+def _map_private(data: bytes):
+    """data as a read-only mmap of a file only this process can see."""
+    if not data:
+        return b""
+    with tempfile.TemporaryFile() as f:
+        f.write(data)
+        f.flush()
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def _parse_array(raw: bytes) -> list[dict[str, Any]]:
+    exercises = json.loads(raw.decode("utf-8"))
+    if not isinstance(exercises, list):
+        raise ValueError("exercises.json must be a JSON array of objects.")
+    return exercises
+
+
+class ExerciseStore(Sequence):
+    """
+    Read-only, list-like view of the exercises. Indexing returns the same dicts
+    the JSON file contains, built on the fly from compact records; the
+    instructions/images for them are parsed out of the detail blob and kept in a
+    small per-store LRU.
+
+    The blob holds only the lazy fields, re-encoded compactly at load and
+    mmapped from a private unlinked temp file: it stays off the Python heap like
+    a map of exercises.json would, but editing the file in place can't corrupt a
+    store that is still serving requests.
+    """
+
+    def __init__(self, records: list[ExerciseRecord], blob=b""):
+        self.records = records
+        self._blob = blob
+        self.detail = functools.lru_cache(maxsize=DETAIL_CACHE_SIZE)(self._load_detail)
+
+    @classmethod
+    def from_file(cls, path: str) -> tuple["ExerciseStore", list[dict[str, Any]], bytes]:
+        """
+        Returns (store, parsed exercises, raw file bytes). The parsed dicts are for
+        building the indexes at load time and should be dropped afterwards.
+        """
+        with open(path, "rb") as f:
+            raw = f.read()
+
+        exercises = _parse_array(raw)
+        tuples: dict = {}
+        records, parts, offset = [], [], 0
+        for ex in exercises:
+            part = json.dumps([ex.get(k) for k in LAZY_FIELDS], ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+            records.append(ExerciseRecord(ex, offset, len(part), tuples))
+            parts.append(part)
+            offset += len(part)
+        return cls(records, _map_private(b"".join(parts))), exercises, raw
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self.to_dict(j) for j in range(*i.indices(len(self.records)))]
+        if i < 0:
+            i += len(self.records)
+        return self.to_dict(i)
+
+    def _load_detail(self, i: int) -> dict[str, Any]:
+        rec = self.records[i]
+        values = json.loads(self._blob[rec.offset:rec.offset + rec.length])
+        return dict(zip(LAZY_FIELDS, values))
+
+    def project(self, i: int, fields: tuple[str, ...]) -> dict[str, Any]:
+        """
+        Exercise i with only `fields`, in that order, read from the record; the
+        detail blob is only parsed when instructions or images are among them.
+        """
+        rec = self.records[i]
+        out = {}
+        for f in fields:
+            if f in LAZY_FIELDS:
+                value = self.detail(i)[f]
+            elif f in RECORD_LISTS:
+                value = getattr(rec, RECORD_LISTS[f])
+            else:
+                value = getattr(rec, f)
+            # lists are copied, as in to_dict()
+            out[f] = list(value) if isinstance(value, (list, tuple)) else value
+        return out
+
+    def to_dict(self, i: int) -> dict[str, Any]:
+        rec = self.records[i]
+        detail = self.detail(i)
+        out = {
+            "name": rec.name,
+            "force": rec.force,
+            "level": rec.level,
+            "mechanic": rec.mechanic,
+            "equipment": rec.equipment,
+            "primaryMuscles": None if rec.primary_muscles is None else list(rec.primary_muscles),
+            "secondaryMuscles": None if rec.secondary_muscles is None else list(rec.secondary_muscles),
+            # lists are copied so callers can't mutate the cached detail
+            "instructions": None if detail["instructions"] is None else list(detail["instructions"]),
+            "category": rec.category,
+            "images": None if detail["images"] is None else list(detail["images"]),
+            "id": rec.id,
+        }
+        if rec.extra:
+            out.update(rec.extra)
+        return out
+
+
+# n-gram sizes kept in the text index. Queries up to NGRAM_MAX chars are answered
+# straight from the postings, longer ones intersect their trigrams and verify.
+NGRAM_MAX = 3
+
+
+def _iter_bits(bits: int):
+    # yields set bit positions in ascending order (== file order of exercises)
+    while bits:
+        low = bits & -bits
+        yield low.bit_length() - 1
+        bits ^= low
+
+
+def _grams(text: str):
+    grams = set()
+    for size in range(1, NGRAM_MAX + 1):
+        for i in range(len(text) - size + 1):
+            grams.add(text[i:i + size])
+    return grams
+
+
+class FacetStore:
+    """
+    Precomputed facet tables for the exercise list: lowercased muscle / equipment /
+    category -> exercise positions (file order), plus the /exercises/stats payload.
+    """
+
+    def __init__(self, exercises: list[dict[str, Any]]):
+        self.muscle_ids: dict[str, list[int]] = {}
+        self.equipment_ids: dict[str, list[int]] = {}
+        self.category_ids: dict[str, list[int]] = {}
+
+        categories = {}
+        equipment_types = {}
+        muscle_groups = {}
+
+        for i, ex in enumerate(exercises):
+            muscles = {m.lower() for m in ex.get("primaryMuscles", [])}
+            muscles |= {m.lower() for m in ex.get("secondaryMuscles", [])}
+            for m in muscles:
+                self.muscle_ids.setdefault(m, []).append(i)
+
+            eq = (ex.get("equipment") or "").lower()
+            self.equipment_ids.setdefault(eq, []).append(i)
+
+            cat = (ex.get("category") or "").lower()
+            self.category_ids.setdefault(cat, []).append(i)
+
+            cat = ex.get("category", "Unknown")
+            categories[cat] = categories.get(cat, 0) + 1
+
+            eq = ex.get("equipment", "Unknown")
+            equipment_types[eq] = equipment_types.get(eq, 0) + 1
+
+            for m in ex.get("primaryMuscles", []):
+                muscle_groups[m] = muscle_groups.get(m, 0) + 1
+
+        self.stats = {
+            "total_exercises": len(exercises),
+            "categories": categories,
+            "equipment_types": equipment_types,
+            "primary_muscle_distribution": muscle_groups,
+        }
+
+    @classmethod
+    def from_tables(cls, tables: dict[str, Any]) -> "FacetStore":
+        # inverse of to_tables(), used when loading the compiled catalog
+        store = cls.__new__(cls)
+        store.muscle_ids = tables["muscle_ids"]
+        store.equipment_ids = tables["equipment_ids"]
+        store.category_ids = tables["category_ids"]
+        store.stats = tables["stats"]
+        return store
+
+    def to_tables(self) -> dict[str, Any]:
+        return {
+            "muscle_ids": self.muscle_ids,
+            "equipment_ids": self.equipment_ids,
+            "category_ids": self.category_ids,
+            "stats": self.stats,
+        }
+
+    def by_muscle(self, muscle: str) -> list[int]:
+        return self.muscle_ids.get(muscle, [])
+
+
+def _to_bits(positions: list[int]) -> int:
+    bits = 0
+    for i in positions:
+        bits |= 1 << i
+    return bits
+
+
+class SearchIndex:
+    """
+    In-memory inverted index over the exercise list, built once per load.
+
+    Every posting list is an int bitset where bit i is catalog.exercises[i], so
+    combining filters is just & / | and results come out in file order.
+    """
+
+    def __init__(self, exercises: list[dict[str, Any]], facets: FacetStore):
+        self._set_facets(len(exercises), facets)
+        self.text_postings: dict[str, int] = {}
+
+        # lowercased text for verifying long queries; instruction lines joined with
+        # \x00 so a query can never match across two lines
+        self.names_lc: list[str] = []
+        self.instructions_lc: list[str] = []
+
+        for i, ex in enumerate(exercises):
+            bit = 1 << i
+
+            name = ex.get("name", "").lower()
+            lines = [inst.lower() for inst in ex.get("instructions", [])]
+            self.names_lc.append(name)
+            self.instructions_lc.append("\x00".join(lines))
+
+            grams = _grams(name)
+            for line in lines:
+                grams |= _grams(line)
+            for g in grams:
+                self.text_postings[g] = self.text_postings.get(g, 0) | bit
+
+    @classmethod
+    def from_postings(cls, size: int, text_postings: dict[str, int], facets: FacetStore,
+                      names_lc: Sequence[str], instructions_lc: Sequence[str]) -> "SearchIndex":
+        # prebuilt postings (compiled catalog); the text sequences may be lazy views
+        index = cls.__new__(cls)
+        index._set_facets(size, facets)
+        index.text_postings = text_postings
+        index.names_lc = names_lc
+        index.instructions_lc = instructions_lc
+        return index
+
+    def _set_facets(self, size: int, facets: FacetStore):
+        self.size = size
+        self.all_bits = (1 << size) - 1
+        self.muscle_postings = {m: _to_bits(ids) for m, ids in facets.muscle_ids.items()}
+        self.equipment_postings = {e: _to_bits(ids) for e, ids in facets.equipment_ids.items()}
+        self.category_postings = {c: _to_bits(ids) for c, ids in facets.category_ids.items()}
+
+    def _text_bits(self, q: str) -> int:
+        if len(q) <= NGRAM_MAX:
+            return self.text_postings.get(q, 0)
+
+        bits = self.all_bits
+        for i in range(len(q) - NGRAM_MAX + 1):
+            bits &= self.text_postings.get(q[i:i + NGRAM_MAX], 0)
+            if not bits:
+                return 0
+        return bits
+
+    def _text_matches(self, i: int, q: str) -> bool:
+        return q in self.names_lc[i] or q in self.instructions_lc[i]
+
+    @staticmethod
+    def _substring_bits(postings: dict[str, int], needle: str) -> int:
+        # equipment/category only have a handful of distinct values
+        bits = 0
+        for value, value_bits in postings.items():
+            if needle in value:
+                bits |= value_bits
+        return bits
+
+    def filter_bits(self, muscle: str = "", equipment: str = "", category: str = "") -> int:
+        """Positions passing the muscle / equipment / category filters, as a bitset."""
+        bits = self.all_bits
+
+        if muscle:
+            bits &= self.muscle_postings.get(muscle, 0)
+        if equipment and bits:
+            bits &= self._substring_bits(self.equipment_postings, equipment)
+        if category and bits:
+            bits &= self._substring_bits(self.category_postings, category)
+        return bits
+
+    def search(self, q: str = "", muscle: str = "", equipment: str = "", category: str = "",
+               limit: int = 20) -> list[int]:
+        """
+        Same semantics as the old linear scan: substring on name/instructions, exact
+        muscle match, substring equipment/category. Expects lowercased, stripped
+        inputs and returns exercise positions in file order.
+        """
+        bits = self.filter_bits(muscle, equipment, category)
+        if q and bits:
+            bits &= self._text_bits(q)
+
+        verify = len(q) > NGRAM_MAX
+        results = []
+        for i in _iter_bits(bits):
+            if verify and not self._text_matches(i, q):
+                continue
+            results.append(i)
+            if len(results) >= limit:
+                break
+        return results
 
-exercises_data: list[dict[str, Any]] = []
-muscle_groups_data: list[dict[str, str]] = []
 
 def extract_muscle_groups_from_exercises(exercises):
     muscle_groups = set()
@@ -14,16 +394,282 @@ def extract_muscle_groups_from_exercises(exercises):
             muscle_groups.add(m)
     return [{"name": m} for m in sorted(muscle_groups)]
 
-def load_exercise_data():
-    global exercises_data, muscle_groups_data
+class _CatalogText(Sequence):
+    """Lowercased name / joined instructions of catalog record i, decoded on lookup."""
+
+    def __init__(self, catalog: CatalogFile, field: str):
+        self.catalog = catalog
+        self.field = field
+        # long queries verify the same popular candidates over and over
+        self._text = functools.lru_cache(maxsize=DETAIL_CACHE_SIZE)(self._decode)
+
+    def __len__(self) -> int:
+        return self.catalog.count
+
+    def __getitem__(self, i: int) -> str:
+        # bounds matter: Sequence iteration stops on IndexError
+        if not 0 <= i < self.catalog.count:
+            raise IndexError(i)
+        return self._text(i)
+
+    def _decode(self, i: int) -> str:
+        if self.field == "name":
+            return self.catalog.name(i).lower()
+        return "\x00".join(line.lower() for line in self.catalog.instructions(i))
+
+
+def _source_hash(raw: bytes) -> str:
+    return hashlib.sha256(raw).hexdigest()[:16]
+
+
+def compile_exercise_catalog(json_path: str | None = None, out_path: str | None = None) -> str:
+    """Compiles exercises.json into the binary catalog; returns the dataset version."""
+    json_path = json_path or DATA_PATH
+    out_path = out_path or CATALOG_PATH
+    with open(json_path, "rb") as f:
+        raw = f.read()
+    exercises = json.loads(raw.decode("utf-8"))
+    version = _source_hash(raw)
+
+    new_facets = FacetStore(exercises)
+    new_index = SearchIndex(exercises, new_facets)
+    meta = new_facets.to_tables()
+    meta["muscle_groups"] = extract_muscle_groups_from_exercises(exercises)
+
+    write_catalog(out_path, exercises, version, new_index.text_postings, meta)
+    return version
+
+
+def _load_from_catalog(catalog_path: str, version: str):
+    catalog = CatalogFile(catalog_path)
+    if catalog.source_hash != version:
+        raise CatalogError("compiled catalog is stale, exercises.json changed since it was built")
+
+    meta = catalog.meta()
+    new_facets = FacetStore.from_tables(meta)
+    new_index = SearchIndex.from_postings(
+        catalog.count, catalog.text_postings(), new_facets,
+        _CatalogText(catalog, "name"), _CatalogText(catalog, "instructions"),
+    )
+    return CatalogExercises(catalog), meta["muscle_groups"], new_facets, new_index
+
+
+def _load_from_json(data_path: str):
+    new_store, exercises, raw = ExerciseStore.from_file(data_path)
+    new_facets = FacetStore(exercises)
+    new_index = SearchIndex(exercises, new_facets)
+    return new_store, extract_muscle_groups_from_exercises(exercises), new_facets, new_index, _source_hash(raw)
+
+
+T = TypeVar("T")
+
+# builders run in the background after every load (see prebuild())
+_prebuilt: list[Callable[["Catalog"], Any]] = []
+
+
+def prebuild(build: Callable[["Catalog"], T]) -> Callable[["Catalog"], T]:
+    """
+    Registers build (a class or function taking a Catalog) to be built for every
+    newly loaded catalog in a background thread, so requests normally find it
+    ready in Catalog.derived(). Usable as a class decorator.
+    """
+    _prebuilt.append(build)
+    return build
+
+
+# built after the load rather than in Catalog(), so the swap doesn't wait on them
+@prebuild
+def build_ranked_index(catalog: "Catalog") -> RankedIndex:
+    return RankedIndex(catalog.search_index.names_lc, catalog.search_index.instructions_lc)
+
+
+@prebuild
+def build_suggest_index(catalog: "Catalog") -> SuggestIndex:
+    exercises = catalog.exercises
+    rows = (exercises.project(i, SUGGEST_FIELDS) for i in range(len(exercises)))
+    return SuggestIndex(rows, [m["name"] for m in catalog.muscle_groups])
+
+
+class Catalog:
+    """
+    One fully built version of the exercise dataset. Never mutated after
+    construction: a reload builds a new Catalog and swaps the module reference,
+    so a request that took a snapshot() keeps a consistent view until it's done.
+
+    Structures other modules compute from the dataset (selection pools,
+    similarity index, ...) are kept on the snapshot they were computed from,
+    through derived() / derived_async().
+    """
+
+    __slots__ = (
+        "version", "source", "exercises", "muscle_groups", "facets", "search_index",
+        "loaded_at", "_derived", "_derived_lock",
+    )
+
+    def __init__(self, version: str, source: str, exercises: Sequence[dict[str, Any]],
+                 muscle_groups: list[dict[str, str]], facets: FacetStore, search_index: SearchIndex):
+        self.version = version
+        self.source = source
+        # ExerciseStore (parsed from json) or CatalogExercises (mapped catalog)
+        self.exercises = exercises
+        self.muscle_groups = muscle_groups
+        self.facets = facets
+        self.search_index = search_index
+        self.loaded_at = time.time()
+        self._derived: dict[Callable, Any] = {}
+        self._derived_lock = threading.Lock()
+
+    @property
+    def ranked_index(self) -> RankedIndex:
+        """Relevance ranking (sort=relevance), from the same lowercased text as search_index."""
+        return self.derived(build_ranked_index)
+
+    @property
+    def suggest_index(self) -> SuggestIndex:
+        """/exercises/suggest completions over exercise and muscle names."""
+        return self.derived(build_suggest_index)
+
+    def derived(self, build: Callable[["Catalog"], T]) -> T:
+        """
+        build(self), computed once per snapshot and kept with it, so the two
+        versions live during a reload each have their own. Building can take tens
+        of ms; from async code use derived_async().
+        """
+        value = self._derived.get(build)
+        if value is None:
+            with self._derived_lock:
+                value = self._derived.get(build)
+                if value is None:
+                    value = self._derived[build] = build(self)
+        return value
+
+    async def derived_async(self, build: Callable[["Catalog"], T]) -> T:
+        """derived(), with a build that is still missing run off the event loop."""
+        value = self._derived.get(build)
+        if value is None:
+            value = await asyncio.get_running_loop().run_in_executor(None, self.derived, build)
+        return value
+
+    def prebuild_all(self) -> None:
+        for build in list(_prebuilt):
+            try:
+                self.derived(build)
+            except Exception as e:
+                # the request that needs it will build it again and see the error
+                print(f"Prebuilding {getattr(build, '__name__', build)} failed: {e!r}")
+
+    @classmethod
+    def empty(cls) -> "Catalog":
+        facets = FacetStore([])
+        return cls("", "empty", ExerciseStore([]), [], facets, SearchIndex([], facets))
+
+
+_current = Catalog.empty()
+_reload_lock = threading.Lock()
+# (mtime_ns, size) of exercises.json behind _current, for the watcher
+_loaded_signature: tuple[int, int] | None = None
+
+
+def snapshot() -> Catalog:
+    """The catalog to use for the rest of this request; take it once, up front."""
+    return _current
+
+
+def _file_signature(path: str) -> tuple[int, int] | None:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def _build_catalog() -> Catalog:
+    # hashing the json is cheap next to parsing it and tells us if the catalog is current
+    with open(DATA_PATH, "rb") as f:
+        version = _source_hash(f.read())
+
+    try:
+        exercises, muscle_groups, new_facets, new_index = _load_from_catalog(CATALOG_PATH, version)
+        return Catalog(version, "catalog", exercises, muscle_groups, new_facets, new_index)
+    except CatalogError as e:
+        reason = e
+
+    if CATALOG_AUTOCOMPILE:
+        try:
+            version = compile_exercise_catalog()
+            exercises, muscle_groups, new_facets, new_index = _load_from_catalog(CATALOG_PATH, version)
+            print(f"Exercise catalog recompiled ({reason})")
+            return Catalog(version, "catalog", exercises, muscle_groups, new_facets, new_index)
+        except (OSError, CatalogError) as e:
+            reason = e
+
+    print(f"Exercise catalog not used ({reason}); parsing exercises.json")
+    # version from the bytes actually parsed, in case the file changed just now
+    exercises, muscle_groups, new_facets, new_index, version = _load_from_json(DATA_PATH)
+    return Catalog(version, "json", exercises, muscle_groups, new_facets, new_index)
+
+
+def load_exercise_data() -> Catalog:
+    """
+    (Re)loads the dataset and swaps it in. Safe to call while requests are being
+    served: everything is built first, readers holding the old snapshot finish
+    on it, and if building fails the current catalog stays in place.
+    """
+    global _current, _loaded_signature
+
+    with _reload_lock:
+        signature = _file_signature(DATA_PATH)
+        new = _build_catalog()
+
+        # reset before the swap: requests still on the old snapshot can't store
+        # into the new version's cache, and the new version starts empty
+        catalog_cache.reset(new.version)
+        _current = new
+        _loaded_signature = signature
+
+    if len(new.exercises):
+        threading.Thread(target=new.prebuild_all, name="catalog-prebuild", daemon=True).start()
+
+    print(f"Loaded {len(new.exercises)} exercises ({new.source}, version {new.version})")
+    print(f"Extracted {len(new.muscle_groups)} muscle groups")
+    print(f"Indexed {len(new.search_index.text_postings)} search terms")
+    return new
+
+
+def reload_if_changed() -> bool:
+    if _file_signature(DATA_PATH) == _loaded_signature:
+        return False
+    load_exercise_data()
+    return True
+
+
+class DatasetWatcher:
+    """Polls exercises.json and reloads the catalog in the background when it changes."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self):
+        if self.interval <= 0 or self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="exercise-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval + 1)
+            self._thread = None
 
-    base_dir = os.path.dirname(os.path.abspath(__file__))  # .../services
-    data_path = os.path.join(base_dir, "..", "data", "exercises.json")
-    data_path = os.path.abspath(data_path)
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                reload_if_changed()
+            except Exception as e:
+                # keep serving the current catalog; try again next tick
+                print(f"Exercise reload failed: {e!r}")
 
-    with open(data_path, "r", encoding="utf-8") as f:
-        exercises_data = json.load(f)
 
-    muscle_groups_data = extract_muscle_groups_from_exercises(exercises_data)
-    print(f"Loaded {len(exercises_data)} exercises")
-    print(f"Extracted {len(muscle_groups_data)} muscle groups")
+watcher = DatasetWatcher(float(os.getenv("EXERCISE_WATCH_INTERVAL", "5")))
@@ -0,0 +1,112 @@
+"""
+Autocomplete for GET /api/exercises/suggest.
+
+Exercise names and muscle names are normalized (lowercase, punctuation to
+spaces) and every word start becomes a key, so "curl" completes "Barbell Curl".
+Keys live in one sorted list searched with bisect; the best completions for all
+1-3 character prefixes, where ranges are widest, are worked out at build time.
+
+Completions are ordered by a static popularity weight (muscles first, then
+beginner / compound / strength exercises), with names that start with the typed
+text ahead of mid-name matches.
+"""
+import bisect
+import heapq
+import re
+from typing import Any, Iterable
+
+MAX_SUGGESTIONS = 20
+PRECOMPUTED_PREFIX_LEN = 3
+
+MUSCLE_WEIGHT = 10.0
+LEVEL_WEIGHTS = {"beginner": 3.0, "intermediate": 2.0, "expert": 1.0}
+CATEGORY_WEIGHTS = {"strength": 2.0, "powerlifting": 1.5, "olympic weightlifting": 1.0}
+COMPOUND_WEIGHT = 1.0
+NAME_START_BONUS = 5.0
+# the fields of an exercise SuggestIndex reads
+SUGGEST_FIELDS = ("id", "name", "level", "category", "mechanic")
+
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+
+
+def normalize(text: str) -> str:
+    return _NON_WORD.sub(" ", text.lower()).strip()
+
+
+def popularity(ex: dict[str, Any]) -> float:
+    weight = LEVEL_WEIGHTS.get(ex.get("level"), 0.0)
+    weight += CATEGORY_WEIGHTS.get(ex.get("category"), 0.0)
+    if ex.get("mechanic") == "compound":
+        weight += COMPOUND_WEIGHT
+    return weight
+
+
+class SuggestIndex:
+    def __init__(self, exercises: Iterable[dict[str, Any]], muscle_names: Iterable[str]):
+        # one row per completion target: (text, type, exercise id or None)
+        self.targets: list[tuple[str, str, str | None]] = []
+        pairs: list[tuple[str, float, int]] = []
+
+        def add(text: str, kind: str, ref: str | None, weight: float):
+            t = len(self.targets)
+            self.targets.append((text, kind, ref))
+            norm = normalize(text)
+            starts = [0] + [m.end() for m in re.finditer(" ", norm)]
+            for n, start in enumerate(starts):
+                pairs.append((norm[start:], weight + (NAME_START_BONUS if n == 0 else 0.0), t))
+
+        for name in muscle_names:
+            add(name, "muscle", None, MUSCLE_WEIGHT)
+        for ex in exercises:
+            if ex.get("name"):
+                add(ex["name"], "exercise", ex.get("id"), popularity(ex))
+
+        pairs.sort()
+        self.keys = [k for k, _, _ in pairs]
+        self.scores = [s for _, s, _ in pairs]
+        self.key_targets = [t for _, _, t in pairs]
+
+        # best completions of every short prefix; longer prefixes hit narrow ranges
+        self.top: dict[str, tuple[int, ...]] = {}
+        short: dict[str, dict[int, float]] = {}
+        for key, score, t in pairs:
+            for n in range(1, min(PRECOMPUTED_PREFIX_LEN, len(key)) + 1):
+                best = short.setdefault(key[:n], {})
+                if score > best.get(t, -1.0):
+                    best[t] = score
+        for prefix, best in short.items():
+            self.top[prefix] = self._rank(best, MAX_SUGGESTIONS)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def _rank(self, best: dict[int, float], limit: int) -> tuple[int, ...]:
+        ranked = heapq.nsmallest(limit, best.items(), key=lambda item: (-item[1], self.targets[item[0]][0]))
+        return tuple(t for t, _ in ranked)
+
+    def complete(self, prefix: str, limit: int = 10) -> list[int]:
+        """Target indexes completing `prefix` (already normalized), best first."""
+        if not prefix:
+            return []
+        limit = min(limit, MAX_SUGGESTIONS)
+        if len(prefix) <= PRECOMPUTED_PREFIX_LEN:
+            return list(self.top.get(prefix, ())[:limit])
+
+        lo = bisect.bisect_left(self.keys, prefix)
+        hi = bisect.bisect_left(self.keys, prefix + "\uffff", lo)
+        best: dict[int, float] = {}
+        for j in range(lo, hi):
+            t = self.key_targets[j]
+            if self.scores[j] > best.get(t, -1.0):
+                best[t] = self.scores[j]
+        return list(self._rank(best, limit))
+
+    def suggest(self, q: str, limit: int = 10) -> list[dict[str, Any]]:
+        out = []
+        for t in self.complete(normalize(q), limit):
+            text, kind, ref = self.targets[t]
+            item = {"text": text, "type": kind}
+            if ref is not None:
+                item["id"] = ref
+            out.append(item)
+        return out
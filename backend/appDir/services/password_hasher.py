@@ -0,0 +1,95 @@
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+
+import bcrypt
+
+from appDir.core.config import BCRYPT_ROUNDS, PASSWORD_HASH_WORKERS, PASSWORD_HASH_MAX_PENDING
+
+
+class PasswordHasherBusy(Exception):
+    """Too many hashes already running/queued; the caller should retry later."""
+
+    retry_after = 1
+
+
+# --- worker side (must be module-level so the process pool can pickle them) ---
+
+def _hashpw(password: bytes, rounds: int) -> bytes:
+    return bcrypt.hashpw(password, bcrypt.gensalt(rounds=rounds))
+
+
+def _checkpw(password: bytes, stored: bytes) -> bool:
+    return bcrypt.checkpw(password, stored)
+
+
+# --- app side ---
+
+_executor: ProcessPoolExecutor | None = None
+_pending = 0
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=max(PASSWORD_HASH_WORKERS, 1))
+    return _executor
+
+
+def start():
+    _get_executor()
+
+
+def shutdown():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+async def _run(fn, *args):
+    # only touched from the event loop, so a plain counter is enough
+    global _pending
+    if _pending >= PASSWORD_HASH_MAX_PENDING:
+        raise PasswordHasherBusy()
+
+    _pending += 1
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_get_executor(), fn, *args)
+    finally:
+        _pending -= 1
+
+
+def _to_bytes(value: str | bytes) -> bytes:
+    return value.encode("utf-8") if isinstance(value, str) else bytes(value)
+
+
+async def hash_password(password: str) -> str:
+    return (await _run(_hashpw, password.encode("utf-8"), BCRYPT_ROUNDS)).decode("utf-8")
+
+
+async def verify_password(password: str, stored_hash: str | bytes) -> bool:
+    """Raises ValueError if stored_hash isn't a bcrypt hash, same as bcrypt.checkpw."""
+    return await _run(_checkpw, password.encode("utf-8"), _to_bytes(stored_hash))
+
+
+def hash_cost(stored_hash: str | bytes) -> int | None:
+    # $2b$12$<salt+hash>
+    parts = _to_bytes(stored_hash).split(b"$")
+    if len(parts) < 4 or not parts[2].isdigit():
+        return None
+    return int(parts[2])
+
+
+def needs_rehash(stored_hash: str | bytes) -> bool:
+    cost = hash_cost(stored_hash)
+    return cost is not None and cost < BCRYPT_ROUNDS
+
+
+def stats() -> dict:
+    return {
+        "workers": PASSWORD_HASH_WORKERS,
+        "pending": _pending,
+        "max_pending": PASSWORD_HASH_MAX_PENDING,
+        "rounds": BCRYPT_ROUNDS,
+    }
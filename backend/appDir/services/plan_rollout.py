@@ -0,0 +1,125 @@
+"""
+Bulk (re)generation of weekly plans for every user, for when the schedules change
+(bump plan_service.PLAN_VERSION so every stored key goes stale) or a retrained
+split policy was deployed (only plans whose split changed are stale). The policy
+is loaded from SPLIT_POLICY_PATH (or --policy) first, so splits and keys come out
+the same as in the app.
+
+Users are streamed through a server-side cursor, plans are generated once per
+distinct set of profile values (a cohort of thousands usually has a few dozen),
+and new rows go to `workouts` in multi-row INSERTs on a second connection,
+committed per batch so an interrupted run keeps what it wrote.
+
+CLI: python -m appDir.scripts.rollout_plans
+"""
+import time
+from typing import Any, Iterable, Iterator
+
+from psycopg2.extras import execute_values
+
+from appDir.core.db import get_conn
+from appDir.services import exercise_store
+from appDir.services.plan_service import plan_inputs, plan_key, plan_cache
+from appDir.services.split_policy import SPLIT_POLICY_PATH, load_split_policy
+from appDir.services.workout_generator import assign_split
+
+PROFILES_SQL = """
+SELECT
+    u.id, u.experience_level, u.workout_volume, u.goals, u.equipment,
+    u.session_length_minutes, w.plan_key
+FROM users u
+LEFT JOIN LATERAL (
+    SELECT plan_key
+    FROM workouts
+    WHERE user_id = u.id
+    ORDER BY created_at DESC, id DESC
+    LIMIT 1
+) w ON TRUE
+ORDER BY u.id
+"""
+
+
+def iter_profile_batches(conn, batch_size: int) -> Iterator[list[dict[str, Any]]]:
+    # named cursor = server-side; only batch_size rows are in memory at a time
+    with conn.cursor(name="plan_rollout") as cur:
+        cur.itersize = batch_size
+        cur.execute(PROFILES_SQL)
+        while True:
+            rows = cur.fetchmany(batch_size)
+            if not rows:
+                return
+            yield rows
+
+
+def plan_rows(profiles: Iterable[dict[str, Any]], seen: dict[tuple, tuple[str, str]],
+              force: bool = False) -> list[tuple[int, str, str, float]]:
+    """
+    (user_id, plan json, plan_key, split propensity) for every profile whose
+    latest plan is stale (or all of them with force). `seen` maps the raw profile
+    values and assigned split to their (plan_key, plan json) and is shared across
+    batches, so each distinct profile is canonicalized and generated only once
+    per split per run.
+    """
+    rows = []
+    for p in profiles:
+        goals = p["goals"]
+        split, propensity = assign_split(p["experience_level"], p["workout_volume"], goals, p["equipment"],
+                                         user_id=p["id"])
+        raw = (p["experience_level"], p["workout_volume"], tuple(goals or ()), p["equipment"],
+               p["session_length_minutes"], split)
+        hit = seen.get(raw)
+        if hit is None:
+            inputs = plan_inputs(p["experience_level"], p["workout_volume"], goals, p["equipment"],
+                                 p["session_length_minutes"])
+            key = plan_key(inputs, split)
+            hit = seen[raw] = (key, plan_cache.get(key, inputs, split))
+        key, plan = hit
+        if not force and p.get("plan_key") == key:
+            continue
+        rows.append((p["id"], plan, key, propensity))
+    return rows
+
+
+def rollout_plans(batch_size: int = 2000, force: bool = False, dry_run: bool = False,
+                  policy_path: str = SPLIT_POLICY_PATH) -> dict[str, Any]:
+    started = time.perf_counter()
+    # plans carry exercises, so the catalog has to be loaded outside the app too
+    if not len(exercise_store.snapshot().exercises):
+        exercise_store.load_exercise_data()
+    # the same table the app picks splits with, or every key would come out as pi0's
+    load_split_policy(policy_path)
+
+    seen: dict[tuple, tuple[str, str]] = {}
+    users = written = 0
+
+    read_conn = get_conn()
+    write_conn = get_conn()
+    try:
+        for batch in iter_profile_batches(read_conn, batch_size):
+            users += len(batch)
+            rows = plan_rows(batch, seen, force=force)
+            if rows and not dry_run:
+                with write_conn.cursor() as cur:
+                    execute_values(
+                        cur,
+                        "INSERT INTO workouts (user_id, plan, plan_key, split_propensity) VALUES %s",
+                        rows,
+                        template="(%s, %s::jsonb, %s, %s)",
+                        page_size=1000,
+                    )
+                write_conn.commit()
+            written += len(rows)
+            print(f"[plans] {users} users scanned, {written} plans {'to write' if dry_run else 'written'}")
+    finally:
+        read_conn.close()
+        write_conn.close()
+
+    elapsed = time.perf_counter() - started
+    return {
+        "users": users,
+        "written": written,
+        "unchanged": users - written,
+        "distinct_plans": len({key for key, _ in seen.values()}),
+        "seconds": round(elapsed, 3),
+        "dry_run": dry_run,
+    }
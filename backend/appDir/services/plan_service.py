@@ -0,0 +1,189 @@
+"""
+Weekly plans: generate_plan() memoized on the profile inputs it reads, and the
+result persisted to `workouts` so the current plan is a single indexed read.
+
+Each stored plan carries its `plan_key` (the canonical profile inputs). When
+update_user_stats changes one of those fields the key no longer matches the
+latest row, so the next current_plan() call generates and stores a fresh plan;
+nothing has to be cleared by hand, in this worker or any other. The key also
+names the split the user was assigned (workout_generator.assign_split), so after
+a retrained split policy is loaded only the users whose split changed get a new
+plan.
+"""
+import json
+import threading
+from collections import OrderedDict
+from typing import Any
+
+from appDir.core.async_db import adb_conn, fetch_one
+from appDir.core.config import PLAN_CACHE_SIZE
+from appDir.services import exercise_store
+from appDir.services.exercise_selector import SelectionPools
+from appDir.services.workout_generator import assign_split, generate_plan, pick_split
+
+# bump when generate_plan's output changes so stored plans get regenerated
+PLAN_VERSION = 4
+
+# users columns generate_plan depends on (payload names in UserStatsUpdate)
+PLAN_FIELDS = ("experienceLevel", "workoutVolume", "goals", "equipment", "session_length_minutes")
+
+
+class UserNotFound(Exception):
+    pass
+
+
+PlanInputs = tuple[str, str, list[str], str, int | None]
+
+
+def plan_inputs(experience_level: str, workout_volume: str, goals: list[str] | None,
+                equipment: str, session_length_minutes: int | None = None) -> PlanInputs:
+    """Normalizes the profile values so equivalent profiles share one plan."""
+    return (
+        (experience_level or "").strip(),
+        (workout_volume or "").strip(),
+        sorted({g.strip() for g in goals or [] if g and g.strip()}),
+        (equipment or "").strip(),
+        session_length_minutes,
+    )
+
+
+def plan_key(inputs: PlanInputs, split: str | None = None) -> str:
+    """The key of the plan for `inputs` on `split` (default: pick_split's)."""
+    split = split or pick_split(*inputs[:4])
+    return f"v{PLAN_VERSION}:{split}:" + json.dumps(inputs, separators=(",", ":"))
+
+
+class PlanCache:
+    """
+    Bounded LRU of plan_key -> encoded plan JSON. Entries remember the exercise
+    catalog version they were filled from and count as misses after a reload.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lru: OrderedDict[str, tuple[str, str]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str, inputs: PlanInputs, split: str | None = None) -> str:
+        version = exercise_store.snapshot().version
+        with self._lock:
+            entry = self._lru.get(key)
+            if entry is not None and entry[0] == version:
+                self._lru.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        encoded = json.dumps(generate_plan(*inputs, split=split), separators=(",", ":"))
+
+        with self._lock:
+            self._lru[key] = (version, encoded)
+            self._lru.move_to_end(key)
+            while len(self._lru) > self.max_entries:
+                self._lru.popitem(last=False)
+        return encoded
+
+    def clear(self) -> None:
+        with self._lock:
+            self._lru.clear()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+                "entries": len(self._lru),
+                "max_entries": self.max_entries,
+            }
+
+
+plan_cache = PlanCache(PLAN_CACHE_SIZE)
+
+
+def plan_for(experience_level: str, workout_volume: str, goals: list[str] | None,
+             equipment: str, session_length_minutes: int | None = None) -> dict[str, Any]:
+    """Plan for a set of profile values, without touching the database."""
+    inputs = plan_inputs(experience_level, workout_volume, goals, equipment, session_length_minutes)
+    return json.loads(plan_cache.get(plan_key(inputs), inputs))
+
+
+def _plan_response(user_id: int, workout_id: int, plan: Any, created_at) -> dict[str, Any]:
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return {
+        "user_id": user_id,
+        "workout_id": workout_id,
+        "created_at": created_at.isoformat() if created_at else None,
+        "plan": plan,
+    }
+
+
+# the user's profile and latest stored plan
+LATEST_PLAN_SQL = """
+SELECT
+    u.experience_level, u.workout_volume, u.goals, u.equipment,
+    u.session_length_minutes,
+    w.id AS workout_id, w.plan_key, w.plan, w.created_at
+FROM users u
+LEFT JOIN LATERAL (
+    SELECT id, plan_key, plan, created_at
+    FROM workouts
+    WHERE user_id = u.id
+    ORDER BY created_at DESC, id DESC
+    LIMIT 1
+) w ON TRUE
+WHERE u.id = %s
+"""
+
+
+async def current_plan(user_id: int) -> dict[str, Any]:
+    """
+    The user's latest stored plan, or a newly generated (and stored) one when
+    there is none yet or their profile changed since it was made.
+
+    No connection is held while the plan is generated. The insert runs under a
+    per-user advisory lock and re-reads the latest plan first, so concurrent
+    first requests store one row and all return it.
+    """
+    async with adb_conn() as conn:
+        row = await fetch_one(conn, LATEST_PLAN_SQL, (user_id,))
+    if not row:
+        raise UserNotFound(user_id)
+
+    inputs = plan_inputs(
+        row["experience_level"], row["workout_volume"], row["goals"], row["equipment"],
+        row["session_length_minutes"],
+    )
+    split, propensity = assign_split(*inputs[:4], user_id=user_id)
+    key = plan_key(inputs, split)
+    if row["workout_id"] is not None and row["plan_key"] == key:
+        return _plan_response(user_id, row["workout_id"], row["plan"], row["created_at"])
+
+    # normally prebuilt after the load; if not, don't build it on the event loop
+    await exercise_store.snapshot().derived_async(SelectionPools)
+    encoded = plan_cache.get(key, inputs, split)
+
+    async with adb_conn() as conn:
+        await fetch_one(conn, "SELECT pg_advisory_xact_lock(hashtext('current_plan'), %s)", (user_id,))
+        row = await fetch_one(conn, LATEST_PLAN_SQL, (user_id,))
+        if not row:
+            raise UserNotFound(user_id)
+        if row["workout_id"] is not None and row["plan_key"] == key:
+            # another request stored it while this one was generating
+            return _plan_response(user_id, row["workout_id"], row["plan"], row["created_at"])
+
+        saved = await fetch_one(
+            conn,
+            """
+            INSERT INTO workouts (user_id, plan, plan_key, split_propensity)
+            VALUES (%s, %s::jsonb, %s, %s)
+            RETURNING id, created_at
+            """,
+            (user_id, encoded, key, propensity),
+        )
+
+    return _plan_response(user_id, saved["id"], encoded, saved["created_at"])
@@ -0,0 +1,274 @@
+"""
+Read-through cache for the profile rows behind GET /api/{user_id}.
+
+Rows are kept per process in a bounded LRU with a TTL, keyed by user id, and
+tagged with users.profile_version, which every profile write bumps. Writers
+(routes/profile.py) go through changed_profile() inside their transaction: it
+reads the new row and queues a NOTIFY on CHANNEL with "<user id>:<version>",
+which Postgres delivers to every listening worker once the transaction commits
+and never if it rolls back. After the commit the writer puts the row in its own
+cache (write-through); every worker's listener drops older versions of it.
+
+The listener also remembers the newest version announced per user (the floor).
+A reader that loaded the row just before a write commits can finish after the
+notification arrived; its put() is below the floor and is dropped instead of
+caching the old row until the TTL.
+
+The cache is only used while the listener is connected. Before LISTEN is up, or
+while it reconnects, every read goes to the database, and the LRU is emptied on
+each (re)connect since notifications sent in between are lost. The TTL is the
+bound for anything else that slips through.
+
+PROFILE_CACHE_SHARED=local puts a second tier behind the LRU, LocalSharedStore:
+an in-process stand-in with the get / set / delete shape of a Redis or
+memcached client, which can replace it. Rows from it are checked against the
+same floors, so a worker never takes a version older than one it was told about.
+"""
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from typing import Any
+
+import psycopg
+
+from appDir.core.async_db import adb_conn, execute, fetch_one
+from appDir.core.config import DATABASE_URL, PROFILE_CACHE_SHARED, PROFILE_CACHE_SIZE, PROFILE_CACHE_TTL
+
+CHANNEL = "profile_changed"
+# floor for a deleted user: no version of the row is cached again
+DELETED = 2 ** 31 - 1
+
+PROFILE_SQL = """
+    SELECT
+        id,
+        email,
+        name,
+        profile_image_url,
+        age,
+        height,
+        weight,
+        experience_level,
+        workout_volume,
+        goals,
+        equipment,
+        created_at,
+        friend_code,
+        session_length_minutes,
+        profile_version
+    FROM users
+    WHERE id = %s
+"""
+
+
+class LocalSharedStore:
+    """
+    In-process stand-in for a shared cache. It shares nothing between workers;
+    it gives the second tier something to run against until a networked client
+    with the same get / set / delete methods is plugged in.
+    """
+
+    def __init__(self):
+        self._data: dict[str, tuple[float, dict]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> dict | None:
+        entry = self._data.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            return None
+        return entry[1]
+
+    def set(self, key: str, value: dict, ttl: float) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+
+class ProfileCache:
+    """Profile rows by user id; see the module docstring for how it stays consistent."""
+
+    def __init__(self, max_entries: int = 10000, ttl: float = 300.0, shared: LocalSharedStore | None = None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.shared = shared
+        self.listening = False
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.stale_puts = 0
+        self.notifications = 0
+        self._lru: OrderedDict[int, tuple[float, dict]] = OrderedDict()    # user id -> (expires, row)
+        self._floors: OrderedDict[int, int] = OrderedDict()                # user id -> newest version announced
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _shared_key(user_id: int) -> str:
+        return f"profile:{user_id}"
+
+    def get(self, user_id: int) -> dict | None:
+        if not self.listening:
+            with self._lock:
+                self.misses += 1
+            return None
+
+        now = time.monotonic()
+        with self._lock:
+            entry = self._lru.get(user_id)
+            if entry is not None:
+                if entry[0] > now:
+                    self._lru.move_to_end(user_id)
+                    self.hits += 1
+                    return entry[1]
+                del self._lru[user_id]
+
+        row = self.shared.get(self._shared_key(user_id)) if self.shared is not None else None
+        with self._lock:
+            if row is not None and row["profile_version"] >= self._floors.get(user_id, 0):
+                self.shared_hits += 1
+                self._store(user_id, row, now)
+                return row
+            self.misses += 1
+            return None
+
+    def put(self, row: dict) -> None:
+        """Caches a row read from the database, unless a newer version was already announced."""
+        if not self.listening:
+            return
+        user_id = row["id"]
+        with self._lock:
+            if row["profile_version"] < self._floors.get(user_id, 0):
+                self.stale_puts += 1
+                return
+            current = self._lru.get(user_id)
+            if current is not None and current[1]["profile_version"] > row["profile_version"]:
+                return
+            self._store(user_id, row, time.monotonic())
+        if self.shared is not None:
+            self.shared.set(self._shared_key(user_id), row, self.ttl)
+
+    def _store(self, user_id: int, row: dict, now: float) -> None:
+        self._lru[user_id] = (now + self.ttl, row)
+        self._lru.move_to_end(user_id)
+        while len(self._lru) > self.max_entries:
+            self._lru.popitem(last=False)
+
+    def invalidate(self, user_id: int, version: int = DELETED) -> None:
+        """Drops cached versions of the user's row older than `version` and refuses them from now on."""
+        with self._lock:
+            if version > self._floors.get(user_id, 0):
+                self._floors[user_id] = version
+                self._floors.move_to_end(user_id)
+                while len(self._floors) > self.max_entries:
+                    self._floors.popitem(last=False)
+            entry = self._lru.get(user_id)
+            if entry is not None and entry[1]["profile_version"] < version:
+                del self._lru[user_id]
+        if version == DELETED and self.shared is not None:
+            self.shared.delete(self._shared_key(user_id))
+
+    def apply_notification(self, payload: str) -> None:
+        user_id, _, version = payload.partition(":")
+        try:
+            self.invalidate(int(user_id), DELETED if version == "deleted" else int(version))
+        except ValueError:
+            print(f"profile cache: ignoring notification {payload!r}")
+            return
+        with self._lock:
+            self.notifications += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._lru.clear()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.shared_hits + self.misses
+            return {
+                "listening": self.listening,
+                "hits": self.hits,
+                "shared_hits": self.shared_hits,
+                "misses": self.misses,
+                "hit_rate": round((self.hits + self.shared_hits) / total, 4) if total else 0.0,
+                "stale_puts": self.stale_puts,
+                "notifications": self.notifications,
+                "entries": len(self._lru),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl,
+                "shared": type(self.shared).__name__ if self.shared is not None else None,
+            }
+
+
+profile_cache = ProfileCache(
+    PROFILE_CACHE_SIZE,
+    PROFILE_CACHE_TTL,
+    LocalSharedStore() if PROFILE_CACHE_SHARED == "local" else None,
+)
+
+
+async def load_profile(user_id: int) -> dict | None:
+    """The user's profile row, from the cache or the database; None if there is no such user."""
+    row = profile_cache.get(user_id)
+    if row is None:
+        async with adb_conn() as conn:
+            row = await fetch_one(conn, PROFILE_SQL, (user_id,))
+        if row is not None:
+            profile_cache.put(row)
+    return row
+
+
+async def changed_profile(conn, user_id: int) -> dict | None:
+    """
+    Call inside the transaction that changed the user's row, after the UPDATE:
+    returns the row as it will be committed and queues the notification for the
+    other workers. Hand the row to profile_cache.put() once the commit went through.
+    """
+    row = await fetch_one(conn, PROFILE_SQL, (user_id,))
+    if row is not None:
+        await execute(conn, "SELECT pg_notify(%s, %s)", (CHANNEL, f"{user_id}:{row['profile_version']}"))
+    return row
+
+
+async def deleted_profile(conn, user_id: int) -> None:
+    """changed_profile() for a deleted user; call profile_cache.invalidate(user_id) after the commit."""
+    await execute(conn, "SELECT pg_notify(%s, %s)", (CHANNEL, f"{user_id}:deleted"))
+
+
+async def listen(cache: ProfileCache = profile_cache, dsn: str = DATABASE_URL, retry: float = 1.0) -> None:
+    """Applies profile notifications to `cache` until cancelled, reconnecting on errors."""
+    while True:
+        try:
+            async with await psycopg.AsyncConnection.connect(dsn, autocommit=True) as conn:
+                await conn.execute(f"LISTEN {CHANNEL}")
+                # changes made while nobody was listening are unknown
+                cache.clear()
+                cache.listening = True
+                async for note in conn.notifies():
+                    cache.apply_notification(note.payload)
+        except psycopg.Error as e:
+            print(f"profile cache listener: {e!r}, reconnecting in {retry}s")
+        finally:
+            cache.listening = False
+        await asyncio.sleep(retry)
+
+
+_listener: asyncio.Task | None = None
+
+
+def start_listener() -> None:
+    global _listener
+    if _listener is None:
+        _listener = asyncio.get_running_loop().create_task(listen())
+
+
+async def stop_listener() -> None:
+    global _listener
+    if _listener is not None:
+        _listener.cancel()
+        try:
+            await _listener
+        except asyncio.CancelledError:
+            pass
+        _listener = None
@@ -0,0 +1,110 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+# same encoding FastAPI's JSONResponse uses, so cached bodies are byte-identical
+# to what the routes used to return
+def encode_json(content: Any) -> bytes:
+    return json.dumps(
+        content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag == etag:
+            return True
+    return False
+
+
+class ResponseCache:
+    """
+    Encoded JSON bodies + ETags for the read-only catalog endpoints.
+
+    Entries are keyed by (endpoint, params) and only valid for one dataset
+    version; reset() drops everything when a new catalog is swapped in. Endpoints
+    without parameters live in `static` for the lifetime of a version, the
+    parameterized ones (pages, by-muscle) go through a bounded LRU.
+    """
+
+    def __init__(self, max_entries: int = 512):
+        self.max_entries = max_entries
+        self.version = ""
+        self.hits = 0
+        self.misses = 0
+        self._static: dict[Hashable, tuple[bytes, str]] = {}
+        self._lru: OrderedDict[Hashable, tuple[bytes, str]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def reset(self, version: str) -> None:
+        with self._lock:
+            self.version = version
+            self._static.clear()
+            self._lru.clear()
+
+    @staticmethod
+    def _make_etag(version: str, body: bytes) -> str:
+        digest = hashlib.blake2b(body, digest_size=8).hexdigest()
+        return f'"{version}-{digest}"'
+
+    def get(self, key: Hashable, build: Callable[[], Any], version: str,
+            static: bool = False) -> tuple[bytes, str]:
+        """
+        Returns (body, etag) for key as of dataset `version` (the caller's catalog
+        snapshot), calling build() and encoding its result on a miss. Requests on
+        an older snapshot than the cache are served but never cached. build() runs
+        outside the lock; two threads missing the same key at once both build it,
+        which is harmless since the result is identical.
+        """
+        with self._lock:
+            if version == self.version:
+                entry = self._static.get(key) if static else self._lru.get(key)
+                if entry is not None:
+                    if not static:
+                        self._lru.move_to_end(key)
+                    self.hits += 1
+                    return entry
+            self.misses += 1
+
+        body = encode_json(build())
+        entry = (body, self._make_etag(version, body))
+
+        with self._lock:
+            # the caller's snapshot isn't the cached version (a reload is in
+            # progress or just happened); hand the body back without storing it
+            if version != self.version:
+                return entry
+
+            if static:
+                self._static[key] = entry
+            else:
+                self._lru[key] = entry
+                self._lru.move_to_end(key)
+                while len(self._lru) > self.max_entries:
+                    self._lru.popitem(last=False)
+            return entry
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "version": self.version,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+                "static_entries": len(self._static),
+                "lru_entries": len(self._lru),
+                "lru_max_entries": self.max_entries,
+            }
+
+
+catalog_cache = ResponseCache()
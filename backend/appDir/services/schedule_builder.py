@@ -1,21 +1,106 @@
+"""
+Weekly schedules: which of the 7 days are training days and what each one
+focuses on, for a split's session cycle, a number of training days and one of
+the rest rules in core/rest_rules.py.
+
+A week always has exactly `days_per_week` training days (clamped to 1..7), taken
+from the cycle in order. The rule only decides where the 7 - days_per_week rest
+days go; any rest days it doesn't place land after the last session:
+
+    as_needed                   train back to back
+    every_other_day             rest after every session
+    between_sessions            same as every_other_day
+    after_lower                 rest after a lower-body session
+    after_legs                  rest after a legs session
+    after_every_other_legs      rest after the 2nd, 4th, ... legs session
+    after_cycle                 rest after the last session of the cycle
+    third_sixth_seventh         rest on days 3, 6 and 7
+
+Every (split, days, rule) combination is small and finite, so all weeks are
+built once at import into SCHEDULES and plan generation just looks them up.
+"""
+from types import MappingProxyType
+from typing import Callable, Mapping
+
+from appDir.core.splits import SPLITS
+from appDir.core.rest_rules import REST_RULES
+
+FIXED_REST_DAYS = {
+    "third_sixth_seventh": frozenset({3, 6, 7}),
+}
+
+
+def _focus_has(focus: str, part: str) -> bool:
+    return part in focus.split("_")
+
+
+# rule -> fn(focus of the session just done, its index in the week, cycle length,
+#            legs sessions done so far) -> rest tomorrow?
+AFTER_SESSION_RULES: dict[str, Callable[[str, int, int, int], bool]] = {
+    "every_other_day": lambda focus, idx, n, legs: True,
+    "between_sessions": lambda focus, idx, n, legs: True,
+    "after_lower": lambda focus, idx, n, legs: _focus_has(focus, "lower"),
+    "after_legs": lambda focus, idx, n, legs: _focus_has(focus, "legs"),
+    "after_every_other_legs": lambda focus, idx, n, legs: _focus_has(focus, "legs") and legs % 2 == 0,
+    "after_cycle": lambda focus, idx, n, legs: idx % n == n - 1,
+}
+
+REST_RULE_NAMES = frozenset({"as_needed", *AFTER_SESSION_RULES, *FIXED_REST_DAYS, *REST_RULES.values()})
+
+
 def build_week(cycle: list[str], days_per_week: int, rest_rule: str):
+    days_per_week = max(1, min(7, days_per_week))
+    rest_days = 7 - days_per_week
+    after_session = AFTER_SESSION_RULES.get(rest_rule)
+    fixed_rest = FIXED_REST_DAYS.get(rest_rule, frozenset())
+
     schedule = []
     cycle_idx = 0
+    rested = 0
+    legs_done = 0
+    rest_next = False
 
     for day in range(1, 8):
-        if len([d for d in schedule if d["type"] == "train"]) >= days_per_week:
+        # once the sessions are done, or while the rule asks for rest and there
+        # are rest days left to give
+        if cycle_idx >= days_per_week or (rested < rest_days and (rest_next or day in fixed_rest)):
             schedule.append({"day": day, "type": "rest"})
+            rested += 1
+            rest_next = False
             continue
 
-        if rest_rule == "every_other_day" and schedule and schedule[-1]["type"] == "train":
-            schedule.append({"day": day, "type": "rest"})
-            continue
+        focus = cycle[cycle_idx % len(cycle)]
+        schedule.append({"day": day, "type": "train", "focus": focus})
 
-        schedule.append({
-            "day": day,
-            "type": "train",
-            "focus": cycle[cycle_idx % len(cycle)]
-        })
+        legs_done += _focus_has(focus, "legs")
+        rest_next = bool(after_session and after_session(focus, cycle_idx, len(cycle), legs_done))
         cycle_idx += 1
 
     return schedule
+
+
+def _freeze(week: list[dict]) -> tuple[Mapping, ...]:
+    return tuple(MappingProxyType(d) for d in week)
+
+
+SCHEDULES: Mapping[tuple[str, int, str], tuple[Mapping, ...]] = MappingProxyType({
+    (split_name, days, rule): _freeze(build_week(split["sessions"], days, rule))
+    for split_name, split in SPLITS.items()
+    for days in range(1, 8)
+    for rule in REST_RULE_NAMES
+})
+
+
+def schedule_for(split_name: str, days_per_week: int, rest_rule: str) -> tuple[Mapping, ...]:
+    """Read-only week for the combination; see week_for() for a mutable copy."""
+    key = (split_name, max(1, min(7, days_per_week)), rest_rule)
+    week = SCHEDULES.get(key)
+    if week is None:
+        # unknown rule name: build_week treats it as as_needed
+        week = _freeze(build_week(SPLITS[split_name]["sessions"], key[1], rest_rule))
+    return week
+
+
+def week_for(split_name: str, days_per_week: int, rest_rule: str) -> list[dict]:
+    # proxy.copy() is dict.copy() on the underlying day, much cheaper than dict(proxy)
+    return [d.copy() for d in schedule_for(split_name, days_per_week, rest_rule)]
@@ -0,0 +1,253 @@
+"""
+Relevance-ranked exercise search (GET /api/exercises/search?sort=relevance).
+
+Built once per catalog load from the lowercased names / instructions that
+SearchIndex already keeps:
+
+- BM25 over word tokens, names weighted above instructions
+- every query word is expanded before scoring: exact term, prefixes of the last
+  word (typing-as-you-go), terms within a small edit distance ("dumbel" ->
+  "dumbbell") and two-word splits of run-together words ("benchpress")
+- trigram similarity of the whole query against each name, spaces removed, so
+  near-miss names still surface when no single word matches well
+- a bonus for names that contain every query word, and more when they contain
+  the query as a phrase
+
+Results come back as catalog positions, best first, ties in file order.
+"""
+import bisect
+import heapq
+import math
+import re
+from collections.abc import Sequence
+
+K1 = 1.2
+B = 0.75
+NAME_BOOST = 3.0
+INSTRUCTIONS_BOOST = 1.0
+
+PREFIX_WEIGHT = 0.7
+SPLIT_WEIGHT = 0.9
+FUZZY_WEIGHTS = {1: 0.6, 2: 0.35}   # edit distance -> weight
+MAX_PREFIX_TERMS = 24
+MAX_FUZZY_TERMS = 8
+
+TRIGRAM_WEIGHT = 4.0
+MIN_TRIGRAM_SIMILARITY = 0.35
+COVERAGE_WEIGHT = 6.0
+PHRASE_BONUS = 4.0
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+
+def stem(token: str) -> str:
+    # plural only: curls/curl, triceps/tricep, pushups/pushup
+    if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+        return token[:-1]
+    return token
+
+
+def tokenize(text: str) -> list[str]:
+    return [stem(t) for t in _TOKEN.findall(text.lower())]
+
+
+def _trigrams(text: str) -> set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def max_edits(term: str) -> int:
+    return 1 if len(term) <= 5 else 2
+
+
+def bounded_edit_distance(a: str, b: str, limit: int) -> int:
+    """Optimal string alignment distance, or limit + 1 once it is known to exceed limit."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    prev2: list[int] = []
+    prev = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        cur = [i] + [0] * len(b)
+        row_min = i
+        for j in range(1, len(b) + 1):
+            cost = a[i - 1] != b[j - 1]
+            v = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                v = min(v, prev2[j - 2] + 1)
+            cur[j] = v
+            row_min = min(row_min, v)
+        if row_min > limit:
+            return limit + 1
+        prev2, prev = prev, cur
+    return prev[-1] if prev[-1] <= limit else limit + 1
+
+
+class _Field:
+    """BM25 postings for one text field: term -> [(position, term frequency)]."""
+
+    def __init__(self, docs: list[list[str]], boost: float):
+        self.boost = boost
+        self.postings: dict[str, list[tuple[int, int]]] = {}
+        self.lengths = [len(tokens) for tokens in docs]
+        self.avg_length = (sum(self.lengths) / len(docs)) if docs else 0.0
+
+        for i, tokens in enumerate(docs):
+            counts: dict[str, int] = {}
+            for t in tokens:
+                counts[t] = counts.get(t, 0) + 1
+            for t, tf in counts.items():
+                self.postings.setdefault(t, []).append((i, tf))
+
+        n = len(docs)
+        self.idf = {
+            t: math.log(1 + (n - len(p) + 0.5) / (len(p) + 0.5))
+            for t, p in self.postings.items()
+        }
+
+    def score_into(self, scores: dict[int, float], term: str, weight: float) -> None:
+        postings = self.postings.get(term)
+        if not postings:
+            return
+        idf = self.idf[term] * weight * self.boost
+        avg = self.avg_length or 1.0
+        lengths = self.lengths
+        for i, tf in postings:
+            norm = tf + K1 * (1 - B + B * lengths[i] / avg)
+            scores[i] = scores.get(i, 0.0) + idf * tf * (K1 + 1) / norm
+
+
+class RankedIndex:
+    def __init__(self, names_lc: Sequence[str], instructions_lc: Sequence[str]):
+        names = [tokenize(n) for n in names_lc]
+        instructions = [tokenize(text) for text in instructions_lc]
+        self.size = len(names)
+        self.name_field = _Field(names, NAME_BOOST)
+        self.instructions_field = _Field(instructions, INSTRUCTIONS_BOOST)
+
+        self.vocabulary = sorted(set(self.name_field.postings) | set(self.instructions_field.postings))
+        self._terms = set(self.vocabulary)
+        # term trigrams narrow the fuzzy candidates before computing edit distances
+        self.term_grams: dict[str, list[str]] = {}
+        for term in self.vocabulary:
+            for g in _trigrams(f"^{term}$"):
+                self.term_grams.setdefault(g, []).append(term)
+
+        # whole-name trigrams, spaces and punctuation removed
+        self.compact_names: list[str] = []
+        self.name_grams: list[int] = []
+        self.name_gram_postings: dict[str, list[int]] = {}
+        for i, tokens in enumerate(names):
+            compact = "".join(tokens)
+            self.compact_names.append(compact)
+            grams = _trigrams(compact)
+            self.name_grams.append(len(grams))
+            for g in grams:
+                self.name_gram_postings.setdefault(g, []).append(i)
+
+    def _prefix_terms(self, prefix: str) -> list[str]:
+        start = bisect.bisect_left(self.vocabulary, prefix)
+        out = []
+        for term in self.vocabulary[start:start + MAX_PREFIX_TERMS + 1]:
+            if not term.startswith(prefix):
+                break
+            if term != prefix:
+                out.append(term)
+        return out[:MAX_PREFIX_TERMS]
+
+    def _fuzzy_terms(self, token: str) -> list[tuple[str, int]]:
+        limit = max_edits(token)
+        grams = _trigrams(f"^{token}$")
+        shared: dict[str, int] = {}
+        for g in grams:
+            for term in self.term_grams.get(g, ()):
+                shared[term] = shared.get(term, 0) + 1
+
+        # each edit destroys at most 3 trigrams
+        need = max(1, len(grams) - 3 * limit)
+        found = []
+        for term, n in shared.items():
+            if n < need or term == token:
+                continue
+            d = bounded_edit_distance(token, term, limit)
+            if d <= limit:
+                found.append((d, term))
+        found.sort()
+        return [(term, d) for d, term in found[:MAX_FUZZY_TERMS]]
+
+    def _splits(self, token: str) -> list[str]:
+        for cut in range(2, len(token) - 1):
+            left, right = token[:cut], token[cut:]
+            if left in self._terms and right in self._terms:
+                return [left, right]
+        return []
+
+    def expand(self, tokens: list[str]) -> list[tuple[str, float, int]]:
+        """(term, weight, index of the query word it came from) to score."""
+        terms: dict[str, tuple[float, int]] = {}
+
+        def add(term: str, weight: float):
+            if weight > terms.get(term, (0.0, 0))[0]:
+                terms[term] = (weight, n)
+
+        for n, token in enumerate(tokens):
+            exact = token in self._terms
+            if exact:
+                add(token, 1.0)
+            if n == len(tokens) - 1 and len(token) >= 2:
+                for term in self._prefix_terms(token):
+                    add(term, PREFIX_WEIGHT)
+            if not exact and len(token) >= 3:
+                for term, d in self._fuzzy_terms(token):
+                    add(term, FUZZY_WEIGHTS[d])
+                if len(token) >= 6:
+                    for term in self._splits(token):
+                        add(term, SPLIT_WEIGHT)
+        return [(term, weight, n) for term, (weight, n) in terms.items()]
+
+    def _trigram_scores(self, scores: dict[int, float], compact: str) -> None:
+        grams = _trigrams(compact)
+        if not grams:
+            return
+        overlap: dict[int, int] = {}
+        for g in grams:
+            for i in self.name_gram_postings.get(g, ()):
+                overlap[i] = overlap.get(i, 0) + 1
+        for i, n in overlap.items():
+            sim = 2 * n / (len(grams) + self.name_grams[i])
+            if sim >= MIN_TRIGRAM_SIMILARITY:
+                scores[i] = scores.get(i, 0.0) + TRIGRAM_WEIGHT * sim
+
+    def scores(self, q: str) -> dict[int, float]:
+        tokens = tokenize(q)
+        scores: dict[int, float] = {}
+        if not tokens:
+            return scores
+
+        # bitmask per position of the query words its name matched
+        covered: dict[int, int] = {}
+        for term, weight, n in self.expand(tokens):
+            self.name_field.score_into(scores, term, weight)
+            self.instructions_field.score_into(scores, term, weight)
+            for i, _ in self.name_field.postings.get(term, ()):
+                covered[i] = covered.get(i, 0) | 1 << n
+
+        for i, mask in covered.items():
+            scores[i] += COVERAGE_WEIGHT * (mask.bit_count() / len(tokens)) ** 2
+
+        compact = "".join(tokens)
+        self._trigram_scores(scores, compact)
+        if len(tokens) > 1:
+            for i in covered:
+                if compact in self.compact_names[i]:
+                    scores[i] += PHRASE_BONUS
+        return scores
+
+    def search(self, q: str, allowed_bits: int | None = None, limit: int = 20) -> list[tuple[int, float]]:
+        """
+        Top `limit` (position, score) for q, best first. allowed_bits is a
+        SearchIndex bitset of positions that pass the muscle/equipment/category
+        filters; None means no filter.
+        """
+        scored = self.scores(q)
+        if allowed_bits is not None:
+            scored = {i: s for i, s in scored.items() if allowed_bits >> i & 1}
+        return heapq.nsmallest(limit, scored.items(), key=lambda item: (-item[1], item[0]))
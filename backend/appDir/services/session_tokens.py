@@ -0,0 +1,249 @@
+"""
+Session tokens: short-lived signed access tokens checked without touching the
+database, and long-lived refresh tokens stored (hashed) in refresh_tokens.
+
+Access tokens are HS256 JWTs carrying the user id (sub), a token id (jti) and
+iat / exp. Verification is in-memory only:
+
+- the header segment is looked up in a dict built at import, one entry per
+  accepted secret, so an unknown key id or algorithm fails on that lookup
+- each entry holds a ready hmac object; signing or verifying copies it instead
+  of deriving the key pads again
+- exp is checked, then the revocation list
+
+The revocation list is an in-process TTL cache: single token ids (logout), and
+per-user cutoffs that reject anything issued earlier (password change, refresh
+token reuse). An entry is dropped once every token it could match has expired,
+so the list stays as small as the tokens it covers. It is per process; other
+workers keep accepting a revoked access token until it expires, at most
+ACCESS_TOKEN_TTL.
+
+Refresh tokens are random strings. Only their sha256 is stored. Every refresh
+rotates the token; presenting an already rotated one revokes all of that user's
+sessions, since one of the two holders is not the user.
+"""
+import base64
+import hashlib
+import hmac
+import json
+import secrets
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from appDir.core.async_db import adb_conn, execute, fetch_one
+from appDir.core.config import ACCESS_TOKEN_TTL, JWT_PREVIOUS_SECRETS, JWT_SECRET, REFRESH_TOKEN_TTL
+
+
+class TokenError(Exception):
+    pass
+
+
+class TokenExpired(TokenError):
+    pass
+
+
+class TokenRevoked(TokenError):
+    pass
+
+
+class Session:
+    """The claims of a verified access token."""
+    __slots__ = ("user_id", "jti", "issued_at", "expires_at")
+
+    def __init__(self, user_id: int, jti: str, issued_at: float, expires_at: int):
+        self.user_id = user_id
+        self.jti = jti
+        self.issued_at = issued_at
+        self.expires_at = expires_at
+
+
+def _b64encode(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def _b64decode(segment: str) -> bytes:
+    return base64.urlsafe_b64decode(segment + "=" * (-len(segment) % 4))
+
+
+class TokenSigner:
+    """HS256 over the current secret; verification also accepts the previous ones."""
+
+    def __init__(self, secret: str, previous: list[str] = ()):
+        self.header, self.mac = self._key(secret)
+        self.verifiers = dict(self._key(s) for s in (secret, *previous))
+
+    @staticmethod
+    def _key(secret: str) -> tuple[str, "hmac.HMAC"]:
+        kid = hashlib.sha256(secret.encode()).hexdigest()[:8]
+        header = _b64encode(json.dumps({"alg": "HS256", "kid": kid, "typ": "JWT"}, separators=(",", ":")).encode())
+        return header, hmac.new(secret.encode(), digestmod=hashlib.sha256)
+
+    def sign(self, claims: dict) -> str:
+        signing_input = f"{self.header}.{_b64encode(json.dumps(claims, separators=(',', ':')).encode())}"
+        mac = self.mac.copy()
+        mac.update(signing_input.encode("ascii"))
+        return f"{signing_input}.{_b64encode(mac.digest())}"
+
+    def verify(self, token: str) -> dict:
+        header, _, rest = token.partition(".")
+        payload, _, signature = rest.partition(".")
+        base = self.verifiers.get(header)
+        if base is None or not payload or not signature or not token.isascii():
+            raise TokenError("malformed token")
+        mac = base.copy()
+        mac.update(f"{header}.{payload}".encode("ascii"))
+        if not hmac.compare_digest(_b64encode(mac.digest()), signature):
+            raise TokenError("bad signature")
+        try:
+            return json.loads(_b64decode(payload))
+        except ValueError:
+            raise TokenError("malformed token")
+
+
+class RevocationList:
+    """Revoked token ids and per-user cutoffs, each kept only until it can no longer match."""
+
+    def __init__(self, max_entries: int = 100_000):
+        self.max_entries = max_entries
+        self.tokens: dict[str, float] = {}                       # jti -> token expiry
+        self.users: dict[int, tuple[float, float]] = {}          # user id -> (cutoff, entry expiry)
+        self._next_purge = 0.0
+        self._lock = threading.Lock()
+
+    def revoke_token(self, jti: str, expires_at: float) -> None:
+        with self._lock:
+            self.tokens[jti] = expires_at
+            self._maybe_purge()
+
+    def revoke_user(self, user_id: int, ttl: float = ACCESS_TOKEN_TTL) -> None:
+        """Rejects the user's access tokens issued up to now."""
+        now = round(time.time(), 3)
+        with self._lock:
+            self.users[user_id] = (now, now + ttl)
+            self._maybe_purge()
+
+    def is_revoked(self, jti: str, user_id: int, issued_at: float) -> bool:
+        if jti in self.tokens:
+            return True
+        cutoff = self.users.get(user_id)
+        return cutoff is not None and issued_at < cutoff[0]
+
+    def _maybe_purge(self) -> None:
+        now = time.time()
+        if now < self._next_purge and len(self.tokens) + len(self.users) <= self.max_entries:
+            return
+        self.tokens = {k: exp for k, exp in self.tokens.items() if exp > now}
+        self.users = {k: v for k, v in self.users.items() if v[1] > now}
+        # still over after dropping the expired ones: forget the soonest to expire
+        if len(self.tokens) > self.max_entries:
+            keep = sorted(self.tokens.items(), key=lambda kv: kv[1])[-self.max_entries:]
+            self.tokens = dict(keep)
+        self._next_purge = now + 60
+
+    def __len__(self) -> int:
+        return len(self.tokens) + len(self.users)
+
+
+signer = TokenSigner(JWT_SECRET, JWT_PREVIOUS_SECRETS)
+revocations = RevocationList()
+
+
+def issue_access_token(user_id: int) -> str:
+    now = time.time()
+    return signer.sign({
+        "sub": str(user_id),
+        "jti": secrets.token_urlsafe(12),
+        # ms precision, so a session started right after revoke_user() isn't caught by its cutoff
+        "iat": round(now, 3),
+        "exp": int(now) + ACCESS_TOKEN_TTL,
+    })
+
+
+def verify_access_token(token: str) -> Session:
+    claims = signer.verify(token)
+    try:
+        session = Session(int(claims["sub"]), claims["jti"], claims["iat"], claims["exp"])
+    except (KeyError, TypeError, ValueError):
+        raise TokenError("missing claims")
+    if session.expires_at <= time.time():
+        raise TokenExpired()
+    if revocations.is_revoked(session.jti, session.user_id, session.issued_at):
+        raise TokenRevoked()
+    return session
+
+
+def _hash(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+def _pair(user_id: int, refresh_token: str) -> dict:
+    return {
+        "access_token": issue_access_token(user_id),
+        "refresh_token": refresh_token,
+        "token_type": "bearer",
+        "expires_in": ACCESS_TOKEN_TTL,
+    }
+
+
+async def _store_refresh_token(conn, user_id: int) -> str:
+    token = secrets.token_urlsafe(32)
+    await execute(
+        conn,
+        "INSERT INTO refresh_tokens (user_id, token_hash, expires_at) VALUES (%s, %s, %s)",
+        (user_id, _hash(token), datetime.now(timezone.utc) + timedelta(seconds=REFRESH_TOKEN_TTL)),
+    )
+    return token
+
+
+async def issue_tokens(user_id: int) -> dict:
+    """A new session: access token plus a stored refresh token."""
+    async with adb_conn() as conn:
+        refresh_token = await _store_refresh_token(conn, user_id)
+    return _pair(user_id, refresh_token)
+
+
+async def refresh_tokens(refresh_token: str) -> dict:
+    """Rotates a refresh token into a new pair; raises TokenError if it can't be used."""
+    async with adb_conn() as conn:
+        row = await fetch_one(
+            conn,
+            """
+            UPDATE refresh_tokens SET revoked_at = NOW()
+            WHERE token_hash = %s AND revoked_at IS NULL AND expires_at > NOW()
+            RETURNING user_id
+            """,
+            (_hash(refresh_token),),
+        )
+        if row is None:
+            reused = await fetch_one(
+                conn,
+                "SELECT user_id FROM refresh_tokens WHERE token_hash = %s AND revoked_at IS NOT NULL",
+                (_hash(refresh_token),),
+            )
+            if reused is not None:
+                await revoke_sessions(reused["user_id"], conn)
+                await conn.commit()
+            raise TokenError("invalid refresh token")
+        new_token = await _store_refresh_token(conn, row["user_id"])
+    return _pair(row["user_id"], new_token)
+
+
+async def revoke_refresh_token(refresh_token: str) -> None:
+    async with adb_conn() as conn:
+        await execute(
+            conn,
+            "UPDATE refresh_tokens SET revoked_at = NOW() WHERE token_hash = %s AND revoked_at IS NULL",
+            (_hash(refresh_token),),
+        )
+
+
+async def revoke_sessions(user_id: int, conn=None) -> None:
+    """Ends every session of the user: refresh tokens in the db, access tokens in this process."""
+    revocations.revoke_user(user_id)
+    sql = "UPDATE refresh_tokens SET revoked_at = NOW() WHERE user_id = %s AND revoked_at IS NULL"
+    if conn is not None:
+        await execute(conn, sql, (user_id,))
+        return
+    async with adb_conn() as conn:
+        await execute(conn, sql, (user_id,))
@@ -0,0 +1,189 @@
+"""
+Set logging (POST /api/workouts/{user_id}/sets), plan feedback and the training
+summary read from the rolled-up tables.
+
+A batch is written with one statement: the sets go in as parallel arrays through
+unnest(), ON CONFLICT (user_id, client_key) DO NOTHING drops anything a retried
+upload already stored, and data-modifying CTEs add only the rows that really
+went in to user_training_days / user_training_totals and to the progress
+analytics (training_analytics.ANALYTICS_CTES). One round trip per batch,
+replays are free, and the summary never scans workout_sets.
+"""
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from psycopg import errors
+
+from appDir.core.async_db import adb_conn, fetch_all, fetch_one
+from appDir.models.workout import LoggedSet
+from appDir.services import exercise_store
+from appDir.services.plan_service import UserNotFound
+from appDir.services.training_analytics import ANALYTICS_CTES, MuscleShares, share_params
+
+
+class WorkoutNotFound(Exception):
+    pass
+
+
+class UnknownExercises(Exception):
+    """Sets named exercise ids the catalog doesn't have; nothing was stored."""
+
+    def __init__(self, exercise_ids: list[str]):
+        super().__init__(", ".join(exercise_ids))
+        self.exercise_ids = exercise_ids
+
+
+INSERT_SETS_SQL = """
+WITH owned AS (
+  -- sets only go on one of the user's own workouts
+  SELECT %(workout_id)s::int IS NULL
+         OR EXISTS (SELECT 1 FROM workouts WHERE id = %(workout_id)s::int AND user_id = %(user_id)s) AS ok
+),
+incoming AS (
+  SELECT *
+  FROM unnest(%(exercise_ids)s::text[], %(reps)s::int[], %(weights)s::real[],
+              %(rpes)s::real[], %(performed_at)s::timestamptz[], %(client_keys)s::text[])
+       AS t(exercise_id, reps, weight, rpe, performed_at, client_key)
+  WHERE (SELECT ok FROM owned)
+),
+inserted AS (
+  INSERT INTO workout_sets (user_id, workout_id, exercise_id, reps, weight, rpe, performed_at, client_key)
+  SELECT %(user_id)s, %(workout_id)s, exercise_id, reps, weight, rpe, performed_at, client_key
+  FROM incoming
+  ON CONFLICT (user_id, client_key) DO NOTHING
+  RETURNING exercise_id, reps, weight, performed_at
+),
+days AS (
+  INSERT INTO user_training_days AS d (user_id, day, sets, reps, volume)
+  SELECT %(user_id)s, (performed_at AT TIME ZONE 'UTC')::date, COUNT(*), SUM(reps), SUM(reps * weight)
+  FROM inserted
+  GROUP BY 2
+  ORDER BY 2
+  ON CONFLICT (user_id, day) DO UPDATE SET
+    sets = d.sets + EXCLUDED.sets,
+    reps = d.reps + EXCLUDED.reps,
+    volume = d.volume + EXCLUDED.volume
+),
+totals AS (
+  INSERT INTO user_training_totals AS t (user_id, sets, reps, volume, first_set_at, last_set_at)
+  SELECT %(user_id)s, COUNT(*), SUM(reps), SUM(reps * weight), MIN(performed_at), MAX(performed_at)
+  FROM inserted
+  HAVING COUNT(*) > 0
+  ON CONFLICT (user_id) DO UPDATE SET
+    sets = t.sets + EXCLUDED.sets,
+    reps = t.reps + EXCLUDED.reps,
+    volume = t.volume + EXCLUDED.volume,
+    first_set_at = LEAST(t.first_set_at, EXCLUDED.first_set_at),
+    last_set_at = GREATEST(t.last_set_at, EXCLUDED.last_set_at)
+),""" + ANALYTICS_CTES + """
+SELECT COUNT(*) AS inserted, (SELECT ok FROM owned) AS workout_owned FROM inserted
+"""
+
+
+def batch_params(user_id: int, workout_id: int | None, sets: list[LoggedSet],
+                 shares: MuscleShares) -> dict[str, Any]:
+    # a key repeated inside one batch keeps its first set, like a replay would
+    unique: dict[str, LoggedSet] = {}
+    for s in sets:
+        unique.setdefault(s.client_key, s)
+    rows = list(unique.values())
+    return {
+        "user_id": user_id,
+        "workout_id": workout_id,
+        "exercise_ids": [s.exercise_id for s in rows],
+        "reps": [s.reps for s in rows],
+        "weights": [s.weight for s in rows],
+        "rpes": [s.rpe for s in rows],
+        "performed_at": [s.performed_at for s in rows],
+        "client_keys": [s.client_key for s in rows],
+        **share_params(rows, shares),
+    }
+
+
+async def log_sets(user_id: int, workout_id: int | None, sets: list[LoggedSet]) -> dict[str, int]:
+    shares = await exercise_store.snapshot().derived_async(MuscleShares)
+    unknown = sorted({s.exercise_id for s in sets if s.exercise_id not in shares})
+    if unknown:
+        raise UnknownExercises(unknown)
+    params = batch_params(user_id, workout_id, sets, shares)
+    try:
+        async with adb_conn() as conn:
+            row = await fetch_one(conn, INSERT_SETS_SQL, params)
+            if not row["workout_owned"]:
+                if not await fetch_one(conn, "SELECT 1 FROM users WHERE id = %s", (user_id,)):
+                    raise UserNotFound()
+                raise WorkoutNotFound()
+    except errors.ForeignKeyViolation as e:
+        if e.diag.constraint_name and "workout_id" in e.diag.constraint_name:
+            raise WorkoutNotFound() from e
+        raise UserNotFound() from e
+
+    inserted = row["inserted"]
+    return {"received": len(sets), "inserted": inserted, "duplicates": len(sets) - inserted}
+
+
+async def submit_feedback(user_id: int, workout_id: int, rating: int, difficulty: str | None,
+                          notes: str | None) -> dict[str, Any]:
+    """Stores a rating of one of the user's plans; scripts/train_split_policy.py learns from these."""
+    async with adb_conn() as conn:
+        row = await fetch_one(
+            conn,
+            """
+            INSERT INTO feedback (user_id, workout_id, rating, difficulty, notes)
+            SELECT user_id, id, %s, %s, %s FROM workouts WHERE id = %s AND user_id = %s
+            RETURNING id, created_at
+            """,
+            (rating, difficulty, notes, workout_id, user_id),
+        )
+        if row is None:
+            if not await fetch_one(conn, "SELECT 1 FROM users WHERE id = %s", (user_id,)):
+                raise UserNotFound()
+            raise WorkoutNotFound()
+    return {"id": row["id"], "workout_id": workout_id, "created_at": row["created_at"].isoformat()}
+
+
+async def training_summary(user_id: int, days: int) -> dict[str, Any]:
+    """All-time totals plus one entry per training day in the last `days` days."""
+    since = datetime.now(timezone.utc).date() - timedelta(days=days - 1)
+    async with adb_conn() as conn:
+        totals = await fetch_one(
+            conn,
+            "SELECT sets, reps, volume, first_set_at, last_set_at FROM user_training_totals WHERE user_id = %s",
+            (user_id,),
+        )
+        if totals is None and not await fetch_one(conn, "SELECT 1 FROM users WHERE id = %s", (user_id,)):
+            raise UserNotFound()
+        daily = await fetch_all(
+            conn,
+            """
+            SELECT day, sets, reps, volume
+            FROM user_training_days
+            WHERE user_id = %s AND day >= %s
+            ORDER BY day
+            """,
+            (user_id, since),
+        )
+
+    window = {
+        "days": days,
+        "since": since.isoformat(),
+        "sets": sum(d["sets"] for d in daily),
+        "reps": sum(d["reps"] for d in daily),
+        "volume": round(sum(d["volume"] for d in daily), 1),
+        "training_days": len(daily),
+        "daily": [
+            {"day": d["day"].isoformat(), "sets": d["sets"], "reps": d["reps"], "volume": round(d["volume"], 1)}
+            for d in daily
+        ],
+    }
+    if totals is None:
+        all_time = {"sets": 0, "reps": 0, "volume": 0.0, "first_set_at": None, "last_set_at": None}
+    else:
+        all_time = {
+            "sets": totals["sets"],
+            "reps": totals["reps"],
+            "volume": round(totals["volume"], 1),
+            "first_set_at": totals["first_set_at"].isoformat(),
+            "last_set_at": totals["last_set_at"].isoformat(),
+        }
+    return {"user_id": user_id, "all_time": all_time, "window": window}
@@ -0,0 +1,257 @@
+"""
+Learned split choice for pick_split: a table from profile context to split,
+trained offline from workout feedback (scripts/train_split_policy.py) and loaded
+at startup, so choosing a split online is at most three dict lookups.
+
+Training streams `feedback` joined with the rated plan (workouts.plan records the
+split it used) through a server-side cursor and keeps only sufficient statistics
+(count, weighted reward sum and sum of squares) per context x split, at three
+levels:
+
+    profile   experience, days per week, goals, equipment
+    level     experience, days per week
+    days      days per week
+
+A policy that always takes its own pick only ever logs that split, so assignments
+explore: SPLIT_EXPLORE of users get a uniform pick among SPLITS_FOR_DAYS
+(explore()), and the plan row stores the probability its split had
+(workouts.split_propensity). Training weights each rating by the inverse of that
+probability, so a split's mean estimates its reward across the contexts pooled
+into a cell, not just among the users who happened to be given it. Plans from
+before exploration have no propensity; their split was the only possible pick,
+so it counts as 1.
+
+Each split's mean reward is shrunk toward its mean one level up (empirical
+Bayes). A context keeps the pick of the level above it (pi0 at the top) unless
+another split, with enough ratings, has a lower confidence bound above the
+kept split's mean, so until exploration has gathered enough ratings for other
+splits the table agrees with pi0. Lookups try profile, then level, then days,
+then pi0; profile and level entries that match what the next level would give
+are dropped.
+"""
+import hashlib
+import json
+import math
+import os
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Any, Callable, Iterable, Iterator
+
+from appDir.core.splits import SPLITS
+from appDir.services.exercise_store import DATA_DIR
+
+SPLIT_POLICY_PATH = os.getenv("SPLIT_POLICY_PATH", os.path.join(DATA_DIR, "split_policy.json"))
+
+LEVELS = ("profile", "level", "days")
+
+# splits that make sense for a number of training days; pi0's pick is always one
+SPLITS_FOR_DAYS = {
+    1: ("full_body",),
+    2: ("full_body", "upper_lower"),
+    3: ("fb_eod", "full_body", "ulf", "ppl", "arnold"),
+    4: ("upper_lower", "phul", "ulf", "full_body"),
+    5: ("ppl", "cbum", "bro", "upper_lower"),
+    6: ("ppl", "ppl_6", "arnold_6"),
+    7: ("ppl", "ppl_6", "arnold_6"),
+}
+
+# rating 1..5 -> 0..1, less when the plan was rated too easy / too hard
+DIFFICULTY_PENALTY = {"too_easy": 0.15, "too_hard": 0.25}
+
+PRIOR_STRENGTH = 20     # pseudo-observations the parent level's mean is worth
+MIN_SUPPORT = 30        # rated plans of a split in a context before it can replace pi0
+LCB_Z = 1.64            # one-sided 95%
+VARIANCE_FLOOR = 0.01
+
+FEEDBACK_SQL = """
+SELECT f.rating, f.difficulty, w.plan->>'split' AS split, (w.plan->>'days_per_week')::int AS days,
+       w.plan->'goals' AS goals, w.plan->>'equipment' AS equipment, u.experience_level,
+       w.split_propensity AS propensity
+FROM feedback f
+JOIN workouts w ON w.id = f.workout_id
+JOIN users u ON u.id = f.user_id
+ORDER BY f.id
+"""
+
+
+def reward(rating: int, difficulty: str | None) -> float:
+    return max(0.0, (rating - 1) / 4 - DIFFICULTY_PENALTY.get(difficulty or "", 0.0))
+
+
+def explore(greedy: str, days: int, unit: int, salt: str, epsilon: float) -> tuple[str, float]:
+    """
+    Epsilon-greedy over SPLITS_FOR_DAYS[days] for one user (unit): (split, the
+    probability it had). The draw is a hash of (salt, unit) rather than a random
+    number, so a user keeps their split, and their stored plan stays current,
+    until the salt (the policy version) changes.
+    """
+    candidates = SPLITS_FOR_DAYS.get(days) or (greedy,)
+    digest = hashlib.blake2b(f"{salt}:{unit}".encode(), digest_size=8).digest()
+    split = greedy
+    if int.from_bytes(digest[:4], "little") / 2 ** 32 < epsilon:
+        split = candidates[int.from_bytes(digest[4:], "little") % len(candidates)]
+    propensity = epsilon * (split in candidates) / len(candidates) + (1 - epsilon) * (split == greedy)
+    return split, propensity
+
+
+def context_keys(experience_level: str, days: int, goals: Iterable[str] | None,
+                 equipment: str) -> tuple[str, str, str]:
+    """(profile, level, days) keys for a profile, in lookup order."""
+    level = f"{(experience_level or '').strip()}|{days}"
+    profile = f"{level}|{','.join(sorted(set(goals or ())))}|{(equipment or '').strip()}"
+    return profile, level, str(days)
+
+
+def iter_feedback(conn, chunk_size: int = 5000) -> Iterator[dict[str, Any]]:
+    """Rated plans, oldest first; a server-side cursor keeps chunk_size rows in memory."""
+    with conn.cursor(name="split_policy_feedback") as cur:
+        cur.itersize = chunk_size
+        cur.execute(FEEDBACK_SQL)
+        while True:
+            rows = cur.fetchmany(chunk_size)
+            if not rows:
+                return
+            yield from rows
+
+
+class SplitStats:
+    """
+    Count, and inverse-propensity weight, weighted reward sum and weighted sum of
+    squares per (level, context key, split).
+    """
+
+    def __init__(self):
+        self.cells: dict[tuple[str, str, str], list[float]] = defaultdict(lambda: [0, 0.0, 0.0, 0.0])
+        # context key -> (days, keys of the coarser levels above it)
+        self.contexts: dict[str, tuple[int, tuple[str, ...]]] = {}
+        self.events = 0
+
+    def add(self, experience_level: str, days: int, goals, equipment: str, split: str, value: float,
+            propensity: float = 1.0) -> None:
+        keys = context_keys(experience_level, days, goals, equipment)
+        weight = 1.0 / propensity
+        for i, (level, key) in enumerate(zip(LEVELS, keys)):
+            cell = self.cells[(level, key, split)]
+            cell[0] += 1
+            cell[1] += weight
+            cell[2] += weight * value
+            cell[3] += weight * value * value
+            self.contexts[key] = (days, keys[i + 1:])
+        self.events += 1
+
+    def add_feedback(self, rows: Iterable[dict[str, Any]]) -> "SplitStats":
+        for r in rows:
+            if r["split"] in SPLITS and r["days"]:
+                self.add(r["experience_level"], r["days"], r["goals"], r["equipment"], r["split"],
+                         reward(r["rating"], r["difficulty"]), r.get("propensity") or 1.0)
+        return self
+
+
+def _posterior(cell, prior: float, strength: float) -> tuple[float, float, int]:
+    n, weight, total, squares = cell if cell else (0, 0.0, 0.0, 0.0)
+    # self-normalized inverse-propensity mean, worth n observations
+    observed = total / weight if n else prior
+    mean = (n * observed + strength * prior) / (n + strength)
+    variance = max(squares / weight - observed ** 2, VARIANCE_FLOOR) if n else 0.25
+    return mean, math.sqrt(variance / (n + strength)), n
+
+
+def fit(stats: SplitStats, baseline: Callable[[int], str], prior_strength: float = PRIOR_STRENGTH,
+        min_support: int = MIN_SUPPORT, z: float = LCB_Z) -> dict[str, Any]:
+    """The policy table (see the module docstring) as a JSON-able dict."""
+    by_key: dict[tuple[str, str], dict[str, list[float]]] = defaultdict(dict)
+    for (level, key, split), cell in stats.cells.items():
+        by_key[(level, key)][split] = cell
+    days_cells = [c for (level, _), cells in by_key.items() if level == "days" for c in cells.values()]
+    weight_all = sum(c[1] for c in days_cells)
+    global_mean = sum(c[2] for c in days_cells) / weight_all if weight_all else 0.5
+
+    means: dict[tuple[str, str], float] = {}   # (context key, split) -> posterior mean
+    table: dict[str, dict[str, str]] = {level: {} for level in LEVELS}
+    # coarse to fine, so each level's prior and fallback are already known
+    for level in reversed(LEVELS):
+        for (lvl, key), cells in by_key.items():
+            if lvl != level:
+                continue
+            days, ancestors = stats.contexts[key]
+            parent = ancestors[0] if ancestors else None
+            base = baseline(days)
+
+            scored = {}
+            for split in dict.fromkeys((base, *SPLITS_FOR_DAYS.get(days, ()))):
+                prior = means.get((parent, split), global_mean)
+                mean, sd, n = _posterior(cells.get(split), prior, prior_strength)
+                means[(key, split)] = mean
+                scored[split] = (mean, mean - z * sd, n)
+
+            # a context keeps what the coarser levels chose unless a split with
+            # enough ratings here beats it with confidence
+            fallback = next((table[a_level][a] for a_level, a in zip(LEVELS[-len(ancestors):], ancestors)
+                             if a in table[a_level]), base) if ancestors else base
+            pick = fallback
+            best = max((s for s in scored if scored[s][2] >= min_support), key=lambda s: scored[s][1], default=None)
+            if best is not None and best != pick and scored[best][1] > scored[pick][0]:
+                pick = best
+            if pick != fallback:
+                table[level][key] = pick
+
+    body = json.dumps(table, sort_keys=True)
+    return {
+        "version": hashlib.blake2b(body.encode(), digest_size=8).hexdigest(),
+        "trained_at": datetime.now(timezone.utc).isoformat(),
+        "events": stats.events,
+        "params": {"prior_strength": prior_strength, "min_support": min_support, "z": z},
+        **table,
+    }
+
+
+def _known_splits(entries: dict[str, str] | None) -> dict[str, str]:
+    # a table trained before a split was removed must not pick it
+    return {k: v for k, v in (entries or {}).items() if v in SPLITS}
+
+
+class SplitPolicy:
+    """The loaded table; lookup() returns None where pi0 applies."""
+
+    def __init__(self, table: dict[str, Any] | None = None):
+        table = table or {}
+        self.version = table.get("version")
+        self.profile = _known_splits(table.get("profile"))
+        self.level = _known_splits(table.get("level"))
+        self.days = _known_splits(table.get("days"))
+
+    def __len__(self) -> int:
+        return len(self.profile) + len(self.level) + len(self.days)
+
+    def lookup(self, experience_level: str, days: int, goals, equipment: str) -> str | None:
+        if not len(self):
+            return None
+        profile, level, days_key = context_keys(experience_level, days, goals, equipment)
+        return self.profile.get(profile) or self.level.get(level) or self.days.get(days_key)
+
+
+_policy = SplitPolicy()
+
+
+def current_policy() -> SplitPolicy:
+    return _policy
+
+
+def save_split_policy(table: dict[str, Any], path: str = SPLIT_POLICY_PATH) -> None:
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(table, f, sort_keys=True, separators=(",", ":"))
+    os.replace(tmp, path)
+
+
+def load_split_policy(path: str = SPLIT_POLICY_PATH) -> SplitPolicy:
+    """Swaps in the table at `path`; without one every pick stays pi0."""
+    global _policy
+    if not os.path.exists(path):
+        print(f"No split policy at {path}, using the baseline picker")
+        _policy = SplitPolicy()
+        return _policy
+    with open(path, "r", encoding="utf-8") as f:
+        _policy = SplitPolicy(json.load(f))
+    print(f"Loaded split policy {_policy.version} ({len(_policy)} entries)")
+    return _policy
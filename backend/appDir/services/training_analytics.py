@@ -0,0 +1,250 @@
+"""
+Progress analytics kept up to date as sets are logged, so every read is over a
+user's weekly buckets rather than their raw sets:
+
+- user_exercise_weeks   user x exercise x week: sets, reps, volume, best e1RM
+- user_muscle_weeks     user x muscle x week: sets and volume, attributed from the
+                        catalog's primaryMuscles (full share) and
+                        secondaryMuscles (half share)
+- user_exercise_records user x exercise: best e1RM, heaviest set, biggest set
+                        volume, each with when it happened
+
+The SQL in ANALYTICS_CTES runs inside set_logging's insert statement on the rows
+that were actually inserted, so replays are ignored here as well. Weeks start on
+Monday (UTC). A record that is tied keeps the earliest set that reached it, so the
+result doesn't depend on the order batches arrive in.
+services/analytics_backfill.py rebuilds the same tables from workout_sets with
+the same formulas.
+"""
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from appDir.core.async_db import adb_conn, fetch_all, fetch_one
+from appDir.services import exercise_store
+from appDir.services.exercise_listing import ListingIndex
+from appDir.services.plan_service import UserNotFound
+
+PRIMARY_SHARE = 1.0
+SECONDARY_SHARE = 0.5
+
+# Epley; above this many reps the estimate says more about endurance than strength.
+# REAL like the columns it is stored in, so sets compare equal within a batch
+# exactly when they do against the stored record.
+E1RM_MAX_REPS = 12
+E1RM_SQL = f"""(CASE WHEN weight > 0 AND reps BETWEEN 1 AND {E1RM_MAX_REPS}
+     THEN CASE WHEN reps = 1 THEN weight ELSE weight * (1 + reps / 30.0) END END)::real"""
+
+
+@exercise_store.prebuild
+class MuscleShares:
+    """
+    exercise id -> ((muscle, share), ...) for one catalog snapshot; built in the
+    background after each load and read through Catalog.derived().
+    """
+
+    def __init__(self, catalog: "exercise_store.Catalog"):
+        self.shares: dict[str, tuple[tuple[str, float], ...]] = {}
+        fields = ("id", "primaryMuscles", "secondaryMuscles")
+        for i in range(len(catalog.exercises)):
+            ex = catalog.exercises.project(i, fields)
+            shares: dict[str, float] = {}
+            for m in ex.get("secondaryMuscles") or []:
+                shares[m.lower()] = SECONDARY_SHARE
+            for m in ex.get("primaryMuscles") or []:
+                shares[m.lower()] = PRIMARY_SHARE
+            self.shares[ex["id"]] = tuple(shares.items())
+
+    def __contains__(self, exercise_id: str) -> bool:
+        return exercise_id in self.shares
+
+    def get(self, exercise_id: str) -> tuple[tuple[str, float], ...]:
+        return self.shares.get(exercise_id, ())
+
+
+def share_params(rows: list, shares: MuscleShares) -> dict[str, list]:
+    """The muscle shares of the batch's exercises as parallel arrays."""
+    exercises, muscles, factors = [], [], []
+    for exercise_id in {s.exercise_id for s in rows}:
+        for muscle, share in shares.get(exercise_id):
+            exercises.append(exercise_id)
+            muscles.append(muscle)
+            factors.append(share)
+    return {"share_exercises": exercises, "share_muscles": muscles, "share_factors": factors}
+
+
+# appended to set_logging.INSERT_SETS_SQL; `inserted` returns the new rows
+ANALYTICS_CTES = f"""
+logged AS (
+  SELECT exercise_id, reps, weight, performed_at,
+         reps * weight AS volume,
+         {E1RM_SQL} AS e1rm,
+         date_trunc('week', performed_at AT TIME ZONE 'UTC')::date AS week
+  FROM inserted
+),
+exercise_weeks AS (
+  INSERT INTO user_exercise_weeks AS w (user_id, exercise_id, week, sets, reps, volume, best_e1rm)
+  SELECT %(user_id)s, exercise_id, week, COUNT(*), SUM(reps), SUM(volume), MAX(e1rm)
+  FROM logged
+  GROUP BY exercise_id, week
+  ORDER BY exercise_id, week
+  ON CONFLICT (user_id, exercise_id, week) DO UPDATE SET
+    sets = w.sets + EXCLUDED.sets,
+    reps = w.reps + EXCLUDED.reps,
+    volume = w.volume + EXCLUDED.volume,
+    best_e1rm = GREATEST(w.best_e1rm, EXCLUDED.best_e1rm)
+),
+muscle_weeks AS (
+  INSERT INTO user_muscle_weeks AS m (user_id, muscle, week, sets, volume)
+  SELECT %(user_id)s, s.muscle, l.week, SUM(s.share), SUM(s.share * l.volume)
+  FROM logged l
+  JOIN unnest(%(share_exercises)s::text[], %(share_muscles)s::text[], %(share_factors)s::real[])
+       AS s(exercise_id, muscle, share) USING (exercise_id)
+  GROUP BY s.muscle, l.week
+  ORDER BY s.muscle, l.week
+  ON CONFLICT (user_id, muscle, week) DO UPDATE SET
+    sets = m.sets + EXCLUDED.sets,
+    volume = m.volume + EXCLUDED.volume
+),
+records AS (
+  INSERT INTO user_exercise_records AS r (
+    user_id, exercise_id, best_e1rm, best_e1rm_at, max_weight, max_weight_reps, max_weight_at,
+    best_volume, best_volume_at
+  )
+  SELECT %(user_id)s, e.exercise_id, e.e1rm, CASE WHEN e.e1rm IS NOT NULL THEN e.performed_at END, h.weight, h.reps, h.performed_at,
+         v.volume, v.performed_at
+  FROM (SELECT DISTINCT ON (exercise_id) exercise_id, e1rm, performed_at
+        FROM logged ORDER BY exercise_id, e1rm DESC NULLS LAST, performed_at) e
+  JOIN (SELECT DISTINCT ON (exercise_id) exercise_id, weight, reps, performed_at
+        FROM logged ORDER BY exercise_id, weight DESC, reps DESC, performed_at) h USING (exercise_id)
+  JOIN (SELECT DISTINCT ON (exercise_id) exercise_id, volume, performed_at
+        FROM logged ORDER BY exercise_id, volume DESC, performed_at) v USING (exercise_id)
+  ORDER BY e.exercise_id
+  ON CONFLICT (user_id, exercise_id) DO UPDATE SET
+    best_e1rm_at = CASE WHEN (EXCLUDED.best_e1rm, r.best_e1rm_at) > (COALESCE(r.best_e1rm, 0), EXCLUDED.best_e1rm_at)
+                        THEN EXCLUDED.best_e1rm_at ELSE r.best_e1rm_at END,
+    best_e1rm = GREATEST(r.best_e1rm, EXCLUDED.best_e1rm),
+    max_weight_at = CASE WHEN (EXCLUDED.max_weight, EXCLUDED.max_weight_reps, r.max_weight_at)
+                              > (r.max_weight, r.max_weight_reps, EXCLUDED.max_weight_at)
+                         THEN EXCLUDED.max_weight_at ELSE r.max_weight_at END,
+    max_weight_reps = CASE WHEN (EXCLUDED.max_weight, EXCLUDED.max_weight_reps) > (r.max_weight, r.max_weight_reps)
+                           THEN EXCLUDED.max_weight_reps ELSE r.max_weight_reps END,
+    max_weight = GREATEST(r.max_weight, EXCLUDED.max_weight),
+    best_volume_at = CASE WHEN (EXCLUDED.best_volume, r.best_volume_at) > (r.best_volume, EXCLUDED.best_volume_at)
+                          THEN EXCLUDED.best_volume_at ELSE r.best_volume_at END,
+    best_volume = GREATEST(r.best_volume, EXCLUDED.best_volume)
+)"""
+
+
+def _week_start(weeks: int) -> str:
+    today = datetime.now(timezone.utc).date()
+    return (today - timedelta(days=today.weekday(), weeks=weeks - 1)).isoformat()
+
+
+async def _require_user(conn, user_id: int) -> None:
+    if not await fetch_one(conn, "SELECT 1 FROM users WHERE id = %s", (user_id,)):
+        raise UserNotFound()
+
+
+async def e1rm_trend(user_id: int, exercise_id: str, weeks: int) -> dict[str, Any]:
+    since = _week_start(weeks)
+    async with adb_conn() as conn:
+        rows = await fetch_all(
+            conn,
+            """
+            SELECT week, sets, reps, volume, best_e1rm
+            FROM user_exercise_weeks
+            WHERE user_id = %s AND exercise_id = %s AND week >= %s
+            ORDER BY week
+            """,
+            (user_id, exercise_id, since),
+        )
+        record = await fetch_one(
+            conn,
+            "SELECT best_e1rm, best_e1rm_at FROM user_exercise_records WHERE user_id = %s AND exercise_id = %s",
+            (user_id, exercise_id),
+        )
+        if record is None:
+            await _require_user(conn, user_id)
+
+    return {
+        "user_id": user_id,
+        "exercise_id": exercise_id,
+        "since": since,
+        "best_e1rm": _round(record and record["best_e1rm"]),
+        "best_e1rm_at": record["best_e1rm_at"].isoformat() if record and record["best_e1rm_at"] else None,
+        "weeks": [
+            {
+                "week": r["week"].isoformat(),
+                "best_e1rm": _round(r["best_e1rm"]),
+                "sets": r["sets"],
+                "reps": r["reps"],
+                "volume": _round(r["volume"]),
+            }
+            for r in rows
+        ],
+    }
+
+
+async def muscle_volume(user_id: int, weeks: int) -> dict[str, Any]:
+    since = _week_start(weeks)
+    async with adb_conn() as conn:
+        rows = await fetch_all(
+            conn,
+            """
+            SELECT week, muscle, sets, volume
+            FROM user_muscle_weeks
+            WHERE user_id = %s AND week >= %s
+            ORDER BY week, muscle
+            """,
+            (user_id, since),
+        )
+        if not rows:
+            await _require_user(conn, user_id)
+
+    by_week: dict[str, dict[str, Any]] = {}
+    for r in rows:
+        week = by_week.setdefault(r["week"].isoformat(), {})
+        week[r["muscle"]] = {"sets": _round(r["sets"]), "volume": _round(r["volume"])}
+    return {
+        "user_id": user_id,
+        "since": since,
+        "weeks": [{"week": w, "muscles": muscles} for w, muscles in by_week.items()],
+    }
+
+
+async def personal_records(user_id: int, catalog: "exercise_store.Catalog") -> dict[str, Any]:
+    async with adb_conn() as conn:
+        rows = await fetch_all(
+            conn,
+            """
+            SELECT exercise_id, best_e1rm, best_e1rm_at, max_weight, max_weight_reps, max_weight_at,
+                   best_volume, best_volume_at
+            FROM user_exercise_records
+            WHERE user_id = %s
+            ORDER BY exercise_id
+            """,
+            (user_id,),
+        )
+        if not rows:
+            await _require_user(conn, user_id)
+
+    listing = await catalog.derived_async(ListingIndex)
+    records = []
+    for r in rows:
+        i = listing.position(r["exercise_id"])
+        records.append({
+            "exercise_id": r["exercise_id"],
+            "name": catalog.exercises.project(i, ("name",))["name"] if i is not None else None,
+            "best_e1rm": _round(r["best_e1rm"]),
+            "best_e1rm_at": r["best_e1rm_at"].isoformat() if r["best_e1rm_at"] else None,
+            "max_weight": _round(r["max_weight"]),
+            "max_weight_reps": r["max_weight_reps"],
+            "max_weight_at": r["max_weight_at"].isoformat(),
+            "best_volume": _round(r["best_volume"]),
+            "best_volume_at": r["best_volume_at"].isoformat(),
+        })
+    return {"user_id": user_id, "records": records}
+
+
+def _round(value, digits: int = 1):
+    return None if value is None else round(value, digits)
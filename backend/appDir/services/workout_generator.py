@@ -1,6 +1,10 @@
-from appDir.core.splits import SPLITS
+import zlib
+
+from appDir.core.config import SPLIT_EXPLORE
 from appDir.core.rest_rules import REST_RULES
-from appDir.services.schedule_builder import build_week
+from appDir.services.schedule_builder import week_for
+from appDir.services.exercise_selector import fill_week
+from appDir.services.split_policy import current_policy, explore
 
 
 VOLUME_TO_DAYS = {
@@ -10,36 +14,56 @@ VOLUME_TO_DAYS = {
     "7": 7,
 }
 
-def pick_split(experience_level: str, workout_volume: str, goals: list[str], equipment: str) -> str:
-    """
-    Baseline logic (π0). Keep it simple for now.
-    You can make this smarter later (or RL).
-    """
-    days = VOLUME_TO_DAYS.get(workout_volume, 4)
-
-    # super simple baseline choices
+def baseline_split(days: int) -> str:
+    """Baseline logic (π0): the split by training days alone."""
     if days <= 2:
         return "full_body"
     if days == 3:
         return "fb_eod"
     if days == 4:
         return "upper_lower"
-    if days >= 5:
-        return "ppl"
+    return "ppl"
+
+
+def pick_split(experience_level: str, workout_volume: str, goals: list[str], equipment: str) -> str:
+    """
+    The trained split policy's choice for this profile (services/split_policy.py),
+    or π0 where it has none.
+    """
+    days = VOLUME_TO_DAYS.get(workout_volume, 4)
+    return current_policy().lookup(experience_level, days, goals, equipment) or baseline_split(days)
 
-    return "upper_lower"
+
+def assign_split(experience_level: str, workout_volume: str, goals: list[str], equipment: str,
+                 user_id: int) -> tuple[str, float]:
+    """
+    The split for a user's stored plan and the probability it was chosen with:
+    pick_split's choice, except for the SPLIT_EXPLORE share of users that
+    split_policy.explore() gives another split for their days.
+    """
+    days = VOLUME_TO_DAYS.get(workout_volume, 4)
+    policy = current_policy()
+    greedy = policy.lookup(experience_level, days, goals, equipment) or baseline_split(days)
+    if SPLIT_EXPLORE <= 0:
+        return greedy, 1.0
+    return explore(greedy, days, user_id, policy.version or "pi0", SPLIT_EXPLORE)
 
 
-def generate_plan(experience_level: str, workout_volume: str, goals: list[str], equipment: str):
+def generate_plan(experience_level: str, workout_volume: str, goals: list[str], equipment: str,
+                  session_length_minutes: int | None = None, seed: int | None = None,
+                  split: str | None = None):
     days_per_week = VOLUME_TO_DAYS.get(workout_volume, 4)
 
-    split_name = pick_split(experience_level, workout_volume, goals, equipment)
+    split_name = split or pick_split(experience_level, workout_volume, goals, equipment)
 
-    split = SPLITS[split_name]
-    cycle = split["cycle"]
     rest_rule = REST_RULES.get(split_name, "as_needed")
 
-    week = build_week(cycle=cycle, days_per_week=days_per_week, rest_rule=rest_rule)
+    week = week_for(split_name, days_per_week, rest_rule)
+
+    if seed is None:
+        # same profile -> same exercises, so plans can be memoized per profile
+        seed = zlib.crc32(repr((experience_level, workout_volume, goals, equipment, session_length_minutes)).encode())
+    fill_week(week, equipment, experience_level, session_length_minutes, seed)
 
     return {
         "days_per_week": days_per_week,
@@ -47,5 +71,7 @@ def generate_plan(experience_level: str, workout_volume: str, goals: list[str],
         "equipment": equipment,
         "goals": goals,
         "rest_rule": rest_rule,
+        "session_length_minutes": session_length_minutes,
         "week": week,   # <-- includes rest days properly
     }
+
@@ -0,0 +1,8 @@
+import os
+import sys
+
+# tests import the app as appDir.*, the way it runs from backend/
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# the pools are created closed at import; nothing connects unless a test starts the app
+os.environ.setdefault("DATABASE_URL", "postgresql://localhost/ironmind_test")
+os.environ.setdefault("JWT_SECRET", "test-secret")
@@ -0,0 +1,10 @@
+from fastapi.testclient import TestClient
+
+from appDir.app import app
+
+
+def test_health_is_not_shadowed_by_the_profile_route():
+    # no `with`: startup (database, catalog) doesn't run; health only reports state
+    response = TestClient(app).get("/api/health")
+    assert response.status_code == 200
+    assert "dataset_version" in response.json()
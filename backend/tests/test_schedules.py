@@ -0,0 +1,80 @@
+"""
+Every precomputed week in schedule_builder.SCHEDULES against the rest rule it
+was built for, checked with an evaluator written independently of build_week.
+"""
+import pytest
+
+from appDir.core.rest_rules import REST_RULES
+from appDir.core.splits import SPLITS
+from appDir.services.schedule_builder import FIXED_REST_DAYS, REST_RULE_NAMES, SCHEDULES
+
+AFTER_SESSION = {
+    "every_other_day", "between_sessions", "after_lower", "after_legs",
+    "after_every_other_legs", "after_cycle",
+}
+
+
+def _has(focus: str, part: str) -> bool:
+    return part in focus.split("_")
+
+
+def wants_rest(rule: str, day: int, trained: list[str], cycle_len: int) -> bool:
+    """Does `rule` ask for rest on `day`, given the sessions done before it?"""
+    if day in FIXED_REST_DAYS.get(rule, ()):
+        return True
+    if not trained or rule not in AFTER_SESSION:
+        return False
+    last = trained[-1]
+    if rule in ("every_other_day", "between_sessions"):
+        return True
+    if rule == "after_lower":
+        return _has(last, "lower")
+    if rule == "after_legs":
+        return _has(last, "legs")
+    if rule == "after_every_other_legs":
+        return _has(last, "legs") and sum(_has(f, "legs") for f in trained) % 2 == 0
+    return len(trained) % cycle_len == 0  # after_cycle
+
+
+def test_every_split_has_a_rest_rule_and_back():
+    assert set(REST_RULES) == set(SPLITS)
+
+
+def test_every_rest_rule_is_implemented():
+    assert set(REST_RULES.values()) <= {"as_needed", *AFTER_SESSION, *FIXED_REST_DAYS}
+
+
+def test_every_combination_is_precomputed():
+    assert set(SCHEDULES) == {
+        (split, days, rule) for split in SPLITS for days in range(1, 8) for rule in REST_RULE_NAMES
+    }
+
+
+@pytest.mark.parametrize("key", sorted(SCHEDULES), ids=lambda k: "/".join(map(str, k)))
+def test_week_follows_its_rest_rule(key):
+    split_name, days, rule = key
+    week = SCHEDULES[key]
+    cycle = SPLITS[split_name]["sessions"]
+
+    assert [d["day"] for d in week] == list(range(1, 8))
+    trains = [d["focus"] for d in week if d["type"] == "train"]
+    assert trains == [cycle[i % len(cycle)] for i in range(days)], "wrong sessions or order"
+
+    rest_budget = 7 - days
+    rested = 0
+    done: list[str] = []
+    prev_type = None
+    for d in week:
+        # rules only ask for rest right after a session (or on fixed days)
+        wants = wants_rest(rule, d["day"], done, len(cycle)) and (
+            d["day"] in FIXED_REST_DAYS.get(rule, ()) or prev_type == "train"
+        )
+        if d["type"] == "rest":
+            if len(done) < days:
+                assert wants, f"unrequested rest on day {d['day']}"
+            rested += 1
+        else:
+            if len(done) < days:
+                assert not (wants and rested < rest_budget), f"missing rest on day {d['day']}"
+            done.append(d["focus"])
+        prev_type = d["type"]
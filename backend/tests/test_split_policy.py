@@ -0,0 +1,29 @@
+from appDir.services.split_policy import SPLITS_FOR_DAYS, SplitStats, explore
+
+
+def test_explore_is_stable_per_user():
+    assert explore("upper_lower", 4, 42, "v1", 0.5) == explore("upper_lower", 4, 42, "v1", 0.5)
+    assert all(explore("upper_lower", 4, uid, "v1", 0.0) == ("upper_lower", 1.0) for uid in range(200))
+
+
+def test_explore_share_and_propensities():
+    epsilon = 0.2
+    picks = [explore("upper_lower", 4, uid, "v1", epsilon) for uid in range(20000)]
+    explored = sum(split != "upper_lower" for split, _ in picks) / len(picks)
+    # a random pick can land on the greedy split too
+    assert abs(explored - epsilon * 3 / 4) < 0.01
+
+    candidates = SPLITS_FOR_DAYS[4]
+    propensity = {split: p for split, p in picks}
+    assert set(propensity) == set(candidates)
+    assert abs(sum(propensity.values()) - 1.0) < 1e-9
+
+
+def test_stats_weight_by_inverse_propensity():
+    stats = SplitStats()
+    stats.add("beginner", 4, [], "gym", "phul", 1.0, propensity=0.05)
+    stats.add("beginner", 4, [], "gym", "phul", 0.0, propensity=1.0)
+    n, weight, total, _ = stats.cells[("days", "4", "phul")]
+    assert n == 2
+    assert weight == 21.0
+    assert total == 20.0